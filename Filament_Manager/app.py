@@ -1,18 +1,21 @@
 import customtkinter as ctk
 import tkinter as tk
+import re
+import time
+import queue
+import threading
 from tkinter import ttk, messagebox, filedialog
-from datetime import datetime
-import os
-import shutil
-
-from Filament_Manager.ui_components import ColorPreviewCanvas, configure_treeview_style
-from Filament_Manager.data_operations import (
-    init_excel, 
-    read_excel_data, 
-    write_excel_data, 
-    read_print_log
-)
-from Filament_Manager.report_generator import generate_inventory_report
+from datetime import datetime, date
+
+from Filament_Manager import data_operations
+from Filament_Manager.ui_components import VirtualTable, TableRow, configure_treeview_style
+from Filament_Manager.storage import get_repository
+from Filament_Manager.save_queue import SaveQueue
+from Filament_Manager.search import SearchIndex
+from Filament_Manager.watchdog import EventLoopWatchdog
+from Filament_Manager.profiling import profile_operation, begin_operation, profile_running
+from Filament_Manager.timing_log import log_timing
+from Filament_Manager.reports import generate_inventory_report
 from Filament_Manager.dialogs.filament_edit_dialog import FilamentEditDialog
 from Filament_Manager.dialogs.add_filament_dialog import AddFilamentDialog
 from Filament_Manager.dialogs.usage_dialog import FilamentUsageDialog
@@ -21,6 +24,51 @@ from Filament_Manager.dialogs.filter_dialog import FilterRecommendationsDialog
 from Filament_Manager.dialogs.print_history_edit_dialog import PrintHistoryEditDialog
 from Filament_Manager.models import FilamentData
 
+# How often the save status of the background save queue is checked
+SAVE_STATUS_POLL_MS = 200
+
+# Number of print log entries loaded into the history at a time
+HISTORY_PAGE_SIZE = 100
+
+# Rows added to a table per Tk callback while loading, so the window stays responsive
+LOAD_CHUNK_SIZE = 200
+
+# How often a background load is checked for its result
+LOAD_POLL_MS = 50
+
+# Wait this long after the last keystroke before filtering the overview
+SEARCH_DEBOUNCE_MS = 150
+
+
+def _code_sort_key(code):
+    """Return a key that sorts codes by their number, so F2 comes before F10"""
+    text = str(code).strip().lower()
+    match = re.match(r"(\D*)(\d+)(.*)", text)
+    if match is None:
+        return (text, -1, "")
+    prefix, number, rest = match.groups()
+    return (prefix, int(number), rest)
+
+
+def _parse_date(value):
+    """Return a datetime to sort by for a date that is stored as a datetime or as text"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text).replace(tzinfo=None)
+    except ValueError:
+        pass
+    for date_format in ("%d-%m-%Y", "%d/%m/%Y", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    # Unreadable dates sort before all others
+    return datetime.min
+
 
 class FilamentManagerApp(ctk.CTk):
     def __init__(self, *args, **kwargs):
@@ -39,8 +87,23 @@ class FilamentManagerApp(ctk.CTk):
         # Initialize ttk style
         configure_treeview_style()
         
-        # Store color images
-        self.color_images = {}
+        # Save journaled changes to storage in the background
+        self.save_queue = SaveQueue(self.flush_storage)
+        # Full journal batches are saved by the queue too, never on the Tk thread
+        data_operations.set_save_handler(self.save_queue.request_save)
+        
+        # Opt-in detection of UI freezes, started from main.py or the Settings dialog
+        self.watchdog = EventLoopWatchdog(self)
+        
+        # Background loads by name, a newer load with the same name cancels the older one
+        self.loads = {}
+        self.history_oldest_id = None
+        self.history_complete = True
+        
+        # Search index of the overview rows, built on the first search after the data changed
+        self.search_index = None
+        self.search_query = ""
+        self._search_after_id = None
         
         # Create main container
         self.grid_columnconfigure(0, weight=1)
@@ -58,18 +121,138 @@ class FilamentManagerApp(ctk.CTk):
         # Create right frame for display
         self.create_display_frame()
 
-        # Initialize data
+        # Initialize data, the window shows right away and the rows follow when loaded
         self.refresh_data()
 
         # Create settings button
         self.create_settings_button()
 
-        # Load print history from Excel
+        # Load print history in the background
         self.load_print_history()
         
         # Create report button
         self.create_report_button()
 
+    def start_load(self, name, load, show, operation=None):
+        """Run load() on a worker thread and pass its result to show() on the Tk thread
+
+        Starting a new load with the same name cancels the running one, its result is dropped.
+        When profiling, operation collects the time of the load and of rendering the result.
+        """
+        self.cancel_load(name)
+        token = object()
+        results = queue.Queue(maxsize=1)
+        self.loads[name] = {"token": token, "after_id": None, "profile": operation, "started": time.perf_counter()}
+        self.loading_label.configure(text="Loading…")
+        
+        def work():
+            try:
+                with profile_running(operation):
+                    result = load()
+                results.put((True, result))
+            except Exception as e:
+                results.put((False, e))
+        
+        threading.Thread(target=work, name=f"load-{name}", daemon=True).start()
+        self._poll_load(name, token, results, show)
+
+    def _poll_load(self, name, token, results, show):
+        """Check for the result of a background load, runs on the Tk thread"""
+        if not self.is_current_load(name, token):
+            return
+        try:
+            succeeded, result = results.get_nowait()
+        except queue.Empty:
+            self.loads[name]["after_id"] = self.after(LOAD_POLL_MS, self._poll_load, name, token, results, show)
+            return
+        
+        self.loads[name]["after_id"] = None
+        if not succeeded:
+            self.finish_load(name, error=type(result).__name__)
+            messagebox.showerror("Error", f"Failed to load data: {str(result)}")
+            return
+        with profile_running(self.loads[name]["profile"]):
+            show(result, token)
+
+    def is_current_load(self, name, token):
+        """Check whether a load has not been cancelled or replaced"""
+        load = self.loads.get(name)
+        return load is not None and load["token"] is token
+
+    def cancel_load(self, name):
+        """Cancel the background load with the given name, if any"""
+        load = self.loads.pop(name, None)
+        if load is not None and load["after_id"] is not None:
+            self.after_cancel(load["after_id"])
+        if not self.loads:
+            self.loading_label.configure(text="")
+
+    def finish_load(self, name, rows=None, error=None):
+        """Mark a background load as done and write its duration to the timing log"""
+        load = self.loads.pop(name, None)
+        if not self.loads:
+            self.loading_label.configure(text="")
+        if load is not None:
+            log_timing(f"refresh_{name}", (time.perf_counter() - load["started"]) * 1000, rows=rows, error=error)
+        if load is not None and load["profile"] is not None:
+            # Written once the profiled callback that finished the load has returned
+            self.after_idle(load["profile"].finish)
+
+    def render_in_chunks(self, name, token, table, items, make_row, start=0, on_done=None):
+        """Add the rows for items to a table LOAD_CHUNK_SIZE at a time, yielding to the event loop in between"""
+        if not self.is_current_load(name, token):
+            return
+        
+        with profile_running(self.loads[name]["profile"]):
+            self._render_chunk(name, token, table, items, make_row, start, on_done)
+
+    def _render_chunk(self, name, token, table, items, make_row, start, on_done):
+        """Add one chunk of rows and schedule the next"""
+        rows = []
+        for item in items[start:start + LOAD_CHUNK_SIZE]:
+            try:
+                row = make_row(item)
+            except Exception as e:
+                print(f"Error loading row: {str(e)}")
+                continue
+            # A row changed while loading already shows the newer data
+            if start == 0 or table.get_row(row.key) is None:
+                rows.append(row)
+        
+        if start == 0:
+            table.set_rows(rows)
+        else:
+            table.append_rows(rows)
+        
+        if start + LOAD_CHUNK_SIZE < len(items):
+            self.loads[name]["after_id"] = self.after(
+                1, self.render_in_chunks, name, token, table, items, make_row, start + LOAD_CHUNK_SIZE, on_done)
+        else:
+            self.finish_load(name, rows=len(items))
+            if on_done:
+                on_done()
+
+    def request_save(self):
+        """Save journaled changes to storage in the background"""
+        self.save_queue.request_save()
+
+    def flush_storage(self):
+        """Write the journaled changes to storage, runs on the save thread"""
+        with profile_operation("save"):
+            get_repository().flush()
+
+    def poll_save_status(self):
+        """Show the status reported by the save queue, runs on the Tk thread"""
+        for status, error in self.save_queue.poll_events():
+            if status == "saving":
+                self.save_status_label.configure(text="Saving…")
+            elif status == "saved":
+                self.save_status_label.configure(text="All changes saved")
+            elif status == "error":
+                self.save_status_label.configure(text="Save failed")
+                messagebox.showerror("Error", f"Error saving changes: {str(error)}\n\nYour changes are kept in the journal and will be saved again with the next change.")
+        self.after(SAVE_STATUS_POLL_MS, self.poll_save_status)
+
     def create_settings_button(self):
         # Create settings button frame
         settings_frame = ctk.CTkFrame(self)
@@ -86,31 +269,23 @@ class FilamentManagerApp(ctk.CTk):
         )
         settings_button.pack(side="left", padx=5)
 
+        # Save status of the background save queue
+        self.save_status_label = ctk.CTkLabel(
+            settings_frame,
+            text="All changes saved",
+            font=ctk.CTkFont(size=12)
+        )
+        self.save_status_label.pack(side="left", padx=10)
+        self.after(SAVE_STATUS_POLL_MS, self.poll_save_status)
+
     def open_settings(self):
         """Open the settings dialog"""
         dialog = SettingsDialog(self)
         self.wait_window(dialog)
 
     def change_appearance_mode(self, new_appearance_mode):
-        """Change the appearance mode and update all Treeview styles"""
+        """Change the appearance mode, the widgets restyle themselves without reloading any data"""
         ctk.set_appearance_mode(new_appearance_mode.lower())
-        
-        # Reconfigure treeview style
-        configure_treeview_style()
-        
-        # Force update of all treeviews
-        if hasattr(self, 'tree'):
-            self.tree.configure(style="Treeview")
-            for item in self.tree.get_children():
-                self.tree.item(item, tags=())
-        
-        if hasattr(self, 'print_history'):
-            self.print_history.configure(style="Treeview")
-            for item in self.print_history.get_children():
-                self.print_history.item(item, tags=())
-        
-        # Refresh data to ensure proper colors
-        self.refresh_data()
 
     def create_sidebar(self):
         sidebar = ctk.CTkFrame(self.main_frame, width=400)
@@ -205,27 +380,39 @@ class FilamentManagerApp(ctk.CTk):
             font=("Roboto", 24, "bold")
         )
         title_label.grid(row=0, column=0, sticky="w")
-
-        # Create scrollable frame for filament overview
-        scroll_frame = ctk.CTkScrollableFrame(display_frame, width=800, height=400)
-        scroll_frame.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
-
-        # Define columns
-        headers = ["Material", "Description", "Code", "Supplier", "Date", "Weight (g)", "Empty Spool (g)", ""]  # Extra column for edit button
         
-        # Add headers
-        for i, header in enumerate(headers):
-            label = ctk.CTkLabel(
-                scroll_frame,
-                text=header,
-                font=ctk.CTkFont(weight="bold"),
-                height=35  # Set fixed height for the header
-            )
-            label.grid(row=0, column=i, padx=10, pady=(10, 10), sticky="nsew")  # Changed sticky to nsew for full cell coverage
-            scroll_frame.grid_columnconfigure(i, weight=1)
+        # Shown while data is loaded in the background
+        self.loading_label = ctk.CTkLabel(
+            header_frame,
+            text="",
+            font=ctk.CTkFont(size=12)
+        )
+        self.loading_label.grid(row=0, column=1, padx=10, sticky="e")
+        
+        # Search as you type on code, material, variant, supplier and description
+        self.search_entry = ctk.CTkEntry(
+            header_frame,
+            placeholder_text="Search filaments…",
+            width=250
+        )
+        self.search_entry.grid(row=0, column=2, sticky="e")
+        self.search_entry.bind("<KeyRelease>", self._on_search_key)
 
-        # Store reference to scroll_frame for updating data
-        self.scroll_frame = scroll_frame
+        # Virtualized table for the filament overview, only the visible rows have widgets
+        self.overview_table = VirtualTable(
+            display_frame,
+            headers=["Material", "Description", "Code", "Supplier", "Date", "Weight (g)", "Empty Spool (g)"],
+            color_column=0,
+            button_text="⚙️",
+            on_button=self.edit_filament_by_code,
+            button_tooltip="Configure Filament",
+            sortable_columns=(0, 2, 3, 4, 5, 6),  # Material, code, supplier, date and weights
+            show_tooltip=self.show_tooltip,
+            hide_tooltip=self.hide_tooltip,
+            width=800,
+            height=400
+        )
+        self.overview_table.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
         
         # Print History Section
         history_label = ctk.CTkLabel(
@@ -235,225 +422,281 @@ class FilamentManagerApp(ctk.CTk):
         )
         history_label.grid(row=2, column=0, padx=20, pady=(20, 5), sticky="w")
 
-        history_frame = ctk.CTkFrame(display_frame)
-        history_frame.grid(row=3, column=0, padx=20, pady=(0, 20), sticky="nsew")
-        history_frame.grid_columnconfigure(0, weight=1)
-        history_frame.grid_rowconfigure(0, weight=1)
-
-        # Create scrollable frame for print history with matching style
-        if ctk.get_appearance_mode() == "Dark":
-            frame_color = "#2b2b2b"
-        else:
-            frame_color = "#dbdbdb"
-            
-        history_scroll_frame = ctk.CTkScrollableFrame(history_frame, width=800, height=200, fg_color=frame_color)
-        history_scroll_frame.grid(row=0, column=0, sticky="nsew")
-
-        # Define history columns
-        history_headers = ["Date & Time", "Print Name", "Material", "Used", "Remaining", ""]  # Added empty column for edit button
-        
-        # Add history headers
-        for i, header in enumerate(history_headers):
-            label = ctk.CTkLabel(
-                history_scroll_frame,
-                text=header,
-                font=ctk.CTkFont(weight="bold"),
-                height=35  # Set fixed height for the header
-            )
-            label.grid(row=0, column=i, padx=10, pady=(10, 10), sticky="nsew")  # Changed sticky to nsew for full cell coverage
-            history_scroll_frame.grid_columnconfigure(i, weight=1)
-
-        # Store reference to history_scroll_frame for updating data
-        self.history_scroll_frame = history_scroll_frame
+        # Virtualized table for the print history, newest prints first
+        self.history_table = VirtualTable(
+            display_frame,
+            headers=["Date & Time", "Print Name", "Material", "Used", "Remaining"],
+            color_column=2,
+            button_text="⚙️",
+            on_button=self.edit_print_entry,
+            button_tooltip="Edit Print Usage",
+            sortable_columns=(0, 3, 4),  # Time, used and remaining
+            show_tooltip=self.show_tooltip,
+            hide_tooltip=self.hide_tooltip,
+            on_scroll_end=self.load_more_history,
+            width=800,
+            height=200
+        )
+        self.history_table.grid(row=3, column=0, padx=20, pady=(0, 5), sticky="nsew")
+        
+        # Older prints are loaded a page at a time, when scrolling down or with this button
+        self.load_more_button = ctk.CTkButton(
+            display_frame,
+            text="Load older prints",
+            command=self.load_more_history,
+            width=160,
+            height=28
+        )
+        self.load_more_button.grid(row=4, column=0, padx=20, pady=(0, 20), sticky="e")
 
         # Configure row weights for display_frame to make print history smaller
         display_frame.grid_rowconfigure(1, weight=3)  # Filament overview gets more space
         display_frame.grid_rowconfigure(3, weight=1)  # Print history gets less space
 
+    def _filament_row(self, filament):
+        """Return the overview table row for a filament"""
+        # Format the date
+        date_str = filament.date_opened.strftime("%Y-%m-%d") if isinstance(filament.date_opened, datetime) else str(filament.date_opened).split(' ')[0]
+        
+        return TableRow(
+            key=filament.code,
+            color=filament.hex_color,
+            values=[
+                f"{filament.material} {filament.variant}",  # Material and variant
+                filament.description or "",  # Description
+                filament.code,  # Code
+                filament.supplier,  # Supplier
+                date_str,  # Date
+                f"{filament.weight:,.0f}g",  # Weight
+                f"{filament.empty_spool_weight:,.0f}g"  # Empty spool weight
+            ],
+            # Computed once per change of the row, so sorting only compares
+            sort_keys={
+                0: f"{filament.material} {filament.variant}".lower(),
+                2: _code_sort_key(filament.code),
+                3: str(filament.supplier).lower(),
+                4: _parse_date(filament.date_opened),
+                5: filament.weight,
+                6: filament.empty_spool_weight
+            }
+        )
+
     def refresh_data(self):
-        # Clear existing items
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-        
-        # Add headers
-        headers = ["Material", "Description", "Code", "Supplier", "Date", "Weight (g)", "Empty Spool (g)", ""]
-        for col_idx, header in enumerate(headers):
-            label = ctk.CTkLabel(
-                self.scroll_frame,
-                text=header,
-                font=ctk.CTkFont(weight="bold")
-            )
-            label.grid(row=0, column=col_idx, padx=10, pady=(5, 10), sticky="w")
+        """Load the current filaments in the background and show them in the overview table"""
+        self.start_load(
+            "filaments",
+            lambda: get_repository().list_filaments(),
+            lambda filaments, token: self.render_in_chunks(
+                "filaments", token, self.overview_table, filaments, self._filament_row,
+                on_done=self._on_filaments_loaded),
+            begin_operation("refresh")
+        )
+
+    def _on_filaments_loaded(self):
+        """Start a new search index for the new data and apply the search again"""
+        self.search_index = None
+        if self.search_query:
+            self.apply_search()
+
+    def _on_search_key(self, event=None):
+        """Filter the overview shortly after the last keystroke"""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self.apply_search)
+
+    def apply_search(self):
+        """Show only the filaments that match the search box"""
+        self._search_after_id = None
+        query = self.search_entry.get().strip()
+        # A changed query starts at the top, a data change keeps the scroll position
+        scroll_to_top = query != self.search_query
+        self.search_query = query
         
-        data = read_excel_data()
+        if not query:
+            self.overview_table.set_filter(None, scroll_to_top)
+            return
+        if self.search_index is None:
+            # Material and variant, description, code and supplier
+            self.search_index = SearchIndex((row.key, row.values[:4]) for row in self.overview_table.rows)
+        self.overview_table.set_filter(self.search_index.search(query), scroll_to_top)
+
+    def _update_search(self, code, row=None):
+        """Update the search index for one changed or removed row and filter again"""
+        if self.search_index is not None:
+            if row is None:
+                self.search_index.remove(code)
+            else:
+                self.search_index.update(code, row.values[:4])
+        if self.search_query:
+            self._on_search_key()
+
+    def update_filament_row(self, code):
+        """Update, add or remove the overview row of a single filament"""
+        filament = get_repository().get_filament(code)
+        if filament is None:
+            self.overview_table.remove_row(code)
+            self._update_search(code)
+            return
         
-        for row_idx, filament in enumerate(data, start=1):
-            try:
-                # Create color preview frame
-                color_frame = ctk.CTkFrame(self.scroll_frame)
-                color_frame.grid(row=row_idx, column=0, padx=10, pady=3, sticky="w")
-                
-                # Add color preview to frame
-                color_preview = ColorPreviewCanvas(color_frame, width=20, height=20)
-                color_preview.set_color(filament.hex_color)
-                color_preview.pack(side="left", padx=(0, 5))
-                
-                # Add material and variant label next to color preview
-                material_variant_label = ctk.CTkLabel(color_frame, text=f"{filament.material} {filament.variant}")
-                material_variant_label.pack(side="left")
-                
-                # Add description
-                description_label = ctk.CTkLabel(self.scroll_frame, text=filament.description or "")
-                description_label.grid(row=row_idx, column=1, padx=10, pady=3, sticky="w")
-                
-                # Format the date
-                date_str = filament.date_opened.strftime("%Y-%m-%d") if isinstance(filament.date_opened, datetime) else str(filament.date_opened).split(' ')[0]
-                
-                # Create the display values
-                display_values = [
-                    filament.code,  # Code
-                    filament.supplier,  # Supplier
-                    date_str,  # Date
-                    f"{filament.weight:,.0f}g",  # Weight
-                    f"{filament.empty_spool_weight:,.0f}g"  # Empty spool weight
-                ]
-                
-                # Add labels for each value
-                for col_idx, value in enumerate(display_values, start=2):
-                    label = ctk.CTkLabel(self.scroll_frame, text=value)
-                    label.grid(row=row_idx, column=col_idx, padx=10, pady=3, sticky="w")
-                
-                # Add edit button with tooltip
-                edit_button = ctk.CTkButton(
-                    self.scroll_frame,
-                    text="⚙️",
-                    width=30,
-                    height=24,
-                    command=lambda f=filament: self.edit_filament([
-                        f.code,            # code
-                        f.material,        # material
-                        f.variant,         # variant
-                        f.supplier,        # supplier
-                        f.date_opened,     # date_opened
-                        f.weight,          # weight
-                        f.empty_spool_weight,  # empty_spool_weight
-                        f.hex_color,       # hex_color
-                        f.description      # description
-                    ]),
-                    fg_color="transparent",
-                    hover_color=("gray80", "gray20"),
-                    font=ctk.CTkFont(size=16)
-                )
-                edit_button.grid(row=row_idx, column=len(headers)-1, padx=10, pady=3)
-                
-                # Create tooltip
-                tooltip_text = "Configure Filament"
-                edit_button.bind("<Enter>", lambda event, btn=edit_button, tip=tooltip_text: 
-                    self.show_tooltip(event, btn, tip))
-                edit_button.bind("<Leave>", self.hide_tooltip)
-                
-            except Exception as e:
-                print(f"Error refreshing data row {row_idx}: {str(e)}")
-                continue
+        old_row = self.overview_table.get_row(code)
+        try:
+            row = self._filament_row(filament)
+        except Exception as e:
+            print(f"Error refreshing data row {code}: {str(e)}")
+            return
+        self.overview_table.upsert_row(row)
+        self._update_search(code, row)
+        
+        # The history shows the spool color, so its rows follow a color change
+        if old_row is not None and old_row.color != filament.hex_color:
+            self.update_history_rows(get_repository().query_log(filament_code=code))
+
+    def edit_filament_by_code(self, code):
+        """Open the edit dialog for the filament with the given code"""
+        f = get_repository().get_filament(code)
+        if f is None:
+            self.show_error("Error", f"Filament {code} not found.")
+            return
+        
+        self.edit_filament([
+            f.code,            # code
+            f.material,        # material
+            f.variant,         # variant
+            f.supplier,        # supplier
+            f.date_opened,     # date_opened
+            f.weight,          # weight
+            f.empty_spool_weight,  # empty_spool_weight
+            f.hex_color,       # hex_color
+            f.description      # description
+        ])
+
+    def _history_row(self, entry, hex_color):
+        """Return the history table row for a print log entry"""
+        return TableRow(
+            key=entry.entry_id,
+            color=hex_color,
+            values=[
+                entry.timestamp,
+                entry.print_name,
+                f"{entry.material} {entry.variant}",
+                f"{entry.used_weight:,.0f}g",
+                f"{entry.remaining_weight:,.0f}g"
+            ],
+            sort_keys={
+                0: _parse_date(entry.timestamp),
+                3: entry.used_weight,
+                4: entry.remaining_weight
+            }
+        )
+
+    def _filament_color(self, code):
+        """Return the color of a filament, black when it no longer exists"""
+        filament = get_repository().get_filament(code)
+        return filament.hex_color if filament else "#000000"
 
     def load_print_history(self):
-        """Load print history from Excel and display it in the scrollable frame"""
-        # Clear existing items
-        for widget in self.history_scroll_frame.winfo_children():
-            widget.destroy()
-
-        # Add headers
-        headers = ["Date & Time", "Print Name", "Material", "Used", "Remaining", ""]  # Added empty column for edit button
-        for col_idx, header in enumerate(headers):
-            label = ctk.CTkLabel(
-                self.history_scroll_frame,
-                text=header,
-                font=ctk.CTkFont(weight="bold")
-            )
-            label.grid(row=0, column=col_idx, padx=10, pady=(5, 10), sticky="w")
+        """Show the newest page of the print history, older pages are loaded on demand"""
+        # No older pages until the first one is shown
+        self.history_complete = True
+        self.start_load(
+            "history",
+            self._read_history_page,
+            self._show_history_page,
+            begin_operation("history")
+        )
 
-        # Get print log entries and filament data
-        log_entries = read_print_log()
-        filament_data = read_excel_data()
+    def _read_history_page(self):
+        """Read the newest history page with the spool colors, runs on the load thread"""
+        repository = get_repository()
+        entries = repository.query_log_page(HISTORY_PAGE_SIZE)
+        colors = {}
+        for entry in entries:
+            if entry.filament_code not in colors:
+                filament = repository.get_filament(entry.filament_code)
+                colors[entry.filament_code] = filament.hex_color if filament else "#000000"
+        return entries, colors
+
+    def _show_history_page(self, page, token):
+        """Show the newest history page once it is loaded"""
+        entries, colors = page
+        self.history_oldest_id = entries[-1].entry_id if entries else None
+        self.history_complete = len(entries) < HISTORY_PAGE_SIZE
+        if self.history_complete:
+            self.load_more_button.configure(state="disabled", text="All prints loaded")
+        else:
+            self.load_more_button.configure(state="normal", text="Load older prints")
         
-        # Create a dictionary of filament codes to hex colors
-        filament_colors = {filament.code: filament.hex_color for filament in filament_data}
+        self.history_table.first_row = 0
+        self.render_in_chunks(
+            "history", token, self.history_table, entries,
+            lambda entry: self._history_row(entry, colors[entry.filament_code]))
+
+    def load_more_history(self):
+        """Load the next page of older print log entries into the history table"""
+        if self.history_complete:
+            return
         
-        # Add entries in reverse order (newest first)
-        for row_idx, entry in enumerate(reversed(log_entries), start=1):
+        entries = get_repository().query_log_page(HISTORY_PAGE_SIZE, before_id=self.history_oldest_id)
+        if len(entries) < HISTORY_PAGE_SIZE:
+            self.history_complete = True
+            self.load_more_button.configure(state="disabled", text="All prints loaded")
+        else:
+            self.load_more_button.configure(state="normal", text="Load older prints")
+        if not entries:
+            return
+        self.history_oldest_id = entries[-1].entry_id
+        
+        # Look up only the colors of the spools on this page
+        colors = {}
+        rows = []
+        for entry in entries:
             try:
-                # Get the hex color for this filament
-                hex_color = filament_colors.get(entry.filament_code, "#000000")
-                
-                # Format the material string
-                material_str = f"{entry.material} {entry.variant}"
-                
-                # Format the weights
-                used_str = f"{entry.used_weight:,.0f}g"
-                remaining_str = f"{entry.remaining_weight:,.0f}g"
-                
-                # Create the display values for timestamp and print name
-                display_values = [
-                    entry.timestamp,
-                    entry.print_name
-                ]
-                
-                # Add labels for timestamp and print name
-                for col_idx, value in enumerate(display_values):
-                    label = ctk.CTkLabel(self.history_scroll_frame, text=value)
-                    label.grid(row=row_idx, column=col_idx, padx=10, pady=3, sticky="w")
-                
-                # Create material frame with color circle and text
-                material_frame = ctk.CTkFrame(self.history_scroll_frame)
-                material_frame.grid(row=row_idx, column=2, padx=10, pady=3, sticky="w")
-                
-                # Add color preview to material frame
-                color_preview = ColorPreviewCanvas(material_frame, width=20, height=20)
-                color_preview.set_color(hex_color)
-                color_preview.pack(side="left", padx=(0, 5))
-                
-                # Add material text next to color preview
-                material_label = ctk.CTkLabel(material_frame, text=material_str)
-                material_label.pack(side="left")
-                
-                # Add remaining values (Used and Remaining)
-                remaining_values = [
-                    used_str,
-                    remaining_str
-                ]
-                
-                # Add labels for remaining values
-                for col_idx, value in enumerate(remaining_values, start=3):
-                    label = ctk.CTkLabel(self.history_scroll_frame, text=value)
-                    label.grid(row=row_idx, column=col_idx, padx=10, pady=3, sticky="w")
-                
-                # Add edit button with tooltip
-                edit_button = ctk.CTkButton(
-                    self.history_scroll_frame,
-                    text="⚙️",
-                    width=30,
-                    height=24,
-                    command=lambda d={"timestamp": entry.timestamp, 
-                                     "print_name": entry.print_name,
-                                     "material": material_str,
-                                     "used_weight": used_str,
-                                     "remaining_weight": remaining_str,
-                                     "filament_code": entry.filament_code}: self._on_print_history_double_click(d),
-                    fg_color="transparent",
-                    hover_color=("gray80", "gray20"),
-                    font=ctk.CTkFont(size=16)
-                )
-                edit_button.grid(row=row_idx, column=len(headers)-1, padx=10, pady=3)
-                
-                # Create tooltip
-                tooltip_text = "Edit Print Usage"
-                edit_button.bind("<Enter>", lambda event, btn=edit_button, tip=tooltip_text: 
-                    self.show_tooltip(event, btn, tip))
-                edit_button.bind("<Leave>", self.hide_tooltip)
-                
+                if entry.filament_code not in colors:
+                    colors[entry.filament_code] = self._filament_color(entry.filament_code)
+                rows.append(self._history_row(entry, colors[entry.filament_code]))
             except Exception as e:
-                print(f"Error loading print history row {row_idx}: {str(e)}")
+                print(f"Error loading print history entry {entry.entry_id}: {str(e)}")
+                continue
+        
+        self.history_table.append_rows(rows)
+
+    def add_history_row(self, entry):
+        """Show a newly registered print at the top of the history"""
+        self.history_table.upsert_row(self._history_row(entry, self._filament_color(entry.filament_code)), index=0)
+
+    def update_history_rows(self, entries):
+        """Update the history rows of the given entries in place, entries not loaded yet are skipped"""
+        colors = {}
+        for entry in entries:
+            if self.history_table.get_row(entry.entry_id) is None:
                 continue
+            if entry.filament_code not in colors:
+                colors[entry.filament_code] = self._filament_color(entry.filament_code)
+            try:
+                self.history_table.upsert_row(self._history_row(entry, colors[entry.filament_code]))
+            except Exception as e:
+                print(f"Error loading print history entry {entry.entry_id}: {str(e)}")
+
+    def remove_history_row(self, entry_id):
+        """Remove the history row of a deleted print log entry"""
+        self.history_table.remove_row(entry_id)
+
+    def edit_print_entry(self, entry_id):
+        """Open the edit dialog for the print log entry with the given ID"""
+        entry = get_repository().get_log_entry(entry_id)
+        if entry is None:
+            self.show_error("Error", "Entry not found in the print log.")
+            return
+        
+        self._on_print_history_double_click({
+            "timestamp": entry.timestamp,
+            "print_name": entry.print_name,
+            "material": f"{entry.material} {entry.variant}",
+            "used_weight": f"{entry.used_weight:,.0f}g",
+            "remaining_weight": f"{entry.remaining_weight:,.0f}g",
+            "filament_code": entry.filament_code,
+            "entry_id": entry.entry_id
+        })
 
     def edit_filament(self, row_data):
         """Edit a filament entry"""
@@ -487,22 +730,22 @@ class FilamentManagerApp(ctk.CTk):
     def _handle_delete(self, code):
         """Handle deletion of a filament entry"""
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete filament {code}?"):
-            data = read_excel_data()
-            data = [row for row in data if row.code != code]
-            write_excel_data(data)
+            with get_repository().transaction(defer=True) as transaction:
+                transaction.delete_filament(code)
+            self.request_save()
             
-            # Refresh both the filament list and print history
-            self.refresh_data()
-            self.load_print_history()
+            # Remove the overview row and show the prints of this spool without its color
+            self.update_filament_row(code)
+            self.update_history_rows(get_repository().query_log(filament_code=code))
             
             messagebox.showinfo("Deleted", "Filament successfully deleted!")
 
     def _handle_save(self, result):
         """Handle saving of a filament entry"""
-        data = read_excel_data()
-        for filament in data:
-            if filament.code == result['code']:
-                try:
+        try:
+            with get_repository().transaction(defer=True) as transaction:
+                filament = transaction.get_filament(result['code'])
+                if filament:
                     # Update filament with new values
                     filament.material = result['color']
                     filament.variant = result['variant']
@@ -512,13 +755,13 @@ class FilamentManagerApp(ctk.CTk):
                     filament.hex_color = result['hex_color']
                     filament.empty_spool_weight = float(result['empty_spool_weight'])
                     filament.description = result['description']
-                except Exception as e:
-                    self.show_error("Update Error", f"Failed to update filament: {str(e)}")
-                    return
-                break
+                    transaction.upsert_filament(filament)
+        except Exception as e:
+            self.show_error("Update Error", f"Failed to update filament: {str(e)}")
+            return
+        self.request_save()
         
-        write_excel_data(data)
-        self.refresh_data()
+        self.update_filament_row(result['code'])
         self.show_info("Updated", "Filament successfully updated!")
 
     def _on_print_history_double_click(self, print_data):
@@ -546,11 +789,8 @@ class FilamentManagerApp(ctk.CTk):
             )
             
             if backup_path:
-                # Get the directory of the current script
-                current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                
-                # Copy the Excel file to the backup location
-                shutil.copy2(os.path.join(current_dir, "filament_data.xlsx"), backup_path)
+                # Write the backup from the active storage backend
+                get_repository().create_backup(backup_path)
                 
                 messagebox.showinfo(
                     "Backup Created",
@@ -578,20 +818,8 @@ class FilamentManagerApp(ctk.CTk):
                     "This will replace your current data with the backup data.\n" +
                     "Are you sure you want to continue?"
                 ):
-                    # Get the directory of the current script
-                    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                    target_path = os.path.join(current_dir, "filament_data.xlsx")
-                    
-                    # Create a backup of the current file first
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    auto_backup_path = os.path.join(
-                        current_dir,
-                        f"filament_data_auto_backup_{timestamp}.xlsx"
-                    )
-                    shutil.copy2(target_path, auto_backup_path)
-                    
-                    # Copy the backup file to the current location
-                    shutil.copy2(backup_path, target_path)
+                    # Replace the current data, keeping an automatic backup of it first
+                    auto_backup_path = get_repository().restore_backup(backup_path)
                     
                     messagebox.showinfo(
                         "Restore Complete",
@@ -599,8 +827,9 @@ class FilamentManagerApp(ctk.CTk):
                         f"A backup of your previous data was created at:\n{auto_backup_path}"
                     )
                     
-                    # Refresh the display
+                    # Refresh the display, the backup has its own print history
                     self.refresh_data()
+                    self.load_print_history()
         except Exception as e:
             messagebox.showerror(
                 "Restore Error",
@@ -0,0 +1,136 @@
+import itertools
+from datetime import datetime
+
+
+def time_order_key(entry):
+    """Sort key that puts log entries in the order the prints happened
+
+    The timestamp decides, since a batch import can add prints dated before existing
+    ones; the entry ID orders prints with the same timestamp.
+    """
+    try:
+        printed = datetime.fromisoformat(str(entry.timestamp).strip())
+    except ValueError:
+        # Unreadable timestamps come first, in entry ID order
+        printed = datetime.min
+    return (printed.replace(tzinfo=None), entry.entry_id or 0)
+
+
+class SpoolLedger:
+    """Print log entries of one spool in time order, with running totals of the used weight
+
+    The remaining weight after entry i is kept as anchors[i] - used_totals[i]. The anchors
+    absorb weight corrections made between prints, so changing the used weight of one
+    entry only shifts the remaining weight of that entry and the ones after it.
+    """
+
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=time_order_key)
+        self.positions = {entry.entry_id: index for index, entry in enumerate(self.entries)}
+        self.used_totals = list(itertools.accumulate(entry.used_weight for entry in self.entries))
+        self.anchors = [entry.remaining_weight + total for entry, total in zip(self.entries, self.used_totals)]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, entry_id):
+        """Return the entry with the given ID, or None"""
+        index = self.positions.get(entry_id)
+        return self.entries[index] if index is not None else None
+
+    def _recompute_from(self, index):
+        """Recompute the running totals from index onward, returns the entries whose remaining weight changed"""
+        changed = []
+        total = self.used_totals[index - 1] if index > 0 else 0
+        for position in range(index, len(self.entries)):
+            entry = self.entries[position]
+            total += entry.used_weight
+            self.used_totals[position] = total
+            # Rounded so float noise from the running totals does not count as a change
+            remaining_weight = round(self.anchors[position] - total, 6)
+            if remaining_weight != entry.remaining_weight:
+                entry.remaining_weight = remaining_weight
+                changed.append(entry)
+        return changed
+
+    def update_used_weight(self, entry_id, used_weight):
+        """Change the used weight of an entry, returns the entries that changed including that one"""
+        index = self.positions[entry_id]
+        entry = self.entries[index]
+        if entry.used_weight == used_weight:
+            return []
+        entry.used_weight = used_weight
+        changed = self._recompute_from(index)
+        if entry not in changed:
+            changed.insert(0, entry)
+        return changed
+
+    def remove(self, entry_id):
+        """Remove an entry, returns the later entries whose remaining weight changed"""
+        index = self.positions.pop(entry_id)
+        del self.entries[index]
+        del self.used_totals[index]
+        del self.anchors[index]
+        for position in range(index, len(self.entries)):
+            self.positions[self.entries[position].entry_id] = position
+        if index == len(self.entries):
+            return []
+        return self._recompute_from(index)
+
+
+def recompute_all_balances(filaments, print_log):
+    """Recompute the remaining weight of every log entry in one vectorized pass
+
+    The remaining weight after a print becomes the remaining weight after the spool's
+    latest print plus everything used by the prints in between. Unlike SpoolLedger, which
+    keeps weight corrections made between prints in its anchors, this rewrites each
+    spool's history as one unbroken chain, so such corrections are lost. Entries of
+    spools that no longer exist are left alone. Returns the entries whose remaining
+    weight changed.
+    """
+    # pandas is only needed here, so it is not loaded on every start
+    import pandas as pd
+
+    if not print_log:
+        return []
+
+    ordered = sorted(print_log, key=time_order_key)
+    frame = pd.DataFrame({
+        "entry_id": [entry.entry_id for entry in ordered],
+        "filament_code": [entry.filament_code for entry in ordered],
+        "used_weight": [float(entry.used_weight) for entry in ordered],
+        "remaining_weight": [float(entry.remaining_weight) for entry in ordered]
+    })
+
+    # The frame is in time order, so the last entry per spool is its latest print
+    latest_weights = frame.groupby("filament_code")["remaining_weight"].last()
+    latest_weights = latest_weights[latest_weights.index.isin({filament.code for filament in filaments})]
+
+    # Weight used by the prints after each entry: reversed running total minus the entry itself
+    used_after = (frame["used_weight"][::-1].groupby(frame["filament_code"][::-1]).cumsum()[::-1]
+                  - frame["used_weight"])
+    recomputed = (frame["filament_code"].map(latest_weights) + used_after).round(6)
+
+    changed_mask = recomputed.notna() & (recomputed != frame["remaining_weight"].round(6))
+    new_weights = dict(zip(frame["entry_id"][changed_mask], recomputed[changed_mask]))
+
+    changed = []
+    for entry in print_log:
+        if entry.entry_id in new_weights:
+            entry.remaining_weight = float(new_weights[entry.entry_id])
+            changed.append(entry)
+    return changed
+
+
+def recompute_repository_balances(repository, defer=False):
+    """Recompute all remaining weights in a repository and store the changes in one transaction
+
+    With defer the changes are only journaled and the caller saves them, as the UI does
+    through its save queue. Returns the number of entries that were updated.
+    """
+    changed = recompute_all_balances(repository.list_filaments(), repository.query_log())
+    if changed:
+        with repository.transaction(defer=defer) as transaction:
+            for entry in changed:
+                transaction.update_log_entry(entry)
+    return len(changed)
\ No newline at end of file
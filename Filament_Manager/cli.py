@@ -0,0 +1,391 @@
+# Command-line access to the same storage as the window, for scripts and servers without a
+# display. Nothing imported here may load tkinter or customtkinter.
+
+import csv
+import sys
+import json
+import logging
+import argparse
+import dataclasses
+from datetime import datetime, date
+
+from Filament_Manager import data_operations
+from Filament_Manager.storage import get_repository
+from Filament_Manager.models import FilamentData, PrintLogEntry
+from Filament_Manager.search import SearchIndex
+from Filament_Manager.reports import generate_inventory_report, generate_filament_label
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class CommandError(Exception):
+    """A problem with the input of a command, reported without a traceback"""
+
+
+def _parse_date(value):
+    """Parse a YYYY-MM-DD date"""
+    try:
+        return datetime.strptime(value.strip(), "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', use YYYY-MM-DD")
+
+
+def _parse_weight(value, name="weight"):
+    """Parse a weight in grams that is not negative"""
+    try:
+        weight = float(value)
+    except (TypeError, ValueError):
+        raise CommandError(f"Invalid {name} '{value}', must be a number")
+    if weight < 0:
+        raise CommandError(f"Invalid {name} '{value}', must not be negative")
+    return weight
+
+
+def _parse_color(value):
+    """Parse a #RRGGBB color"""
+    value = value.strip()
+    if not value.startswith("#"):
+        value = "#" + value
+    if len(value) != 7 or not all(c in "0123456789ABCDEFabcdef" for c in value[1:]):
+        raise CommandError(f"Invalid color '{value}', use #RRGGBB")
+    return value.upper()
+
+
+def _read_csv(path):
+    """Return the rows of a CSV file with a header row as dicts with lowercase keys"""
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            return [{(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+                    for row in csv.DictReader(file)]
+    except OSError as e:
+        raise CommandError(f"Cannot read {path}: {e}")
+
+
+def _to_json(item):
+    return json.dumps(dataclasses.asdict(item), default=str)
+
+
+def _print_filaments(filaments, as_json=False):
+    if as_json:
+        for filament in filaments:
+            print(_to_json(filament))
+        return
+    print(f"{'code':<8} {'material':<10} {'variant':<16} {'supplier':<16} {'weight':>9} {'color':<8} description")
+    for filament in filaments:
+        print(f"{filament.code:<8} {filament.material:<10} {filament.variant:<16} {filament.supplier:<16}"
+              f" {filament.weight:>8,.0f}g {filament.hex_color:<8} {filament.description or ''}")
+
+
+def _filament_sort_key(filament):
+    """Sort codes like F2 before F10"""
+    number = filament.code[1:]
+    return (0, int(number), filament.code) if number.isdigit() else (1, 0, filament.code)
+
+
+def list_command(args):
+    """Print the spools, optionally only those of one material or supplier"""
+    filaments = get_repository().list_filaments()
+    if args.material:
+        filaments = [f for f in filaments if f.material.lower() == args.material.lower()]
+    if args.supplier:
+        filaments = [f for f in filaments if f.supplier.lower() == args.supplier.lower()]
+    if args.min_weight is not None:
+        filaments = [f for f in filaments if f.weight >= args.min_weight]
+    _print_filaments(sorted(filaments, key=_filament_sort_key), args.json)
+    return 0
+
+
+def search_command(args):
+    """Print the spools whose words start with every word of the query, like the search box"""
+    filaments = {filament.code: filament for filament in get_repository().list_filaments()}
+    index = SearchIndex(
+        (code, (f"{f.material} {f.variant}", f.description, f.code, f.supplier)) for code, f in filaments.items()
+    )
+    matches = [filaments[code] for code in index.search(" ".join(args.query))]
+    _print_filaments(sorted(matches, key=_filament_sort_key), args.json)
+    return 0 if matches else 1
+
+
+def _usage_requests(args):
+    """Return (row label, code, weight, print name, timestamp) for a single usage or a CSV batch"""
+    now = datetime.now().strftime(TIMESTAMP_FORMAT)
+    if not args.csv:
+        if not (args.code and args.weight is not None and args.name):
+            raise CommandError("Give a spool code, a weight and --name, or --csv FILE")
+        return [("", args.code, args.weight, args.name, now)]
+
+    requests = []
+    for row_number, row in enumerate(_read_csv(args.csv), start=2):
+        requests.append((f"Row {row_number}: ", row.get("code", ""), row.get("weight", ""),
+                         row.get("print_name") or row.get("name", ""), row.get("timestamp") or now))
+    return requests
+
+
+def use_command(args):
+    """Register filament usage for one print or a CSV batch, stored in a single transaction"""
+    repository = get_repository()
+    spools = {}
+    entries = []
+    errors = []
+    for label, code, weight, print_name, timestamp in _usage_requests(args):
+        try:
+            weight = _parse_weight(weight)
+            if weight <= 0:
+                raise CommandError(f"Invalid weight '{weight:g}', must be greater than 0")
+            if not print_name:
+                raise CommandError("Missing print name")
+            try:
+                datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+            except ValueError:
+                raise CommandError(f"Invalid timestamp '{timestamp}', use YYYY-MM-DD HH:MM")
+            if code not in spools:
+                spools[code] = repository.get_filament(code)
+            filament = spools[code]
+            if filament is None:
+                raise CommandError(f"Spool {code} not found")
+            if filament.weight < weight:
+                raise CommandError(f"Not enough filament on {code}: available {filament.weight:,.0f}g, "
+                                   f"required {weight:,.0f}g")
+        except CommandError as e:
+            errors.append(f"{label}{e}")
+            continue
+
+        # Later rows for the same spool start from the weight left by earlier rows
+        filament.weight -= weight
+        entries.append(PrintLogEntry(
+            timestamp=timestamp,
+            print_name=print_name,
+            filament_code=code,
+            material=filament.material,
+            variant=filament.variant,
+            used_weight=weight,
+            remaining_weight=filament.weight
+        ))
+
+    if errors:
+        for error in errors:
+            print(error, file=sys.stderr)
+        print("Nothing was registered", file=sys.stderr)
+        return 1
+    if not entries:
+        print("No usage to register", file=sys.stderr)
+        return 1
+
+    with repository.transaction(defer=True) as transaction:
+        for filament in spools.values():
+            transaction.upsert_filament(filament)
+        for entry in entries:
+            transaction.append_log_entry(entry)
+    repository.flush()
+
+    for entry in entries:
+        print(f"Registered {entry.used_weight:,.0f}g of {entry.filament_code} for '{entry.print_name}', "
+              f"{entry.remaining_weight:,.0f}g left")
+    return 0
+
+
+def _add_requests(args):
+    """Return (row label, field dict) for the spools to add from the arguments or a CSV batch"""
+    if args.csv:
+        return [(f"Row {row_number}: ", row) for row_number, row in enumerate(_read_csv(args.csv), start=2)]
+    if not (args.material and args.variant and args.supplier and args.weight is not None):
+        raise CommandError("Give --material, --variant, --supplier and --weight, or --csv FILE")
+    fields = {
+        "material": args.material,
+        "variant": args.variant,
+        "supplier": args.supplier,
+        "weight": args.weight,
+        "empty_spool_weight": args.empty_spool_weight,
+        "hex_color": args.color,
+        "date_opened": args.date,
+        "description": args.description
+    }
+    return [("", fields)] * args.count
+
+
+def add_command(args):
+    """Add new spools with the next free codes, stored in a single transaction"""
+    repository = get_repository()
+    filaments = []
+    errors = []
+    for label, fields in _add_requests(args):
+        try:
+            for name in ("material", "variant", "supplier"):
+                if not fields.get(name):
+                    raise CommandError(f"Missing {name}")
+            filaments.append(FilamentData(
+                code="",
+                material=fields["material"],
+                variant=fields["variant"],
+                supplier=fields["supplier"],
+                date_opened=_parse_date(fields["date_opened"]) if fields.get("date_opened") else date.today(),
+                weight=_parse_weight(fields.get("weight")),
+                hex_color=_parse_color(fields["hex_color"]) if fields.get("hex_color") else "#000000",
+                empty_spool_weight=_parse_weight(fields.get("empty_spool_weight") or 0, "empty spool weight"),
+                description=fields.get("description") or ""
+            ))
+        except CommandError as e:
+            errors.append(f"{label}{e}")
+
+    if errors:
+        for error in errors:
+            print(error, file=sys.stderr)
+        print("Nothing was added", file=sys.stderr)
+        return 1
+
+    # Codes are handed out in sequence, the same way next_filament_code() would one at a time
+    next_number = int(repository.next_filament_code()[1:])
+    with repository.transaction(defer=True) as transaction:
+        for number, filament in enumerate(filaments, start=next_number):
+            filament.code = f"F{number:03d}"
+            transaction.upsert_filament(filament)
+    repository.flush()
+
+    for filament in filaments:
+        print(f"Added {filament.code}: {filament.material} {filament.variant} ({filament.supplier}), "
+              f"{filament.weight:,.0f}g")
+    return 0
+
+
+def report_command(args):
+    """Write the PDF inventory report"""
+    try:
+        path = generate_inventory_report(output_path=args.output, open_file=False)
+    except Exception as e:
+        raise CommandError(f"Could not write the report: {e}")
+    print(path)
+    return 0
+
+
+def label_command(args):
+    """Write a PDF label for each given spool"""
+    repository = get_repository()
+    filaments = []
+    for code in args.codes:
+        filament = repository.get_filament(code)
+        if filament is None:
+            raise CommandError(f"Spool {code} not found")
+        filaments.append(filament)
+    if args.output and len(filaments) > 1:
+        raise CommandError("--output can only be used with a single spool")
+
+    for filament in filaments:
+        try:
+            path = generate_filament_label(filament, include_qr=not args.no_qr, include_barcode=not args.no_barcode,
+                                           output_path=args.output, open_file=False)
+        except Exception as e:
+            raise CommandError(f"Could not write the label of {filament.code}: {e}")
+        print(path)
+    return 0
+
+
+def backup_command(args):
+    """Write a backup of all data to an Excel file"""
+    path = args.path or f"filament_manager_backup_{datetime.now():%Y%m%d_%H%M%S}.xlsx"
+    get_repository().create_backup(path)
+    print(path)
+    return 0
+
+
+def restore_command(args):
+    """Replace all data with an Excel backup, after making an automatic backup"""
+    if not args.yes:
+        raise CommandError("Restoring replaces all current data, add --yes to confirm")
+    # Refuse files that are not backups before anything is replaced
+    try:
+        data_operations.parse_workbook(args.path)
+    except Exception as e:
+        raise CommandError(f"{args.path} is not a valid backup: {e}")
+    auto_backup_path = get_repository().restore_backup(args.path)
+    print(f"Restored {args.path}, the previous data was saved to {auto_backup_path}")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m Filament_Manager",
+        description="Manage the filament inventory without opening the window"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="show timing and diagnostic messages")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list the spools")
+    list_parser.add_argument("--material", help="only spools of this material")
+    list_parser.add_argument("--supplier", help="only spools from this supplier")
+    list_parser.add_argument("--min-weight", type=float, help="only spools with at least this many grams left")
+    list_parser.add_argument("--json", action="store_true", help="print one JSON object per spool")
+    list_parser.set_defaults(handler=list_command)
+
+    search_parser = commands.add_parser("search", help="find spools like the search box does")
+    search_parser.add_argument("query", nargs="+", help="words that the material, variant, code, supplier "
+                                                        "or description start with")
+    search_parser.add_argument("--json", action="store_true", help="print one JSON object per spool")
+    search_parser.set_defaults(handler=search_command)
+
+    use_parser = commands.add_parser(
+        "use", help="register filament usage",
+        description="Register one print, or a batch from a CSV file with the columns code, weight, "
+                    "print_name and optionally timestamp (YYYY-MM-DD HH:MM). A batch is stored "
+                    "with a single save, and nothing is stored if any row is invalid.")
+    use_parser.add_argument("code", nargs="?", help="spool code, e.g. F001")
+    use_parser.add_argument("weight", nargs="?", help="grams used")
+    use_parser.add_argument("--name", help="name of the print")
+    use_parser.add_argument("--csv", help="CSV file with the usage to register")
+    use_parser.set_defaults(handler=use_command)
+
+    add_parser = commands.add_parser(
+        "add", help="add spools",
+        description="Add spools from the options, or a batch from a CSV file with the columns material, "
+                    "variant, supplier, weight and optionally empty_spool_weight, hex_color, "
+                    "date_opened (YYYY-MM-DD) and description. A batch is stored with a single save.")
+    add_parser.add_argument("--material", help="e.g. PLA")
+    add_parser.add_argument("--variant", help="e.g. Basic")
+    add_parser.add_argument("--supplier", help="e.g. Bambu Lab")
+    add_parser.add_argument("--weight", help="grams of filament on the spool")
+    add_parser.add_argument("--empty-spool-weight", default="0", help="grams of the empty spool")
+    add_parser.add_argument("--color", help="#RRGGBB color")
+    add_parser.add_argument("--date", help="date opened, YYYY-MM-DD (default: today)")
+    add_parser.add_argument("--description", default="", help="free text")
+    add_parser.add_argument("--count", type=int, default=1, help="number of identical spools to add")
+    add_parser.add_argument("--csv", help="CSV file with the spools to add")
+    add_parser.set_defaults(handler=add_command)
+
+    report_parser = commands.add_parser("report", help="write the PDF inventory report")
+    report_parser.add_argument("--output", help="PDF file to write (default: in the temp folder)")
+    report_parser.set_defaults(handler=report_command)
+
+    label_parser = commands.add_parser("label", help="write PDF labels")
+    label_parser.add_argument("codes", nargs="+", help="spool codes")
+    label_parser.add_argument("--output", help="PDF file to write, for a single spool (default: in the temp folder)")
+    label_parser.add_argument("--no-qr", action="store_true", help="leave out the QR code")
+    label_parser.add_argument("--no-barcode", action="store_true", help="leave out the barcode")
+    label_parser.set_defaults(handler=label_command)
+
+    backup_parser = commands.add_parser("backup", help="write a backup to an Excel file")
+    backup_parser.add_argument("path", nargs="?", help="file to write (default: a dated file in this folder)")
+    backup_parser.set_defaults(handler=backup_command)
+
+    restore_parser = commands.add_parser("restore", help="replace all data with an Excel backup")
+    restore_parser.add_argument("path", help="backup file")
+    restore_parser.add_argument("--yes", action="store_true", help="confirm replacing the current data")
+    restore_parser.set_defaults(handler=restore_command)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(name)s: %(message)s")
+    try:
+        return args.handler(args)
+    except CommandError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        get_repository().close()
+        # Keep the parsed workbook for a fast next start, like the window does on exit
+        try:
+            data_operations.save_snapshot()
+        except Exception as e:
+            logging.getLogger(__name__).warning("Could not write snapshot: %s", e)
\ No newline at end of file
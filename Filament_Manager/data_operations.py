@@ -1,92 +1,797 @@
 import os
+import copy
+import json
+import time
+import logging
+import shutil
+import bisect
+import tempfile
+import threading
+import contextlib
+import functools
+import dataclasses
 import openpyxl
 from openpyxl.styles import PatternFill
-from datetime import datetime
-from Filament_Manager.models import FilamentData, PrintLogEntry
+from datetime import datetime, date
+from Filament_Manager.models import FilamentData, PrintLogEntry, Inventory, PrintLog
+from Filament_Manager import snapshot, timing_log
+
+logger = logging.getLogger(__name__)
 
 # Ensure Excel file exists
 script_directory = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
 excel_file = os.path.join(script_directory, "filament_data.xlsx")
 
+# Number of journaled transactions that triggers folding them into the workbook
+JOURNAL_BATCH_SIZE = 50
+
+# Column of the Print_Log sheet that holds the entry ID
+LOG_ID_COLUMN = 8
+
+
+class WorkbookCache:
+    """In-memory copy of the parsed workbook plus the journaled changes not saved to it yet"""
+
+    def __init__(self):
+        self.signature = None
+        self.filaments = Inventory()
+        self.print_log = PrintLog()
+        self.last_log_id = 0
+        self.pending = []
+        self.workbook = None
+        self.filament_rows = {}
+        self.sheet_filaments = {}
+        self.log_rows = {}
+        self.hits = 0
+        self.misses = 0
+
+    def is_valid(self):
+        """Check whether the cached data still matches the file on disk"""
+        return self.signature is not None and self.signature == _file_signature()
+
+    def invalidate(self):
+        """Drop the cached data so the next access reparses the workbook"""
+        self.signature = None
+        self.filaments = Inventory()
+        self.print_log = PrintLog()
+        self.last_log_id = 0
+        self.pending = []
+        self.workbook = None
+        self.filament_rows = {}
+        self.sheet_filaments = {}
+        self.log_rows = {}
+
+
+@dataclasses.dataclass
+class WriteStats:
+    """Summary of what a delta write changed in the Filament_Data sheet"""
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    cells_written: int = 0
+
+
+_cache = WorkbookCache()
+_last_write_stats = WriteStats()
+
+# Called instead of flush_journal() when a journal batch is full, see set_save_handler()
+_save_handler = None
+
+# Guards the cached data; only held briefly so readers never wait for a workbook save
+_state_lock = threading.RLock()
+# Serializes changes to the editable workbook and saving it
+_write_lock = threading.RLock()
+
+
+# Used on bulk reads and writes only, a record per single-row lookup would flood the log
+def _timed(operation):
+    """Write a timing record for each call, with the size of the workbook afterwards"""
+    return timing_log.timed_function(operation, file_path=lambda: excel_file)
+
+
+def _file_signature():
+    """Return a tuple identifying the current version of the Excel file"""
+    try:
+        stat = os.stat(excel_file)
+    except OSError:
+        return None
+    return (excel_file, stat.st_mtime_ns, stat.st_size)
+
+
+def journal_path():
+    """Return the path of the journal that belongs to the Excel file"""
+    return os.path.splitext(excel_file)[0] + "_print_log.journal"
+
+
+def _json_default(value):
+    """Serialize the dates stored in filament records"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _filament_from_json(values):
+    """Rebuild a FilamentData from its journal representation"""
+    filament = FilamentData(**values)
+    if isinstance(filament.date_opened, str):
+        try:
+            filament.date_opened = datetime.fromisoformat(filament.date_opened)
+        except ValueError:
+            pass
+    return filament
+
+
+def _read_journal():
+    """Read the transactions that have not been folded into the workbook yet"""
+    records = []
+    try:
+        with open(journal_path(), "r", encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                    if "timestamp" in record:
+                        # Older journals hold one print log entry per line
+                        record = {"log": [record]}
+                    records.append(_new_record(
+                        [_filament_from_json(values) for values in record.get("upsert", [])],
+                        record.get("delete", []),
+                        [PrintLogEntry(**values) for values in record.get("log", [])],
+                        record.get("log_delete", [])
+                    ))
+                except (ValueError, TypeError):
+                    # A torn last line from an interrupted write
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _new_record(upserts=(), deletes=(), log_entries=(), log_deletes=()):
+    """Create a journal record: filaments to store or delete, log entries to store (by ID) or delete"""
+    return {
+        "upsert": list(upserts),
+        "delete": list(deletes),
+        "log": list(log_entries),
+        "log_delete": list(log_deletes)
+    }
+
+
+def _encode_record(record):
+    """Encode one transaction as a journal line"""
+    encoded = {
+        "upsert": [dataclasses.asdict(filament) for filament in record["upsert"]],
+        "delete": record["delete"],
+        "log": [dataclasses.asdict(entry) for entry in record["log"]],
+        "log_delete": record["log_delete"]
+    }
+    return json.dumps(encoded, default=_json_default) + "\n"
+
+
+def _append_to_journal(record):
+    """Durably append one transaction to the journal as a single line"""
+    with open(journal_path(), "a", encoding="utf-8") as journal:
+        journal.write(_encode_record(record))
+        journal.flush()
+        os.fsync(journal.fileno())
+
+
+def _drop_journal_records(count):
+    """Remove the first count transactions from the journal, keeping any added since"""
+    remaining = _read_journal()[count:]
+    if not remaining:
+        if os.path.exists(journal_path()):
+            os.remove(journal_path())
+        return
+
+    fd, temp_path = tempfile.mkstemp(prefix=".journal_", dir=os.path.dirname(journal_path()))
+    with os.fdopen(fd, "w", encoding="utf-8") as journal:
+        for record in remaining:
+            journal.write(_encode_record(record))
+        journal.flush()
+        os.fsync(journal.fileno())
+    os.replace(temp_path, journal_path())
+
+
+def _as_stored(filament):
+    """Return a copy of the filament as it would be read back from the workbook"""
+    stored = FilamentData.from_row(filament.to_row())
+    # openpyxl always reads dates back as datetimes
+    if isinstance(stored.date_opened, date) and not isinstance(stored.date_opened, datetime):
+        stored.date_opened = datetime(stored.date_opened.year, stored.date_opened.month, stored.date_opened.day)
+    return stored
+
+
+def _apply_changes(inventory, upserts, deletes):
+    """Apply upserts and deletes to the inventory in place, keeping the order"""
+    for filament in upserts:
+        inventory.upsert(filament)
+    for code in deletes:
+        inventory.remove(code)
+
+
+def _apply_log_changes(print_log, log_entries, log_deletes):
+    """Store log entries by ID (updating them in place) and drop deleted IDs from print_log"""
+    for entry in log_entries:
+        print_log.upsert(entry)
+    for entry_id in log_deletes:
+        print_log.remove(entry_id)
+
+
+def _parse_print_log(rows):
+    """Parse Print_Log rows into (row number, entry) pairs and the highest entry ID in use
+
+    Rows written before entries had IDs get the next free IDs in sheet order, so the
+    same file always yields the same IDs. A removed entry leaves a row holding only
+    its ID, which keeps IDs from being reused.
+    """
+    parsed = []
+    last_id = 0
+    for row_idx, row in enumerate(rows, start=2):
+        entry_id = row[LOG_ID_COLUMN - 1] if len(row) >= LOG_ID_COLUMN else None
+        if isinstance(entry_id, (int, float)):
+            last_id = max(last_id, int(entry_id))
+        if row and row[0]:  # Skip empty rows
+            parsed.append((row_idx, PrintLogEntry.from_row(row)))
+
+    for row_idx, entry in parsed:
+        if entry.entry_id is None:
+            last_id += 1
+            entry.entry_id = last_id
+    return parsed, last_id
+
+
+def parse_workbook(path):
+    """Parse the filaments and print log from an Excel file"""
+    with timing_log.timed("parse_workbook", file_path=lambda: path) as timing:
+        filaments, print_log, last_log_id = _parse_workbook(path)
+        timing["rows"] = len(filaments) + len(print_log)
+    return filaments, print_log
+
+
+def _parse_workbook(path):
+    """Parse the filaments, print log and highest print log entry ID from an Excel file"""
+    # Read-only mode streams the sheets and is much faster for parsing
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        filaments = []
+        for row in workbook["Filament_Data"].iter_rows(min_row=2, values_only=True):
+            if row[0]:  # Skip empty rows
+                try:
+                    filaments.append(FilamentData.from_row(row))
+                except Exception as e:
+                    continue
+
+        parsed, last_log_id = _parse_print_log(workbook["Print_Log"].iter_rows(min_row=2, values_only=True))
+    finally:
+        workbook.close()
+
+    return filaments, [entry for row_idx, entry in parsed], last_log_id
+
+
+def _read_workbook(signature):
+    """Read the workbook contents from its snapshot when it is current, otherwise parse the workbook"""
+    start = time.perf_counter()
+    contents = snapshot.read_snapshot(excel_file)
+    if contents is not None:
+        logger.info("Loaded %s from snapshot in %.1f ms", os.path.basename(excel_file),
+                    (time.perf_counter() - start) * 1000)
+        return contents
+
+    filaments, print_log, last_log_id = _parse_workbook(excel_file)
+    logger.info("Parsed %s in %.1f ms (no current snapshot)", os.path.basename(excel_file),
+                (time.perf_counter() - start) * 1000)
+
+    # Only store a snapshot of what we actually parsed
+    if _file_signature() == signature:
+        try:
+            snapshot.write_snapshot(excel_file, filaments, print_log, last_log_id)
+        except Exception as e:
+            logger.warning("Could not write snapshot: %s", e)
+    return filaments, print_log, last_log_id
+
+
+@_timed("save_snapshot")
+def save_snapshot():
+    """Store a snapshot of the workbook when the cache holds exactly its contents, for a fast next start"""
+    with _state_lock:
+        if not _cache.is_valid() or _cache.pending:
+            return False
+        snapshot.write_snapshot(excel_file, list(_cache.filaments), list(_cache.print_log), _cache.last_log_id)
+        return True
+
+
+def _load_cache():
+    """Make sure the cache reflects the workbook on disk, reparsing it only when it changed"""
+    with _state_lock:
+        if _cache.is_valid():
+            _cache.hits += 1
+            timing_log.note_cache(True)
+            return _cache
+
+        _cache.misses += 1
+        timing_log.note_cache(False)
+        signature = _file_signature()
+        filaments, print_log, last_log_id = _read_workbook(signature)
+        records = _read_journal()
+
+        # Replay the journaled changes on top of the workbook. Log entries are stored by ID,
+        # so replaying changes that were already folded into the workbook is harmless.
+        filaments = Inventory(filaments)
+        print_log = PrintLog(print_log)
+        for record in records:
+            _apply_changes(filaments, record["upsert"], record["delete"])
+            _apply_log_changes(print_log, record["log"], record["log_delete"])
+            last_log_id = max([last_log_id] + [entry.entry_id for entry in record["log"]])
+
+        _cache.invalidate()
+        _cache.signature = signature
+        _cache.filaments = filaments
+        _cache.print_log = print_log
+        _cache.last_log_id = last_log_id
+        _cache.pending = records
+        return _cache
+
+
+def _load_writable_workbook():
+    """Load the editable workbook and remember which sheet row holds each filament and log entry"""
+    workbook = openpyxl.load_workbook(excel_file)
+    filament_rows = {}
+    sheet_filaments = {}
+    for row_idx, row in enumerate(workbook["Filament_Data"].iter_rows(min_row=2, values_only=True), start=2):
+        if row[0] and str(row[0]) not in filament_rows:
+            try:
+                filament = FilamentData.from_row(row)
+            except Exception as e:
+                continue
+            filament_rows[filament.code] = row_idx
+            sheet_filaments[filament.code] = filament
+
+    # Store the IDs of entries logged before there were IDs, with the next save
+    log_sheet = workbook["Print_Log"]
+    log_sheet.cell(row=1, column=LOG_ID_COLUMN).value = "entry_id"
+    parsed, last_log_id = _parse_print_log(log_sheet.iter_rows(min_row=2, values_only=True))
+    log_rows = {}
+    for row_idx, entry in parsed:
+        id_cell = log_sheet.cell(row=row_idx, column=LOG_ID_COLUMN)
+        if id_cell.value != entry.entry_id:
+            id_cell.value = entry.entry_id
+        log_rows[entry.entry_id] = row_idx
+    return workbook, filament_rows, sheet_filaments, log_rows
+
+
+def _save_to_temp(workbook):
+    """Save the workbook to a temporary file next to the Excel file and return its path"""
+    fd, temp_path = tempfile.mkstemp(suffix=".xlsx", prefix=".filament_data_", dir=os.path.dirname(excel_file))
+    os.close(fd)
+    try:
+        workbook.save(temp_path)
+        if os.path.exists(excel_file):
+            shutil.copymode(excel_file, temp_path)
+    except Exception as e:
+        os.remove(temp_path)
+        raise
+    return temp_path
+
+
+def get_last_write_stats():
+    """Return the WriteStats of the most recent write to the Filament_Data sheet"""
+    return _last_write_stats
+
+
+def get_cache_stats():
+    """Return the workbook cache hit/miss counters"""
+    with _state_lock:
+        return {
+            "hits": _cache.hits,
+            "misses": _cache.misses,
+            "filaments": len(_cache.filaments),
+            "print_log_entries": len(_cache.print_log),
+            "journal_entries": sum(len(record["log"]) for record in _cache.pending),
+            "pending_transactions": len(_cache.pending),
+            "valid": _cache.is_valid()
+        }
+
+
+def invalidate_cache():
+    """Force the next read to reparse the Excel file"""
+    with _state_lock:
+        _cache.invalidate()
+
+
+def set_save_handler(request_save):
+    """Let request_save, e.g. SaveQueue.request_save, save full journal batches
+
+    The application uses this so the Tk thread never saves the workbook. With None, the
+    default, a full batch is folded in right away on the thread that added the entry.
+    """
+    global _save_handler
+    _save_handler = request_save
 
+
+def has_pending_changes():
+    """Check whether there are journaled changes that are not in the workbook yet"""
+    with _state_lock:
+        return bool(_cache.pending)
+
+
+def new_workbook():
+    """Create an empty workbook with the Filament_Data and Print_Log sheets"""
+    workbook = openpyxl.Workbook()
+    
+    # Configure Filaments sheet
+    filaments_sheet = workbook.active
+    filaments_sheet.title = "Filament_Data"
+    headers = ["id", "color", "variant", "supplier", "date_opened", "weight_g", "hex_color", "empty_spool_weight", "description"]
+    filaments_sheet.append(headers)
+    
+    # Set column widths for Filaments sheet
+    for col in range(1, len(headers) + 1):
+        filaments_sheet.column_dimensions[openpyxl.utils.get_column_letter(col)].width = 15
+    
+    # Create and configure Print Log sheet
+    print_log_sheet = workbook.create_sheet("Print_Log")
+    log_headers = ["timestamp", "print_name", "filament_code", "material", "variant", "used_weight", "remaining_weight", "entry_id"]
+    print_log_sheet.append(log_headers)
+    
+    # Set column widths for Print Log sheet
+    for col in range(1, len(log_headers) + 1):
+        print_log_sheet.column_dimensions[openpyxl.utils.get_column_letter(col)].width = 15
+    
+    return workbook
+
+
+@functools.lru_cache(maxsize=None)
+def _color_fill(hex_color):
+    """Return the cell fill used to show a filament's color in the sheet"""
+    return PatternFill(start_color=hex_color.replace('#', ''),
+                       end_color=hex_color.replace('#', ''),
+                       fill_type='solid')
+
+
+def export_workbook(path, filaments, print_log):
+    """Write a complete workbook with the given filaments and print log to path"""
+    with timing_log.timed("export_workbook", file_path=lambda: path) as timing:
+        _export_workbook(path, filaments, print_log)
+        timing["rows"] = len(filaments) + len(print_log)
+
+
+def _export_workbook(path, filaments, print_log):
+    workbook = new_workbook()
+    filaments_sheet = workbook["Filament_Data"]
+    for filament in filaments:
+        filaments_sheet.append(filament.to_row())
+        color_cell = filaments_sheet.cell(row=filaments_sheet.max_row, column=7)
+        if isinstance(filament.hex_color, str) and filament.hex_color.startswith('#'):
+            color_cell.fill = _color_fill(filament.hex_color)
+
+    print_log_sheet = workbook["Print_Log"]
+    for entry in print_log:
+        print_log_sheet.append(entry.to_row())
+
+    workbook.save(path)
+
+
+@_timed("init_excel")
 def init_excel():
     """Initialize the Excel file if it doesn't exist"""
     if not os.path.exists(excel_file):
-        workbook = openpyxl.Workbook()
-        
-        # Configure Filaments sheet
-        filaments_sheet = workbook.active
-        filaments_sheet.title = "Filament_Data"
-        headers = ["id", "color", "variant", "supplier", "date_opened", "weight_g", "hex_color", "empty_spool_weight", "description"]
-        filaments_sheet.append(headers)
-        
-        # Set column widths for Filaments sheet
-        for col in range(1, len(headers) + 1):
-            filaments_sheet.column_dimensions[openpyxl.utils.get_column_letter(col)].width = 15
-        
-        # Create and configure Print Log sheet
-        print_log_sheet = workbook.create_sheet("Print_Log")
-        log_headers = ["timestamp", "print_name", "filament_code", "material", "variant", "used_weight", "remaining_weight"]
-        print_log_sheet.append(log_headers)
-        
-        # Set column widths for Print Log sheet
-        for col in range(1, len(log_headers) + 1):
-            print_log_sheet.column_dimensions[openpyxl.utils.get_column_letter(col)].width = 15
-            
+        workbook = new_workbook()
         workbook.save(excel_file)
+        invalidate_cache()
 
 
+@_timed("copy_workbook")
+def copy_workbook(path):
+    """Copy the Excel file to path after folding the journal into it"""
+    with _write_lock:
+        flush_journal()
+        shutil.copy2(excel_file, path)
+
+
+@_timed("restore_workbook")
+def restore_workbook(backup_path, auto_backup_path):
+    """Replace the Excel file with a backup after copying the current data to auto_backup_path"""
+    with _write_lock:
+        # Make sure the automatic backup includes everything that is still in the journal
+        flush_journal()
+        shutil.copy2(excel_file, auto_backup_path)
+        shutil.copy2(backup_path, excel_file)
+        with _state_lock:
+            if os.path.exists(journal_path()):
+                os.remove(journal_path())
+            _cache.invalidate()
+
+
+@_timed("read_excel_data")
 def read_excel_data():
     """Read filament data from Excel file"""
-    workbook = openpyxl.load_workbook(excel_file)
-    sheet = workbook["Filament_Data"]
-    data = []
+    with _state_lock:
+        cache = _load_cache()
+        timing_log.note(rows=len(cache.filaments))
+        # Hand out copies so callers can modify them without touching the cache
+        return [copy.copy(filament) for filament in cache.filaments]
+
+
+def get_filament(code):
+    """Return a copy of the filament with the given code, or None"""
+    with _state_lock:
+        filament = _load_cache().filaments.get(code)
+        return copy.copy(filament) if filament else None
+
+
+@_timed("get_inventory")
+def get_inventory():
+    """Return an Inventory with copies of all filaments"""
+    with _state_lock:
+        filaments = _load_cache().filaments
+        timing_log.note(rows=len(filaments))
+        return Inventory(copy.copy(filament) for filament in filaments)
+
+
+def _write_row(sheet, row_idx, values, previous_values=None):
+    """Write the cells of a row that differ from previous_values, returns the number of cells written"""
+    written = 0
+    for col_idx, value in enumerate(values, start=1):
+        if previous_values is not None and previous_values[col_idx - 1] == value:
+            continue
+        
+        cell = sheet.cell(row=row_idx, column=col_idx)
+        cell.value = value
+        written += 1
+        
+        # If this is the hex_color column (column 7), set the cell background
+        if col_idx == 7 and isinstance(value, str) and value.startswith('#'):
+            cell.fill = _color_fill(value)
+    return written
+
+
+def _apply_filament_changes(sheet, filaments, filament_rows, sheet_filaments, stats):
+    """Bring the Filament_Data sheet in line with filaments, touching only the rows that changed"""
+    rows = filament_rows
     
-    for row in sheet.iter_rows(min_row=2, values_only=True):
-        if row[0]:  # Skip empty rows
-            try:
-                filament = FilamentData.from_row(row)
-                data.append(filament)
-            except Exception as e:
+    # Compare against the last known state of the sheet, keyed by filament code
+    incoming_codes = {filament.code for filament in filaments}
+    
+    # Delete rows of removed filaments, bottom-up so the other row numbers stay valid
+    removed_rows = sorted(rows.pop(code) for code in list(sheet_filaments)
+                          if code not in incoming_codes and code in rows)
+    for row_idx in reversed(removed_rows):
+        sheet.delete_rows(row_idx)
+        stats.deleted += 1
+    if removed_rows:
+        for code, row_idx in rows.items():
+            rows[code] = row_idx - bisect.bisect_left(removed_rows, row_idx)
+    
+    # Update changed rows in place and append new filaments at the end
+    next_row = max(rows.values(), default=1) + 1
+    for filament in filaments:
+        row_idx = rows.get(filament.code)
+        old_filament = sheet_filaments.get(filament.code)
+        if row_idx is None or old_filament is None:
+            rows[filament.code] = next_row
+            stats.cells_written += _write_row(sheet, next_row, filament.to_row())
+            stats.inserted += 1
+            next_row += 1
+            continue
+        
+        written = _write_row(sheet, row_idx, filament.to_row(), old_filament.to_row())
+        if written:
+            stats.updated += 1
+            stats.cells_written += written
+        else:
+            stats.unchanged += 1
+    
+    return {filament.code: filament for filament in filaments}
+
+
+def _apply_log_rows(sheet, records, log_rows):
+    """Write the print log changes of the records to the Print_Log sheet, returns the number of cells written"""
+    written = 0
+    for record in records:
+        for entry in record["log"]:
+            row_idx = log_rows.get(entry.entry_id)
+            if row_idx is None:
+                row_idx = sheet.max_row + 1
+                log_rows[entry.entry_id] = row_idx
+            for col_idx, value in enumerate(entry.to_row(), start=1):
+                sheet.cell(row=row_idx, column=col_idx).value = value
+                written += 1
+
+        # Clear removed entries but keep their ID, so row numbers stay valid and IDs are never reused
+        for entry_id in record["log_delete"]:
+            row_idx = log_rows.pop(entry_id, None)
+            if row_idx is None:
                 continue
+            for col_idx in range(1, LOG_ID_COLUMN):
+                sheet.cell(row=row_idx, column=col_idx).value = None
+                written += 1
+    return written
+
+
+@_timed("journal_transaction")
+def _stage(upserts, deletes, log_entries, log_deletes=()):
+    """Journal one transaction and apply it to the in-memory data right away"""
+    upserts = [_as_stored(filament) for filament in upserts]
+    if not (upserts or deletes or log_entries or log_deletes):
+        return
+    timing_log.note(rows=len(upserts) + len(deletes) + len(log_entries) + len(log_deletes))
+
+    with _state_lock:
+        cache = _load_cache()
+        # Give new entries the next IDs, so the caller can refer to them afterwards
+        for entry in log_entries:
+            if entry.entry_id is None:
+                cache.last_log_id += 1
+                entry.entry_id = cache.last_log_id
+        record = _new_record(
+            upserts,
+            deletes,
+            [PrintLogEntry.from_row(entry.to_row()) for entry in log_entries],
+            log_deletes
+        )
+        _append_to_journal(record)
+        cache.pending.append(record)
+        _apply_changes(cache.filaments, record["upsert"], record["delete"])
+        _apply_log_changes(cache.print_log, record["log"], record["log_delete"])
+
+
+@_timed("flush_journal")
+def flush_journal():
+    """Fold all journaled changes into the workbook with a single save, returns the WriteStats or None"""
+    global _last_write_stats
+    with _write_lock:
+        with _state_lock:
+            cache = _load_cache()
+            if not cache.pending:
+                return None
+            signature = cache.signature
+            workbook = cache.workbook
+            filament_rows = cache.filament_rows
+            sheet_filaments = cache.sheet_filaments
+            log_rows = cache.log_rows
+    
+        # The slow parts happen without the state lock so readers are never blocked
+        if workbook is None:
+            workbook, filament_rows, sheet_filaments, log_rows = _load_writable_workbook()
+    
+        with _state_lock:
+            if cache.signature != signature or _file_signature() != signature:
+                # The file changed while we were loading; the next flush starts over
+                cache.invalidate()
+                return None
+            cache.workbook = workbook
+            filaments = list(cache.filaments)
+            records = list(cache.pending)
     
-    return data
+        try:
+            stats = WriteStats()
+            sheet_filaments = _apply_filament_changes(
+                workbook["Filament_Data"], filaments, filament_rows, sheet_filaments, stats
+            )
+            stats.cells_written += _apply_log_rows(workbook["Print_Log"], records, log_rows)
+            temp_path = _save_to_temp(workbook)
+        except Exception as e:
+            # The in-memory workbook may now differ from the file, so load it again next time
+            with _state_lock:
+                cache.workbook = None
+            raise
+    
+        with _state_lock:
+            if cache.signature != signature:
+                # Invalidated while saving; the journal still has everything
+                os.remove(temp_path)
+                return None
+
+            # Swap the new file in, so a failed save never leaves a broken workbook
+            os.replace(temp_path, excel_file)
+            cache.signature = _file_signature()
+            cache.filament_rows = filament_rows
+            cache.sheet_filaments = sheet_filaments
+            cache.log_rows = log_rows
+            del cache.pending[:len(records)]
+            _drop_journal_records(len(records))
+            _last_write_stats = stats
+        timing_log.note(rows=stats.inserted + stats.updated + stats.deleted
+                        + sum(len(record["log"]) + len(record["log_delete"]) for record in records))
+        return stats
 
 
+@_timed("write_excel_data")
 def write_excel_data(data):
-    """Write filament data to Excel file"""
-    workbook = openpyxl.load_workbook(excel_file)
-    sheet = workbook["Filament_Data"]
-    
-    # Clear existing data (except headers)
-    for row in range(2, sheet.max_row + 1):
-        for col in range(1, sheet.max_column + 1):
-            sheet.cell(row=row, column=col).value = None
-    
-    # Write new data
-    for row_idx, filament in enumerate(data, start=2):
-        row_data = filament.to_row()
-        for col_idx, value in enumerate(row_data, start=1):
-            cell = sheet.cell(row=row_idx, column=col_idx)
-            cell.value = value
-            
-            # If this is the hex_color column (column 7), set the cell background
-            if col_idx == 7 and isinstance(value, str) and value.startswith('#'):
-                cell.fill = PatternFill(start_color=value.replace('#', ''), 
-                                      end_color=value.replace('#', ''),
-                                      fill_type='solid')
-    
-    try:
-        workbook.save(excel_file)
-    except Exception as e:
-        raise
+    """Write filament data to Excel file, touching only the rows that changed"""
+    with _state_lock:
+        current = {filament.code: filament for filament in _load_cache().filaments}
+    incoming = [_as_stored(filament) for filament in data if filament.code]
+    incoming_codes = {filament.code for filament in incoming}
+    changed = [filament for filament in incoming if current.get(filament.code) != filament]
+    removed = [code for code in current if code not in incoming_codes]
+    timing_log.note(rows=len(changed) + len(removed))
+    _stage(changed, removed, [])
+    return flush_journal() or WriteStats(unchanged=len(incoming))
+
+
+class Transaction:
+    """Filament and print log changes that are stored together"""
 
+    def __init__(self):
+        # Only the changes are kept here, lookups go to the cached inventory
+        self.upserted = {}
+        self.deleted = set()
+        self.log_entries = []
+        self.log_updates = {}
+        self.log_deleted = set()
 
+    def get_filament(self, code):
+        """Return the filament with the given code as it is in this transaction"""
+        if code in self.upserted:
+            return copy.copy(self.upserted[code])
+        if code in self.deleted:
+            return None
+        return get_filament(code)
+
+    def list_filaments(self):
+        """Return all filaments as they are in this transaction"""
+        inventory = get_inventory()
+        _apply_changes(inventory, [copy.copy(filament) for filament in self.upserted.values()], self.deleted)
+        return list(inventory)
+
+    def upsert_filament(self, filament):
+        """Insert a new filament or update the one with the same code"""
+        self.upserted[filament.code] = copy.copy(filament)
+        self.deleted.discard(filament.code)
+
+    def delete_filament(self, code):
+        """Delete the filament with the given code"""
+        self.upserted.pop(code, None)
+        self.deleted.add(code)
+
+    def append_log_entry(self, entry):
+        """Add an entry to the print log, it gets its entry_id when the transaction is stored"""
+        self.log_entries.append(entry)
+
+    def get_log_entry(self, entry_id):
+        """Return the print log entry with the given ID as it is in this transaction"""
+        if entry_id in self.log_updates:
+            return copy.copy(self.log_updates[entry_id])
+        if entry_id in self.log_deleted:
+            return None
+        return get_log_entry(entry_id)
+
+    def update_log_entry(self, entry):
+        """Replace the print log entry that has the same entry_id"""
+        self.log_updates[entry.entry_id] = copy.copy(entry)
+        self.log_deleted.discard(entry.entry_id)
+
+    def delete_log_entry(self, entry_id):
+        """Remove the print log entry with the given ID"""
+        self.log_updates.pop(entry_id, None)
+        self.log_deleted.add(entry_id)
+
+
+@contextlib.contextmanager
+def transaction(defer=False):
+    """Collect changes in a Transaction and store them when the block succeeds
+
+    The changes are journaled as one record and applied in memory at once. Without
+    defer they are folded into the workbook with a single save before returning;
+    with defer that is left to the next flush_journal() call.
+    """
+    pending = Transaction()
+    yield pending
+    _stage(
+        pending.upserted.values(),
+        pending.deleted,
+        list(pending.log_updates.values()) + pending.log_entries,
+        pending.log_deleted
+    )
+    if not defer:
+        flush_journal()
+
+
+@_timed("add_print_log_entry")
 def add_print_log_entry(timestamp, print_name, filament_code, material, variant, used_weight, remaining_weight):
     """Add a new entry to the print log"""
-    workbook = openpyxl.load_workbook(excel_file)
-    sheet = workbook["Print_Log"]
-    
     # Create PrintLogEntry
     entry = PrintLogEntry(
         timestamp=timestamp,
@@ -98,20 +803,45 @@ def add_print_log_entry(timestamp, print_name, filament_code, material, variant,
         remaining_weight=remaining_weight
     )
     
-    # Add new row
-    sheet.append(entry.to_row())
-    workbook.save(excel_file)
+    # Write the entry to the journal instead of saving the whole workbook
+    timing_log.note(rows=1)
+    _stage([], [], [entry])
+    
+    with _state_lock:
+        batch_full = len(_cache.pending) >= JOURNAL_BATCH_SIZE
+    if batch_full:
+        save_handler = _save_handler
+        if save_handler is not None:
+            save_handler()
+        else:
+            flush_journal()
+    return entry.entry_id
 
 
-def read_print_log():
-    """Read all entries from the print log"""
-    workbook = openpyxl.load_workbook(excel_file)
-    sheet = workbook["Print_Log"]
-    log_entries = []
-    for row in sheet.iter_rows(min_row=2, values_only=True):
-        if row[0]:  # Skip empty rows
-            log_entries.append(PrintLogEntry.from_row(row))
-    return log_entries
+@_timed("read_print_log")
+def read_print_log(filament_code=None):
+    """Read all entries from the print log, or only those of one filament"""
+    with _state_lock:
+        cache = _load_cache()
+        entries = cache.print_log if filament_code is None else cache.print_log.by_filament(filament_code)
+        timing_log.note(rows=len(entries))
+        return [copy.copy(entry) for entry in entries]
+
+
+@_timed("read_print_log_page")
+def read_print_log_page(limit, before_id=None):
+    """Read up to limit entries older than before_id from the print log, newest first"""
+    with _state_lock:
+        entries = _load_cache().print_log.newest(limit, before_id)
+        timing_log.note(rows=len(entries))
+        return [copy.copy(entry) for entry in entries]
+
+
+def get_log_entry(entry_id):
+    """Return a copy of the print log entry with the given ID, or None"""
+    with _state_lock:
+        entry = _load_cache().print_log.get(entry_id)
+        return copy.copy(entry) if entry else None
 
 
 def get_next_code(data):
@@ -0,0 +1,10 @@
+import os
+
+# Stall logs, profiles and timing logs are written here, next to the data files
+diagnostics_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "diagnostics")
+
+
+def diagnostics_path(filename):
+    """Return the path of a file in the diagnostics folder, creating the folder if needed"""
+    os.makedirs(diagnostics_directory, exist_ok=True)
+    return os.path.join(diagnostics_directory, filename)
\ No newline at end of file
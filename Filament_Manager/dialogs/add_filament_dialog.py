@@ -3,9 +3,9 @@ from tkinter import colorchooser, messagebox
 from tkcalendar import DateEntry
 
 from Filament_Manager.ui_components import ColorPreviewCanvas
-from Filament_Manager.data_operations import get_next_code, read_excel_data, write_excel_data
+from Filament_Manager.storage import get_repository
 from Filament_Manager.models import FilamentData
-from Filament_Manager.report_generator import generate_filament_label
+from Filament_Manager.reports import generate_filament_label
 
 
 class AddFilamentDialog(ctk.CTkToplevel):
@@ -235,11 +235,10 @@ class AddFilamentDialog(ctk.CTkToplevel):
             return
 
         try:
-            # Read existing data
-            data = read_excel_data()
+            repository = get_repository()
             
             # Generate next available code
-            code = get_next_code(data)
+            code = repository.next_filament_code()
             
             # Create new FilamentData object
             new_filament = FilamentData(
@@ -254,12 +253,13 @@ class AddFilamentDialog(ctk.CTkToplevel):
                 description=description
             )
             
-            # Add to data and write back to Excel
-            data.append(new_filament)
-            write_excel_data(data)
+            # Add to storage, the save itself happens in the background
+            with repository.transaction(defer=True) as transaction:
+                transaction.upsert_filament(new_filament)
+            self.master.request_save()
 
-            # Refresh the main window's display
-            self.master.refresh_data()
+            # Add the new filament to the main window's overview
+            self.master.update_filament_row(code)
             
             # Show success message
             messagebox.showinfo("Success", f"New filament {code} added successfully!")
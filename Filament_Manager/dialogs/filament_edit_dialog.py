@@ -6,7 +6,7 @@ import os
 import tempfile
 
 from Filament_Manager.ui_components import ColorPreviewCanvas
-from Filament_Manager.report_generator import generate_filament_label
+from Filament_Manager.reports import generate_filament_label
 from Filament_Manager.models import FilamentData
 
 
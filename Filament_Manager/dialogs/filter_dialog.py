@@ -2,8 +2,8 @@ import customtkinter as ctk
 from tkinter import ttk, messagebox
 import random
 
-from Filament_Manager.ui_components import configure_treeview_style, create_circle_image
-from Filament_Manager.data_operations import read_excel_data
+from Filament_Manager.ui_components import configure_treeview_style, get_swatch_image
+from Filament_Manager.storage import get_repository
 
 
 class FilterRecommendationsDialog(ctk.CTkToplevel):
@@ -17,11 +17,11 @@ class FilterRecommendationsDialog(ctk.CTkToplevel):
         self.transient(parent)
         self.grab_set()
         
-        # Store color images
-        self.color_images = {}
+        # Swatch images shown in the results, kept referenced while the dialog is open
+        self.row_images = []
         
-        # Load filament data
-        self.filament_data = read_excel_data()
+        # Load filament data, indexed by code, material and supplier
+        self.filament_data = get_repository().inventory()
         
         # Create the form
         self.create_form()
@@ -49,7 +49,7 @@ class FilterRecommendationsDialog(ctk.CTkToplevel):
         ctk.CTkLabel(criteria_frame, text="Material type:").grid(row=0, column=0, padx=10, pady=10, sticky="w")
         
         # Get unique materials
-        materials = sorted(set(f.material for f in self.filament_data))
+        materials = self.filament_data.materials()
         
         # Add default option
         self.material_var = ctk.StringVar(value="All Materials")
@@ -117,7 +117,10 @@ class FilterRecommendationsDialog(ctk.CTkToplevel):
         
         # Create treeview for displaying results
         columns = ("material", "variant", "supplier", "weight", "suitability")
-        self.tree = ttk.Treeview(results_frame, columns=columns, show="headings", selectmode="browse")
+        self.tree = ttk.Treeview(results_frame, columns=columns, show="tree headings", selectmode="browse")
+        
+        # Tree column for the color circles
+        self.tree.column("#0", width=30, anchor="center", stretch=False)
         
         # Configure columns
         self.tree.heading("material", text="Material")
@@ -173,9 +176,8 @@ class FilterRecommendationsDialog(ctk.CTkToplevel):
     def get_unique_suppliers(self):
         """Get list of unique suppliers from the database"""
         try:
-            data = read_excel_data()
-            suppliers = sorted(set(filament.supplier for filament in data))
-            return ["Select supplier"] + list(suppliers)  # Add default option
+            suppliers = self.filament_data.suppliers()
+            return ["Select supplier"] + suppliers  # Add default option
         except Exception as e:
             print(f"Error getting suppliers: {str(e)}")
             return ["Select supplier"]
@@ -199,11 +201,20 @@ class FilterRecommendationsDialog(ctk.CTkToplevel):
             # Clear existing items in the treeview
             for item in self.tree.get_children():
                 self.tree.delete(item)
+            self.row_images = []
                 
             # Filter the filaments
             filtered_results = []
             
-            for filament in self.filament_data:
+            # Start from the material or supplier index instead of scanning every spool
+            if material_filter != "All Materials":
+                candidates = self.filament_data.by_material(material_filter)
+            elif supplier_filter != "All Suppliers":
+                candidates = self.filament_data.by_supplier(supplier_filter)
+            else:
+                candidates = self.filament_data
+            
+            for filament in candidates:
                 # Apply material filter
                 if material_filter != "All Materials" and filament.material != material_filter:
                     continue
@@ -242,8 +253,12 @@ class FilterRecommendationsDialog(ctk.CTkToplevel):
                 else:
                     suitability_str = "★☆☆☆☆ Poor"
                 
+                # Get the color image from the shared swatch cache
+                color_image = get_swatch_image(filament.hex_color)
+                self.row_images.append(color_image)
+                
                 # Insert into treeview
-                self.tree.insert("", "end", values=(
+                self.tree.insert("", "end", text="", image=color_image, values=(
                     filament.material,
                     filament.variant,
                     filament.supplier,
@@ -300,11 +315,7 @@ class FilterRecommendationsDialog(ctk.CTkToplevel):
         filament_code = self.tree.item(item, "tags")[0]
         
         # Find the filament data
-        selected_filament = None
-        for filament in self.filament_data:
-            if filament.code == filament_code:
-                selected_filament = filament
-                break
+        selected_filament = self.filament_data.get(filament_code)
         
         if selected_filament:
             # Show detailed information
@@ -2,7 +2,8 @@ import customtkinter as ctk
 from tkinter import messagebox
 from datetime import datetime
 
-from Filament_Manager.data_operations import read_excel_data, write_excel_data, read_print_log, add_print_log_entry
+from Filament_Manager.storage import get_repository
+from Filament_Manager.balances import SpoolLedger
 
 
 class PrintHistoryEditDialog(ctk.CTkToplevel):
@@ -168,47 +169,35 @@ class PrintHistoryEditDialog(ctk.CTkToplevel):
     def remove(self):
         """Handle removal of a print history entry"""
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this print history entry?"):
-            # Get current timestamp (serves as unique ID)
-            timestamp = self.print_data.get("timestamp", "")
-            filament_code = self.print_data.get("filament_code", "")
+            # The entry ID identifies the entry, even with several prints in the same minute
+            entry_id = self.print_data.get("entry_id")
             
             try:
-                # Get all log entries
-                log_entries = read_print_log()
-                
-                # Get the corresponding entry from the log
-                target_entry = None
-                for entry in log_entries:
-                    if entry.timestamp == timestamp and entry.filament_code == filament_code:
-                        target_entry = entry
-                        break
+                # Get the entry from the log
+                repository = get_repository()
+                target_entry = repository.get_log_entry(entry_id)
                         
                 if target_entry:
-                    # Update filament weight (add the used weight back)
-                    filaments = read_excel_data()
-                    for filament in filaments:
-                        if filament.code == filament_code:
-                            # Add the used weight back to filament
-                            filament.weight += target_entry.used_weight
-                            write_excel_data(filaments)
-                            break
-                    
-                    # Remove from log entries
-                    log_entries = [entry for entry in log_entries if not (
-                        entry.timestamp == timestamp and entry.filament_code == filament_code
-                    )]
-                    
-                    # Write updated log entries (we need to re-add them all)
-                    # This is a bit inefficient but ensures proper handling
+                    # Later prints on this spool now have more filament left
+                    ledger = SpoolLedger(repository.query_log(filament_code=target_entry.filament_code))
+                    changed_entries = ledger.remove(entry_id)
                     
-                    # First, clear the existing print log
-                    # This would require modifying the data_operations to add a function
-                    # but for now we'll just update the parent UI
+                    # Add the used weight back to the filament and remove the entry together
+                    with repository.transaction(defer=True) as transaction:
+                        filament = transaction.get_filament(target_entry.filament_code)
+                        if filament:
+                            filament.weight += target_entry.used_weight
+                            transaction.upsert_filament(filament)
+                        transaction.delete_log_entry(entry_id)
+                        for entry in changed_entries:
+                            transaction.update_log_entry(entry)
+                    self.parent.request_save()
                     
                     self.result = {"action": "delete"}
                     self.destroy()
-                    self.parent.refresh_data()
-                    self.parent.load_print_history()
+                    self.parent.update_filament_row(target_entry.filament_code)
+                    self.parent.remove_history_row(entry_id)
+                    self.parent.update_history_rows(changed_entries)
                     
                     messagebox.showinfo("Entry Removed", "Print history entry successfully removed.")
                 else:
@@ -233,19 +222,9 @@ class PrintHistoryEditDialog(ctk.CTkToplevel):
                 messagebox.showerror("Invalid Weight", str(e))
                 return
                 
-            # Get original entry data
-            timestamp = self.print_data.get("timestamp", "")
-            filament_code = self.print_data.get("filament_code", "")
-            
-            # Get the print log entries
-            log_entries = read_print_log()
-            
-            # Find the entry we're editing
-            old_entry = None
-            for entry in log_entries:
-                if entry.timestamp == timestamp and entry.filament_code == filament_code:
-                    old_entry = entry
-                    break
+            # Find the entry we're editing by its ID
+            repository = get_repository()
+            old_entry = repository.get_log_entry(self.print_data.get("entry_id"))
                     
             if not old_entry:
                 messagebox.showerror("Error", "Entry not found in print log.")
@@ -254,29 +233,36 @@ class PrintHistoryEditDialog(ctk.CTkToplevel):
             # Calculate weight difference
             weight_diff = old_entry.used_weight - used_weight
             
-            # Update the filament weight
-            filaments = read_excel_data()
-            
-            for filament in filaments:
-                if filament.code == filament_code:
+            # Update the filament weight and the entry together
+            with repository.transaction(defer=True) as transaction:
+                filament = transaction.get_filament(old_entry.filament_code)
+                if filament:
                     # Add the weight difference (positive if we're using less than before)
                     filament.weight += weight_diff
-                    remaining_weight = filament.weight
                     
-                    # Update the filament in Excel
-                    write_excel_data(filaments)
+                    # Update the filament in storage
+                    transaction.upsert_filament(filament)
                     
-                    # Create a new log entry to replace the old one
-                    # We'll need to remove the old one and add the new one
-                    
-                    # For now, we'll just update the parent's UI
-                    self.result = {"action": "save"}
-                    self.destroy()
-                    self.parent.refresh_data()
-                    self.parent.load_print_history()
-                    
-                    messagebox.showinfo("Entry Updated", "Print history entry successfully updated.")
-                    return
+                    # Update the entry and the remaining weight of the later prints on this spool
+                    ledger = SpoolLedger(repository.query_log(filament_code=old_entry.filament_code))
+                    edited_entry = ledger.get(old_entry.entry_id)
+                    edited_entry.print_name = print_name
+                    changed_entries = ledger.update_used_weight(old_entry.entry_id, used_weight)
+                    if edited_entry not in changed_entries:
+                        changed_entries.append(edited_entry)
+                    for entry in changed_entries:
+                        transaction.update_log_entry(entry)
+            
+            if filament:
+                self.parent.request_save()
+                
+                self.result = {"action": "save"}
+                self.destroy()
+                self.parent.update_filament_row(old_entry.filament_code)
+                self.parent.update_history_rows(changed_entries)
+                
+                messagebox.showinfo("Entry Updated", "Print history entry successfully updated.")
+                return
                     
             messagebox.showerror("Error", "Filament not found.")
                 
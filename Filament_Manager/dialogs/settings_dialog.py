@@ -1,11 +1,13 @@
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
-import os
-import shutil
 import webbrowser
 from datetime import datetime
 
-from Filament_Manager.report_generator import generate_inventory_report
+from Filament_Manager.reports import generate_inventory_report
+from Filament_Manager.storage import get_repository, migrate_to_sqlite, export_to_excel, SqliteRepository
+from Filament_Manager.balances import recompute_repository_balances
+from Filament_Manager.profiling import profiling_enabled, enable_profiling, disable_profiling
+from Filament_Manager.diagnostics import diagnostics_directory
 
 
 class SettingsDialog(ctk.CTkToplevel):
@@ -13,7 +15,7 @@ class SettingsDialog(ctk.CTkToplevel):
         super().__init__(parent)
         
         self.title("Settings")
-        self.geometry("550x750")
+        self.geometry("550x900")
         
         # Make dialog modal
         self.transient(parent)
@@ -26,8 +28,8 @@ class SettingsDialog(ctk.CTkToplevel):
         self.create_form()
 
     def create_form(self):
-        # Main content frame
-        content_frame = ctk.CTkFrame(self)
+        # Main content frame, scrollable so all sections fit on smaller screens
+        content_frame = ctk.CTkScrollableFrame(self)
         content_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
         # Title
@@ -124,6 +126,115 @@ class SettingsDialog(ctk.CTkToplevel):
         )
         restore_button.pack(pady=10, padx=20)
         
+        # Storage section
+        storage_frame = ctk.CTkFrame(content_frame)
+        storage_frame.pack(fill="x", pady=10)
+        
+        storage_label = ctk.CTkLabel(
+            storage_frame,
+            text="Storage",
+            font=("Roboto", 16, "bold")
+        )
+        storage_label.pack(anchor="w", padx=10, pady=(10, 5))
+        
+        repository = get_repository()
+        backend_label = ctk.CTkLabel(
+            storage_frame,
+            text=f"Backend: {repository.name}",
+            font=("Roboto", 12)
+        )
+        backend_label.pack(anchor="w", padx=20, pady=2)
+        
+        if isinstance(repository, SqliteRepository):
+            # Export button
+            storage_button = ctk.CTkButton(
+                storage_frame,
+                text="Export to Excel",
+                command=self.export_excel,
+                width=200,
+                fg_color="#2196F3",
+                hover_color="#1976D2"
+            )
+        else:
+            # Migrate button
+            storage_button = ctk.CTkButton(
+                storage_frame,
+                text="Migrate to SQLite Database",
+                command=self.migrate_storage,
+                width=200,
+                fg_color="#2196F3",
+                hover_color="#1976D2"
+            )
+        storage_button.pack(pady=10, padx=20)
+        
+        # Recompute balances button
+        balances_button = ctk.CTkButton(
+            storage_frame,
+            text="Recompute Remaining Weights",
+            command=self.recompute_balances,
+            width=200
+        )
+        balances_button.pack(pady=(0, 5), padx=20)
+        
+        balances_label = ctk.CTkLabel(
+            storage_frame,
+            text="Rewrites the remaining weight of every print, weight\ncorrections made between prints are lost",
+            font=("Roboto", 12),
+            justify="left",
+            wraplength=450
+        )
+        balances_label.pack(padx=20, pady=(0, 10))
+        
+        # Diagnostics section
+        diagnostics_frame = ctk.CTkFrame(content_frame)
+        diagnostics_frame.pack(fill="x", pady=10)
+        
+        diagnostics_label = ctk.CTkLabel(
+            diagnostics_frame,
+            text="Diagnostics",
+            font=("Roboto", 16, "bold")
+        )
+        diagnostics_label.pack(anchor="w", padx=10, pady=(10, 5))
+        
+        # Watchdog switch, stalls are logged to diagnostics/stalls.log
+        self.watchdog_var = ctk.BooleanVar(value=self.parent.watchdog.running)
+        watchdog_switch = ctk.CTkSwitch(
+            diagnostics_frame,
+            text="Log UI freezes",
+            variable=self.watchdog_var,
+            command=self.toggle_watchdog
+        )
+        watchdog_switch.pack(anchor="w", padx=20, pady=5)
+        
+        # Summary of the recent stalls
+        self.stalls_label = ctk.CTkLabel(
+            diagnostics_frame,
+            text="",
+            font=("Roboto", 12),
+            justify="left"
+        )
+        self.stalls_label.pack(anchor="w", padx=20, pady=(0, 10))
+        self.update_stall_summary()
+        
+        # Profiling switch, profiles of the slow operations go to the diagnostics folder
+        self.profiling_var = ctk.BooleanVar(value=profiling_enabled())
+        profiling_switch = ctk.CTkSwitch(
+            diagnostics_frame,
+            text="Profile operations",
+            variable=self.profiling_var,
+            command=self.toggle_profiling
+        )
+        profiling_switch.pack(anchor="w", padx=20, pady=5)
+        
+        profiling_label = ctk.CTkLabel(
+            diagnostics_frame,
+            text=f"Startup, refresh, usage register, save, report and label\nprofiles are written to {diagnostics_directory}",
+            font=("Roboto", 12),
+            justify="left",
+            wraplength=450
+        )
+        profiling_label.pack(anchor="w", padx=20, pady=(0, 10))
+        
         # About section
         about_frame = ctk.CTkFrame(content_frame)
         about_frame.pack(fill="x", pady=10)
@@ -186,9 +297,27 @@ class SettingsDialog(ctk.CTkToplevel):
 
     def change_appearance(self, new_appearance_mode):
         """Change the appearance mode (Light/Dark)"""
-        ctk.set_appearance_mode(new_appearance_mode.lower())
         self.parent.change_appearance_mode(new_appearance_mode)
 
+    def toggle_watchdog(self):
+        """Start or stop logging UI freezes"""
+        if self.watchdog_var.get():
+            self.parent.watchdog.start()
+        else:
+            self.parent.watchdog.stop()
+        self.update_stall_summary()
+
+    def toggle_profiling(self):
+        """Start or stop profiling the named operations"""
+        if self.profiling_var.get():
+            enable_profiling()
+        else:
+            disable_profiling()
+
+    def update_stall_summary(self):
+        """Show the recent stalls recorded by the watchdog"""
+        self.stalls_label.configure(text="\n".join(self.parent.watchdog.summary_lines()))
+
     def create_backup(self):
         """Create a backup of the Excel files"""
         try:
@@ -205,11 +334,8 @@ class SettingsDialog(ctk.CTkToplevel):
             )
             
             if backup_path:
-                # Get the directory of the current script
-                current_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-                
-                # Copy the Excel file to the backup location
-                shutil.copy2(os.path.join(current_dir, "filament_data.xlsx"), backup_path)
+                # Write the backup from the active storage backend
+                get_repository().create_backup(backup_path)
                 
                 messagebox.showinfo(
                     "Backup Created",
@@ -237,20 +363,8 @@ class SettingsDialog(ctk.CTkToplevel):
                     "This will replace your current data with the backup data.\n" +
                     "Are you sure you want to continue?"
                 ):
-                    # Get the directory of the current script
-                    current_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-                    target_path = os.path.join(current_dir, "filament_data.xlsx")
-                    
-                    # Create a backup of the current file first
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    auto_backup_path = os.path.join(
-                        current_dir,
-                        f"filament_data_auto_backup_{timestamp}.xlsx"
-                    )
-                    shutil.copy2(target_path, auto_backup_path)
-                    
-                    # Copy the backup file to the current location
-                    shutil.copy2(backup_path, target_path)
+                    # Replace the current data, keeping an automatic backup of it first
+                    auto_backup_path = get_repository().restore_backup(backup_path)
                     
                     messagebox.showinfo(
                         "Restore Complete",
@@ -258,10 +372,92 @@ class SettingsDialog(ctk.CTkToplevel):
                         f"A backup of your previous data was created at:\n{auto_backup_path}"
                     )
                     
-                    # Refresh the display
+                    # Refresh the display, the backup has its own print history
                     self.parent.refresh_data()
+                    self.parent.load_print_history()
         except Exception as e:
             messagebox.showerror(
                 "Restore Error",
                 f"Failed to restore backup:\n{str(e)}"
-            ) 
\ No newline at end of file
+            ) 
+
+    def migrate_storage(self):
+        """Import the Excel data into a SQLite database and use it from now on"""
+        if not messagebox.askyesno(
+            "Migrate Storage",
+            "This will import all data from the Excel file into a SQLite database,\n" +
+            "which will be used for all changes from now on.\n" +
+            "You can export it back to Excel at any time.\n\n" +
+            "Do you want to continue?"
+        ):
+            return
+        
+        try:
+            migrate_to_sqlite()
+            
+            messagebox.showinfo(
+                "Migration Complete",
+                "Your data has been imported into the SQLite database."
+            )
+            
+            # Refresh the display from the new backend
+            self.parent.refresh_data()
+            self.parent.load_print_history()
+            self.destroy()
+        except Exception as e:
+            messagebox.showerror(
+                "Migration Error",
+                f"Failed to migrate to SQLite:\n{str(e)}"
+            )
+
+    def recompute_balances(self):
+        """Recompute the remaining weight of every print log entry"""
+        if not messagebox.askyesno(
+            "Recompute Remaining Weights",
+            "This recalculates the remaining weight shown for every print from the remaining " +
+            "weight after the spool's latest print and the weight used by the prints in between.\n\n" +
+            "The history of every spool is rewritten: weight corrections made between two " +
+            "prints are lost.\n\n" +
+            "Do you want to continue?"
+        ):
+            return
+        
+        try:
+            # Saved by the save queue, so the window stays responsive on a long log
+            updated = recompute_repository_balances(get_repository(), defer=True)
+            if updated:
+                self.parent.request_save()
+            self.parent.load_print_history()
+            messagebox.showinfo(
+                "Recompute Complete",
+                f"Updated the remaining weight of {updated} print(s)."
+            )
+        except Exception as e:
+            messagebox.showerror(
+                "Recompute Error",
+                f"Failed to recompute remaining weights:\n{str(e)}"
+            )
+
+    def export_excel(self):
+        """Export the SQLite database to an Excel file"""
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            export_path = filedialog.asksaveasfilename(
+                defaultextension=".xlsx",
+                filetypes=[("Excel files", "*.xlsx")],
+                initialfile=f"filament_data_export_{timestamp}.xlsx",
+                title="Export to Excel"
+            )
+            
+            if export_path:
+                export_to_excel(get_repository(), export_path)
+                
+                messagebox.showinfo(
+                    "Export Complete",
+                    f"Data successfully exported to:\n{export_path}"
+                )
+        except Exception as e:
+            messagebox.showerror(
+                "Export Error",
+                f"Failed to export data:\n{str(e)}"
+            )
\ No newline at end of file
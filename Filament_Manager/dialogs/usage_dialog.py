@@ -1,10 +1,11 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox
 from datetime import datetime
-from PIL import Image, ImageTk, ImageDraw
 
-from Filament_Manager.ui_components import configure_treeview_style
-from Filament_Manager.data_operations import read_excel_data, write_excel_data, add_print_log_entry
+from Filament_Manager.ui_components import configure_treeview_style, get_swatch_image
+from Filament_Manager.storage import get_repository
+from Filament_Manager.models import PrintLogEntry
+from Filament_Manager.profiling import profile_operation
 
 
 class FilamentUsageDialog(ctk.CTkToplevel):
@@ -14,8 +15,8 @@ class FilamentUsageDialog(ctk.CTkToplevel):
         self.title("Register Filament Usage")
         self.geometry("600x700")  # Increased from 500x600
         
-        # Store color images
-        self.color_images = {}
+        # Swatch images shown in the tree, kept referenced while the dialog is open
+        self.row_images = []
         
         # Make dialog modal
         self.transient(parent)
@@ -131,41 +132,20 @@ class FilamentUsageDialog(ctk.CTkToplevel):
         # Initial update of the filament list
         self.update_filament_list()
 
-    def create_circle_image(self, hex_color, size=16):
-        """Create a circle image for the color preview"""
-        if hex_color in self.color_images:
-            return self.color_images[hex_color]
-            
-        # Create a higher resolution image for better anti-aliasing
-        scale = 4  # Scale factor for anti-aliasing
-        img = Image.new("RGBA", (size * scale, size * scale), (255, 255, 255, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # Draw a larger circle with anti-aliasing
-        padding = scale  # Add padding for smoother edges
-        draw.ellipse((padding, padding, size * scale - padding, size * scale - padding), 
-                     fill=hex_color)
-        
-        # Resize the image down to the desired size with anti-aliasing
-        img = img.resize((size, size), Image.Resampling.LANCZOS)
-        
-        # Convert to PhotoImage and store
-        photo_image = ImageTk.PhotoImage(img)
-        self.color_images[hex_color] = photo_image
-        return photo_image
-
     def update_filament_list(self):
         """Update the list of available filaments in the treeview"""
         # Clear existing items
         for item in self.filament_tree.get_children():
             self.filament_tree.delete(item)
+        self.row_images = []
         
-        data = read_excel_data()
+        data = get_repository().list_filaments()
         
         for filament in data:
             try:
-                # Create color image
-                color_image = self.create_circle_image(filament.hex_color)
+                # Get the color image from the shared swatch cache
+                color_image = get_swatch_image(filament.hex_color)
+                self.row_images.append(color_image)
                 
                 # Format weight
                 weight_str = f"{filament.weight:,.0f}g"
@@ -233,15 +213,9 @@ class FilamentUsageDialog(ctk.CTkToplevel):
         item = selection[0]
         code = self.filament_tree.item(item)["tags"][0]  # Get code from tags
         
-        # Read data
-        data = read_excel_data()
-        selected_filament = None
-        
         # Find the filament and check weight
-        for filament in data:
-            if filament.code == code:
-                selected_filament = filament
-                break
+        repository = get_repository()
+        selected_filament = repository.get_filament(code)
 
         if not selected_filament:
             messagebox.showerror("Error", "Selected filament not found.")
@@ -253,32 +227,35 @@ class FilamentUsageDialog(ctk.CTkToplevel):
             return
 
         # Update the filament weight
-        for filament in data:
-            if filament.code == code:
-                new_weight = filament.weight - required_weight
-                filament.weight = new_weight
-                break
-
-        # Write back to Excel
-        write_excel_data(data)
+        new_weight = selected_filament.weight - required_weight
+        selected_filament.weight = new_weight
 
         # Get current timestamp
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
 
-        # Add to print log in Excel
-        add_print_log_entry(
-            current_time,
-            print_name,
-            code,
-            selected_filament.material,
-            selected_filament.variant,
-            required_weight,
-            new_weight
-        )
+        with profile_operation("usage register"):
+            # Store the new weight and the print log entry together
+            try:
+                with repository.transaction(defer=True) as transaction:
+                    transaction.upsert_filament(selected_filament)
+                    entry = PrintLogEntry(
+                        timestamp=current_time,
+                        print_name=print_name,
+                        filament_code=code,
+                        material=selected_filament.material,
+                        variant=selected_filament.variant,
+                        used_weight=required_weight,
+                        remaining_weight=new_weight
+                    )
+                    transaction.append_log_entry(entry)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to register print: {str(e)}")
+                return
 
-        # Refresh the main window's displays
-        self.master.refresh_data()  # Refresh filament display
-        self.master.load_print_history()  # Reload print history
+            # Update only the changed rows of the main window
+            self.master.update_filament_row(code)  # Update the spool's weight
+            self.master.add_history_row(entry)  # Show the new print at the top
+            self.master.request_save()  # Save to storage in the background
 
         messagebox.showinfo("Print Registered", 
                           f"Print '{print_name}' registered!\n{required_weight:,.0f}g filament used.")
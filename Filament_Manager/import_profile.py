@@ -0,0 +1,112 @@
+import sys
+import time
+import importlib.abc
+
+# Modules that must only be imported when a report, label or balance recompute needs them
+LAZY_MODULES = ("reportlab", "qrcode", "barcode", "pandas")
+
+
+class _TimedLoader:
+    """Wraps a module loader and reports how long executing each module takes"""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.start(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.stop()
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Records the self and cumulative import time of every module imported while installed"""
+
+    def __init__(self):
+        self.timings = {}  # module name -> (self seconds, cumulative seconds)
+        self._stack = []
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        # Let the other finders locate the module, then time its loader
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self)
+            return spec
+        return None
+
+    def start(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def stop(self):
+        name, started, children = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self.timings[name] = (elapsed - children, elapsed)
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def report(self, limit=25, file=None):
+        """Print the slowest imports and the time per top-level package"""
+        file = file or sys.stdout
+        packages = {}
+        for name, (self_time, cumulative) in self.timings.items():
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0.0) + self_time
+        total = sum(packages.values())
+
+        print(f"Import time: {total * 1000:.1f} ms for {len(self.timings)} modules", file=file)
+        print("", file=file)
+        print(f"{'package':<30} {'self ms':>10}", file=file)
+        for package, self_time in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]:
+            print(f"{package:<30} {self_time * 1000:>10.1f}", file=file)
+
+        print("", file=file)
+        print(f"{'module':<50} {'self ms':>10} {'cumulative ms':>14}", file=file)
+        slowest = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        for name, (self_time, cumulative) in slowest:
+            print(f"{name:<50} {self_time * 1000:>10.1f} {cumulative * 1000:>14.1f}", file=file)
+
+    def eager_lazy_modules(self):
+        """Return the lazy-only packages that were imported anyway"""
+        return sorted({name.split(".")[0] for name in self.timings} & set(LAZY_MODULES))
+
+
+def profile_startup_imports(import_startup_modules):
+    """Time the imports done by import_startup_modules(), print a breakdown and return an exit code
+
+    The exit code is 1 when one of LAZY_MODULES was imported during startup, so a
+    regression can be caught by running main.py --profile-imports in a build script.
+    """
+    profiler = ImportProfiler()
+    profiler.install()
+    try:
+        import_startup_modules()
+    finally:
+        profiler.uninstall()
+
+    profiler.report()
+    eager = profiler.eager_lazy_modules()
+    if eager:
+        print("", file=sys.stderr)
+        print(f"Warning: imported at startup but should load on first use: {', '.join(eager)}", file=sys.stderr)
+        return 1
+    return 0
\ No newline at end of file
@@ -1,3 +1,4 @@
+import bisect
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
@@ -54,6 +55,7 @@ class PrintLogEntry:
     variant: str
     used_weight: float
     remaining_weight: float
+    entry_id: Optional[int] = None  # Unique and never reused, assigned when the entry is stored
 
     @classmethod
     def from_row(cls, row):
@@ -65,7 +67,8 @@ class PrintLogEntry:
             material=str(row[3]),
             variant=str(row[4]),
             used_weight=float(row[5]) if row[5] is not None else 0,
-            remaining_weight=float(row[6]) if row[6] is not None else 0
+            remaining_weight=float(row[6]) if row[6] is not None else 0,
+            entry_id=int(row[7]) if len(row) > 7 and isinstance(row[7], (int, float)) else None
         )
 
     def to_row(self):
@@ -77,5 +80,136 @@ class PrintLogEntry:
             self.material,
             self.variant,
             self.used_weight,
-            self.remaining_weight
-        ] 
\ No newline at end of file
+            self.remaining_weight,
+            self.entry_id
+        ] 
+
+
+class Inventory:
+    """Filaments indexed by code, with secondary indexes by material and supplier"""
+
+    def __init__(self, filaments=()):
+        self._by_code = {}
+        self._by_material = {}
+        self._by_supplier = {}
+        for filament in filaments:
+            self.upsert(filament)
+
+    def __len__(self):
+        return len(self._by_code)
+
+    def __iter__(self):
+        return iter(self._by_code.values())
+
+    def __contains__(self, code):
+        return code in self._by_code
+
+    def get(self, code):
+        """Return the filament with the given code, or None"""
+        return self._by_code.get(code)
+
+    def codes(self):
+        """Return the filament codes in insertion order"""
+        return list(self._by_code)
+
+    def upsert(self, filament):
+        """Add a filament or replace the one with the same code, keeping its position"""
+        old_filament = self._by_code.get(filament.code)
+        if old_filament is not None:
+            self._unindex(old_filament)
+        self._by_code[filament.code] = filament
+        self._by_material.setdefault(filament.material, {})[filament.code] = filament
+        self._by_supplier.setdefault(filament.supplier, {})[filament.code] = filament
+
+    def remove(self, code):
+        """Remove the filament with the given code and return it, or None if it does not exist"""
+        filament = self._by_code.pop(code, None)
+        if filament is not None:
+            self._unindex(filament)
+        return filament
+
+    def _unindex(self, filament):
+        for index, key in ((self._by_material, filament.material), (self._by_supplier, filament.supplier)):
+            group = index.get(key)
+            if group is not None:
+                group.pop(filament.code, None)
+                if not group:
+                    del index[key]
+
+    def by_material(self, material):
+        """Return the filaments of the given material"""
+        return list(self._by_material.get(material, {}).values())
+
+    def by_supplier(self, supplier):
+        """Return the filaments of the given supplier"""
+        return list(self._by_supplier.get(supplier, {}).values())
+
+    def materials(self):
+        """Return the sorted list of materials in the inventory"""
+        return sorted(self._by_material)
+
+    def suppliers(self):
+        """Return the sorted list of suppliers in the inventory"""
+        return sorted(self._by_supplier)
+
+
+class PrintLog:
+    """Print log entries indexed by entry ID, with a secondary index by filament code"""
+
+    def __init__(self, entries=()):
+        self._by_id = {}
+        self._by_filament = {}
+        self._ids = []  # Sorted entry IDs, for reading the newest entries a page at a time
+        for entry in entries:
+            self.upsert(entry)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def __contains__(self, entry_id):
+        return entry_id in self._by_id
+
+    def get(self, entry_id):
+        """Return the entry with the given ID, or None"""
+        return self._by_id.get(entry_id)
+
+    def upsert(self, entry):
+        """Add an entry or replace the one with the same ID, keeping its position"""
+        old_entry = self._by_id.get(entry.entry_id)
+        if old_entry is not None and old_entry.filament_code != entry.filament_code:
+            self._unindex(old_entry)
+        if old_entry is None:
+            # New entries almost always have the highest ID
+            if not self._ids or entry.entry_id > self._ids[-1]:
+                self._ids.append(entry.entry_id)
+            else:
+                bisect.insort(self._ids, entry.entry_id)
+        self._by_id[entry.entry_id] = entry
+        self._by_filament.setdefault(entry.filament_code, {})[entry.entry_id] = entry
+
+    def remove(self, entry_id):
+        """Remove the entry with the given ID and return it, or None if it does not exist"""
+        entry = self._by_id.pop(entry_id, None)
+        if entry is not None:
+            self._unindex(entry)
+            del self._ids[bisect.bisect_left(self._ids, entry_id)]
+        return entry
+
+    def _unindex(self, entry):
+        group = self._by_filament.get(entry.filament_code)
+        if group is not None:
+            group.pop(entry.entry_id, None)
+            if not group:
+                del self._by_filament[entry.filament_code]
+
+    def by_filament(self, filament_code):
+        """Return the entries of the given filament in the order they were logged"""
+        return list(self._by_filament.get(filament_code, {}).values())
+
+    def newest(self, limit, before_id=None):
+        """Return up to limit entries with an ID below before_id, newest first"""
+        end = len(self._ids) if before_id is None else bisect.bisect_left(self._ids, before_id)
+        return [self._by_id[entry_id] for entry_id in reversed(self._ids[max(0, end - limit):end])]
@@ -0,0 +1,202 @@
+import os
+import re
+import json
+import pstats
+import cProfile
+import logging
+import threading
+import contextlib
+from datetime import datetime
+
+from Filament_Manager.diagnostics import diagnostics_path, diagnostics_directory
+
+# Set to 1 to profile the named operations from the start
+PROFILE_ENV_VAR = "FILAMENT_MANAGER_PROFILE"
+
+# Call paths that got less time than this are left out of the speedscope file
+MIN_SPEEDSCOPE_SECONDS = 0.0001
+
+logger = logging.getLogger(__name__)
+
+_enabled = False
+_disabled = contextlib.nullcontext()
+# cProfile allows one active profiler per process from Python 3.12 on, so only one
+# running() block profiles at a time; blocks that overlap it run unprofiled
+_active_lock = threading.Lock()
+
+
+def profile_requested():
+    """Check whether profiling was switched on through the environment"""
+    return os.environ.get(PROFILE_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def enable_profiling():
+    """Profile the named operations from now on"""
+    global _enabled
+    _enabled = True
+    logger.info("Profiling on, profiles are written to %s", diagnostics_directory)
+
+
+def disable_profiling():
+    """Stop profiling, operations that are running still write their profile"""
+    global _enabled
+    _enabled = False
+
+
+def profiling_enabled():
+    """Check whether the named operations are profiled"""
+    return _enabled
+
+
+class ProfiledOperation:
+    """cProfile runs of one named operation, which may be spread over several threads and callbacks
+
+    Each running() block is profiled on the thread it runs on; finish() merges them and
+    writes a .prof file for pstats/snakeviz and a speedscope JSON file. Blocks that run
+    while another block is profiled, on any thread, are not included.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = datetime.now()
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def running(self):
+        """Profile the block on the current thread, unless another block is being profiled"""
+        # A nested operation is part of the outer profile, a concurrent one is skipped
+        if not _active_lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiling tool, such as a debugger, is already active
+                logger.warning("Could not profile %s, another profiler is active", self.name)
+                profile = None
+            try:
+                yield
+            finally:
+                if profile is not None:
+                    profile.disable()
+                    with self._lock:
+                        self._profiles.append(profile)
+        finally:
+            _active_lock.release()
+
+    def finish(self):
+        """Write the collected profile, returns the paths of the .prof and speedscope files"""
+        with self._lock:
+            profiles, self._profiles = self._profiles, []
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+
+        slug = re.sub(r"[^0-9a-z]+", "_", self.name.lower()).strip("_")
+        base = diagnostics_path(f"profile_{slug}_{self.started:%Y%m%d_%H%M%S_%f}")
+        stats.dump_stats(base + ".prof")
+        with open(base + ".speedscope.json", "w", encoding="utf-8") as file:
+            json.dump(speedscope_profile(stats, self.name), file)
+        logger.info("Profile of %s written to %s.prof (%.0f ms)", self.name, base, stats.total_tt * 1000)
+        return base + ".prof", base + ".speedscope.json"
+
+
+def begin_operation(name):
+    """Return a ProfiledOperation for an operation that spans callbacks, or None when profiling is off"""
+    return ProfiledOperation(name) if _enabled else None
+
+
+def profile_running(operation):
+    """Profile the block as part of operation, does nothing when operation is None"""
+    return _disabled if operation is None else operation.running()
+
+
+def profile_operation(name):
+    """Profile the block as one operation, does nothing when profiling is off"""
+    if not _enabled:
+        return _disabled
+    return _profile_operation(name)
+
+
+@contextlib.contextmanager
+def _profile_operation(name):
+    operation = ProfiledOperation(name)
+    try:
+        with operation.running():
+            yield operation
+    finally:
+        try:
+            operation.finish()
+        except Exception as e:
+            logger.warning("Could not write the profile of %s: %s", name, e)
+
+
+def speedscope_profile(stats, name):
+    """Convert pstats to a speedscope sampled profile
+
+    cProfile keeps totals per caller and callee rather than samples, so the call tree is
+    rebuilt from the root functions down, splitting each function's time over its
+    callers in proportion to what each caller spent in it.
+    """
+    callees = {}
+    roots = []
+    for function, (_, _, _, total_seconds, callers) in stats.stats.items():
+        # A recursive function is its own caller, which does not stop it from being a root
+        known_callers = [caller for caller in callers if caller in stats.stats and caller != function]
+        for caller in known_callers:
+            callees.setdefault(caller, []).append((function, callers[caller][3]))
+        # Time not spent under a known caller comes from calls made directly in the profiled block
+        root_seconds = total_seconds - sum(callers[caller][3] for caller in known_callers)
+        if root_seconds >= MIN_SPEEDSCOPE_SECONDS:
+            roots.append((function, root_seconds))
+
+    frames = []
+    frame_indexes = {}
+    samples = []
+    weights = []
+
+    def frame_index(function):
+        if function not in frame_indexes:
+            filename, line, function_name = function
+            frame_indexes[function] = len(frames)
+            frames.append({"name": function_name, "file": filename, "line": line})
+        return frame_indexes[function]
+
+    # An explicit stack, deep recursion in the profiled code would overflow Python's. A
+    # function already on the path is not entered again, its self time covers the recursion
+    stack = [(root, (), seconds) for root, seconds in roots]
+    while stack:
+        function, path, seconds = stack.pop()
+        if seconds < MIN_SPEEDSCOPE_SECONDS or function in path:
+            continue
+        total_seconds = stats.stats[function][3]
+        share = seconds / total_seconds if total_seconds else 0
+        path = path + (function,)
+
+        self_seconds = stats.stats[function][2] * share
+        if self_seconds >= MIN_SPEEDSCOPE_SECONDS:
+            samples.append([frame_index(f) for f in path])
+            weights.append(self_seconds)
+        for callee, callee_seconds in callees.get(function, ()):
+            stack.append((callee, path, callee_seconds * share))
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "Filament Manager",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights
+        }]
+    }
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import time
 import tempfile
 import subprocess
 from datetime import datetime
@@ -9,9 +10,9 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.lib import colors
-from tkinter import messagebox
 
-from Filament_Manager.data_operations import read_excel_data
+from Filament_Manager.storage import get_repository
+from Filament_Manager.timing_log import log_timing
 
 
 def draw_color_circle(canvas_obj, x, y, diameter, hex_color):
@@ -64,8 +65,13 @@ def draw_color_circle(canvas_obj, x, y, diameter, hex_color):
         canvas_obj.restoreState()
 
 
-def generate_filament_label(filament_data, include_qr=True, include_barcode=True):
-    """Generate a PDF label for the filament"""
+def generate_filament_label(filament_data, include_qr=True, include_barcode=True, output_path=None, open_file=True):
+    """Generate a PDF label for the filament and return its path
+
+    The label goes to output_path, or to the temp folder. With open_file it is opened in the
+    default viewer and errors are shown in a message box, otherwise errors are raised.
+    """
+    start = time.perf_counter()
     try:
         # Create a temporary file
         temp_dir = tempfile.gettempdir()
@@ -75,7 +81,7 @@ def generate_filament_label(filament_data, include_qr=True, include_barcode=True
         # Remove any non-alphanumeric characters
         filament_code = ''.join(c for c in filament_code if c.isalnum())
         
-        label_path = os.path.join(temp_dir, f"filament_label_{filament_code}.pdf")
+        label_path = output_path or os.path.join(temp_dir, f"filament_label_{filament_code}.pdf")
         
         # Generate QR code if requested
         qr_path = None
@@ -233,6 +239,8 @@ def generate_filament_label(filament_data, include_qr=True, include_barcode=True
         
         # Save the PDF
         c.save()
+        log_timing("generate_filament_label", (time.perf_counter() - start) * 1000,
+                   rows=1, file_size=os.path.getsize(label_path))
         
         # Clean up temporary files
         if qr_path and os.path.exists(qr_path):
@@ -241,27 +249,37 @@ def generate_filament_label(filament_data, include_qr=True, include_barcode=True
             os.remove(barcode_path + ".png")
         
         # Open the PDF with the default viewer
-        if os.name == 'nt':  # Windows
-            os.startfile(label_path)
-        else:  # macOS and Linux
-            subprocess.call(('open', label_path))
+        if open_file:
+            if os.name == 'nt':  # Windows
+                os.startfile(label_path)
+            else:  # macOS and Linux
+                subprocess.call(('open', label_path))
         
-        return True
+        return label_path
             
     except Exception as e:
+        if not open_file:
+            raise
+        # Imported here so labels can be made without a display
+        from tkinter import messagebox
         messagebox.showerror("Error", f"Failed to generate label:\n{str(e)}")
         return False
 
 
-def generate_inventory_report():
-    """Generate a PDF report of the filament inventory"""
+def generate_inventory_report(output_path=None, open_file=True):
+    """Generate a PDF report of the filament inventory and return its path
+
+    The report goes to output_path, or to the temp folder. With open_file it is opened in the
+    default viewer and errors are shown in a message box, otherwise errors are raised.
+    """
+    start = time.perf_counter()
     try:
         # Get current timestamp
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
         
         # Create a temporary file
         temp_dir = tempfile.gettempdir()
-        pdf_file = os.path.join(temp_dir, f"filament_inventory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+        pdf_file = output_path or os.path.join(temp_dir, f"filament_inventory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
         
         # Create the PDF with A4 size
         c = canvas.Canvas(pdf_file, pagesize=A4)
@@ -287,7 +305,7 @@ def generate_inventory_report():
         c.drawString(margin, page_height - margin - 70, "Summary")
         
         # Get data for summary
-        data = read_excel_data()
+        data = get_repository().list_filaments()
         total_spools = len(data)
         total_weight = sum(filament.weight for filament in data)
         
@@ -394,15 +412,22 @@ def generate_inventory_report():
         
         # Save the PDF
         c.save()
+        log_timing("generate_inventory_report", (time.perf_counter() - start) * 1000,
+                   rows=total_spools, file_size=os.path.getsize(pdf_file))
         
         # Open the PDF with the default viewer
-        if os.name == 'nt':  # Windows
-            os.startfile(pdf_file)
-        else:  # macOS and Linux
-            subprocess.call(('open', pdf_file))
+        if open_file:
+            if os.name == 'nt':  # Windows
+                os.startfile(pdf_file)
+            else:  # macOS and Linux
+                subprocess.call(('open', pdf_file))
             
-        return True
+        return pdf_file
         
     except Exception as e:
+        if not open_file:
+            raise
+        # Imported here so reports can be made without a display
+        from tkinter import messagebox
         messagebox.showerror("Error", f"Failed to generate PDF report:\n{str(e)}")
         return False 
\ No newline at end of file
@@ -0,0 +1,19 @@
+# Lazy facade for report_generator: reportlab, qrcode and python-barcode are slow to
+# import and only needed once a report or label is generated, so they are loaded on
+# first use instead of at startup.
+
+from Filament_Manager.profiling import profile_operation
+
+
+def generate_inventory_report(*args, **kwargs):
+    """Generate the PDF inventory report, see report_generator.generate_inventory_report"""
+    with profile_operation("report"):
+        from Filament_Manager import report_generator
+        return report_generator.generate_inventory_report(*args, **kwargs)
+
+
+def generate_filament_label(*args, **kwargs):
+    """Generate a PDF label for a filament, see report_generator.generate_filament_label"""
+    with profile_operation("label"):
+        from Filament_Manager import report_generator
+        return report_generator.generate_filament_label(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,64 @@
+import queue
+import threading
+
+# How long to wait for more changes before saving, so quick edits share one save
+COALESCE_DELAY_SECONDS = 0.5
+
+
+class SaveQueue:
+    """Runs a flush function on a background thread whenever a save is requested
+
+    Status changes are posted as (status, detail) tuples that the UI thread picks up
+    with poll_events(): ("saving", None), ("saved", None) or ("error", exception).
+    """
+
+    def __init__(self, flush, coalesce_delay=COALESCE_DELAY_SECONDS):
+        self.flush = flush
+        self.coalesce_delay = coalesce_delay
+        self.events = queue.Queue()
+        self._requested = threading.Event()
+        self._stopping = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="SaveQueue", daemon=True)
+        self._thread.start()
+
+    def request_save(self):
+        """Ask the worker to save soon; requests made in quick succession are coalesced"""
+        self._requested.set()
+
+    def poll_events(self):
+        """Return the status events posted since the last call"""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._requested.wait()
+            if self._stopping.is_set():
+                break
+            # Give the user a moment to make more changes that can go in the same save
+            self._stopping.wait(self.coalesce_delay)
+            self._requested.clear()
+            self._save()
+
+    def _save(self):
+        with self._flush_lock:
+            self.events.put(("saving", None))
+            try:
+                self.flush()
+            except Exception as e:
+                self.events.put(("error", e))
+            else:
+                self.events.put(("saved", None))
+
+    def close(self, timeout=None):
+        """Stop the worker and save anything that is still pending, on the calling thread"""
+        self._stopping.set()
+        self._requested.set()
+        self._thread.join(timeout)
+        with self._flush_lock:
+            self.flush()
\ No newline at end of file
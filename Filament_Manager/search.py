@@ -0,0 +1,74 @@
+import re
+
+# Prefixes are indexed up to this length, longer query words are checked against the full words
+MAX_PREFIX_LENGTH = 12
+
+_WORD_PATTERN = re.compile(r"[0-9a-z]+")
+
+
+def tokenize(text):
+    """Split text into lowercase words of letters and digits"""
+    return _WORD_PATTERN.findall(str(text).lower())
+
+
+class SearchIndex:
+    """Inverted index from word prefixes to row keys, for search-as-you-type
+
+    A query matches a row when every query word is the start of a word of that row,
+    so "pla bl" finds "PLA Basic Blue". Rows can be added and removed one at a time,
+    so single edits do not need a rebuild.
+    """
+
+    def __init__(self, items=()):
+        self._prefixes = {}  # prefix -> set of keys
+        self._words = {}  # key -> set of words
+        for key, texts in items:
+            self.update(key, texts)
+
+    def __len__(self):
+        return len(self._words)
+
+    def update(self, key, texts):
+        """Index the texts of a row, replacing what was indexed for it before"""
+        self.remove(key)
+        words = set()
+        for text in texts:
+            words.update(tokenize(text))
+        self._words[key] = words
+        for word in words:
+            for length in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1):
+                self._prefixes.setdefault(word[:length], set()).add(key)
+
+    def remove(self, key):
+        """Remove a row from the index"""
+        words = self._words.pop(key, None)
+        if not words:
+            return
+        for word in words:
+            for length in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1):
+                keys = self._prefixes.get(word[:length])
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._prefixes[word[:length]]
+
+    def search(self, query):
+        """Return the set of keys whose words start with every word of the query"""
+        query_words = tokenize(query)
+        if not query_words:
+            return set(self._words)
+
+        # Start with the rarest prefix, so the intersections stay small
+        candidate_sets = [self._prefixes.get(word[:MAX_PREFIX_LENGTH], set()) for word in query_words]
+        candidate_sets.sort(key=len)
+        matches = set(candidate_sets[0])
+        for keys in candidate_sets[1:]:
+            matches &= keys
+            if not matches:
+                return matches
+
+        # Prefixes longer than the index covers are checked on the remaining candidates
+        for word in query_words:
+            if len(word) > MAX_PREFIX_LENGTH:
+                matches = {key for key in matches if any(w.startswith(word) for w in self._words[key])}
+        return matches
\ No newline at end of file
@@ -0,0 +1,96 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from datetime import date, datetime
+
+from Filament_Manager.models import FilamentData, PrintLogEntry
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout or the models change, so older snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+
+def snapshot_path(excel_path):
+    """Return the path of the snapshot that belongs to an Excel file"""
+    return os.path.splitext(excel_path)[0] + ".snapshot"
+
+
+def file_hash(path):
+    """Return the SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _encode_value(value):
+    """Serialize the dates in the rows, tagged so they are read back as the same type"""
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode_value(value):
+    """Turn the tagged dates back into datetime and date objects, other objects are kept"""
+    if value.keys() == {"datetime"}:
+        return datetime.fromisoformat(value["datetime"])
+    if value.keys() == {"date"}:
+        return date.fromisoformat(value["date"])
+    return value
+
+
+def read_snapshot(excel_path):
+    """Return (filaments, print_log, last_log_id) from the snapshot if it matches the Excel file, else None
+
+    The snapshot is plain JSON, so a file planted in a shared data folder can at most
+    hold wrong rows, and those are only used when its hash matches the workbook.
+    """
+    try:
+        with open(snapshot_path(excel_path), encoding="utf-8") as file:
+            snapshot = json.load(file, object_hook=_decode_value)
+        if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        if snapshot["size"] != os.path.getsize(excel_path) or snapshot["sha256"] != file_hash(excel_path):
+            return None
+        # The rows are the dataclass fields in order, as written by to_row()
+        filaments = [FilamentData(*row) for row in snapshot["filaments"]]
+        print_log = [PrintLogEntry(*row) for row in snapshot["print_log"]]
+        last_log_id = snapshot["last_log_id"]
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable snapshot: %s", e)
+        return None
+    return filaments, print_log, last_log_id
+
+
+def write_snapshot(excel_path, filaments, print_log, last_log_id):
+    """Store the parsed contents of the Excel file in its snapshot"""
+    stat = os.stat(excel_path)
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "size": stat.st_size,
+        "sha256": file_hash(excel_path),
+        "filaments": [filament.to_row() for filament in filaments],
+        "print_log": [entry.to_row() for entry in print_log],
+        "last_log_id": last_log_id
+    }
+
+    # Write to a temporary file first so a crash never leaves a half-written snapshot
+    fd, temp_path = tempfile.mkstemp(prefix=".snapshot_", dir=os.path.dirname(os.path.abspath(excel_path)))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file, default=_encode_value, separators=(",", ":"))
+        # mkstemp creates the file readable by its owner only, give it the workbook's permissions
+        os.chmod(temp_path, stat.st_mode & 0o777)
+        os.replace(temp_path, snapshot_path(excel_path))
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
\ No newline at end of file
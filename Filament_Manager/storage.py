@@ -0,0 +1,510 @@
+import os
+import sqlite3
+import threading
+import contextlib
+from datetime import datetime, date
+
+from Filament_Manager import data_operations
+from Filament_Manager.models import FilamentData, PrintLogEntry, Inventory
+
+# The SQLite database lives next to the Excel file; when it exists it is used instead
+database_file = os.path.join(data_operations.script_directory, "filament_data.db")
+
+
+class FilamentRepository:
+    """Interface used by the application to store spools and print log entries"""
+
+    name = ""
+
+    def get_filament(self, code):
+        """Return the filament with the given code, or None"""
+        raise NotImplementedError
+
+    def list_filaments(self):
+        """Return all filaments in display order"""
+        raise NotImplementedError
+
+    def inventory(self):
+        """Return all filaments as an Inventory indexed by code, material and supplier"""
+        return Inventory(self.list_filaments())
+
+    def upsert_filament(self, filament):
+        """Insert a new filament or update the one with the same code"""
+        raise NotImplementedError
+
+    def delete_filament(self, code):
+        """Delete the filament with the given code"""
+        raise NotImplementedError
+
+    def append_log_entry(self, entry):
+        """Add an entry to the print log"""
+        raise NotImplementedError
+
+    def get_log_entry(self, entry_id):
+        """Return the print log entry with the given entry_id, or None"""
+        raise NotImplementedError
+
+    def update_log_entry(self, entry):
+        """Replace the print log entry that has the same entry_id"""
+        with self.transaction() as transaction:
+            transaction.update_log_entry(entry)
+
+    def delete_log_entry(self, entry_id):
+        """Remove the print log entry with the given entry_id"""
+        with self.transaction() as transaction:
+            transaction.delete_log_entry(entry_id)
+
+    def query_log(self, filament_code=None, since=None, until=None, limit=None):
+        """Return print log entries in the order they were logged, optionally filtered"""
+        raise NotImplementedError
+
+    def query_log_page(self, limit, before_id=None):
+        """Return up to limit print log entries older than before_id, newest first
+
+        Used to show the history a page at a time without reading the whole log.
+        """
+        raise NotImplementedError
+
+    def transaction(self, defer=False):
+        """Return a context manager for changes that must be stored together
+
+        The object it yields supports get_filament, list_filaments, upsert_filament,
+        delete_filament, append_log_entry, get_log_entry, update_log_entry and
+        delete_log_entry. Nothing is stored if the block raises.
+        With defer the changes may be made durable in a journal first and written to
+        the main storage by a later flush().
+        """
+        raise NotImplementedError
+
+    def next_filament_code(self):
+        """Generate the next available filament code"""
+        return data_operations.get_next_code(self.list_filaments())
+
+    def create_backup(self, backup_path):
+        """Write a backup of all data to an Excel file"""
+        raise NotImplementedError
+
+    def restore_backup(self, backup_path):
+        """Replace all data with the contents of an Excel backup, returns the path of the automatic backup"""
+        raise NotImplementedError
+
+    def flush(self):
+        """Write any buffered changes to permanent storage"""
+        pass
+
+    def close(self):
+        """Release any resources held by the repository"""
+        self.flush()
+
+
+def _matches_log_filter(entry, filament_code, since, until):
+    """Check whether a log entry passes the query_log filters"""
+    if filament_code is not None and entry.filament_code != filament_code:
+        return False
+    if since is not None and entry.timestamp < since:
+        return False
+    if until is not None and entry.timestamp > until:
+        return False
+    return True
+
+
+def _auto_backup_path():
+    """Return the path used for the automatic backup taken before a restore"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(
+        data_operations.script_directory,
+        f"filament_data_auto_backup_{timestamp}.xlsx"
+    )
+
+
+class ExcelRepository(FilamentRepository):
+    """Repository that uses filament_data.xlsx as the live database"""
+
+    name = "Excel"
+
+    def get_filament(self, code):
+        return data_operations.get_filament(code)
+
+    def list_filaments(self):
+        return data_operations.read_excel_data()
+
+    def inventory(self):
+        return data_operations.get_inventory()
+
+    def upsert_filament(self, filament):
+        with self.transaction() as transaction:
+            transaction.upsert_filament(filament)
+
+    def delete_filament(self, code):
+        with self.transaction() as transaction:
+            transaction.delete_filament(code)
+
+    def append_log_entry(self, entry):
+        entry.entry_id = data_operations.add_print_log_entry(
+            entry.timestamp,
+            entry.print_name,
+            entry.filament_code,
+            entry.material,
+            entry.variant,
+            entry.used_weight,
+            entry.remaining_weight
+        )
+
+    def get_log_entry(self, entry_id):
+        return data_operations.get_log_entry(entry_id)
+
+    def query_log(self, filament_code=None, since=None, until=None, limit=None):
+        # The filament index avoids scanning the whole log for one spool
+        entries = [entry for entry in data_operations.read_print_log(filament_code)
+                   if _matches_log_filter(entry, filament_code, since, until)]
+        if limit is not None:
+            entries = entries[-limit:]
+        return entries
+
+    def query_log_page(self, limit, before_id=None):
+        return data_operations.read_print_log_page(limit, before_id)
+
+    def transaction(self, defer=False):
+        return data_operations.transaction(defer=defer)
+
+    def flush(self):
+        data_operations.flush_journal()
+
+    def create_backup(self, backup_path):
+        # Make sure journaled changes are part of the backup
+        data_operations.copy_workbook(backup_path)
+
+    def restore_backup(self, backup_path):
+        auto_backup_path = _auto_backup_path()
+        data_operations.restore_workbook(backup_path, auto_backup_path)
+        return auto_backup_path
+
+
+def _date_to_db(value):
+    """Convert a date_opened value to the text stored in SQLite"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return None if value is None else str(value)
+
+
+def _date_from_db(value):
+    """Convert stored date text back to a datetime where possible"""
+    if not value:
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return value
+
+
+class SqliteTransaction:
+    """Changes made inside an open SQLite transaction"""
+
+    def __init__(self, repository):
+        self.repository = repository
+
+    def get_filament(self, code):
+        return self.repository.get_filament(code)
+
+    def list_filaments(self):
+        return self.repository.list_filaments()
+
+    def upsert_filament(self, filament):
+        self.repository._upsert_filaments([filament])
+
+    def delete_filament(self, code):
+        self.repository._delete_filament(code)
+
+    def append_log_entry(self, entry):
+        self.repository._append_log_entries([entry])
+
+    def get_log_entry(self, entry_id):
+        return self.repository.get_log_entry(entry_id)
+
+    def update_log_entry(self, entry):
+        self.repository._update_log_entry(entry)
+
+    def delete_log_entry(self, entry_id):
+        self.repository._delete_log_entry(entry_id)
+
+
+class SqliteRepository(FilamentRepository):
+    """Repository backed by a SQLite database, so every change is a single row write"""
+
+    name = "SQLite"
+
+    FILAMENT_COLUMNS = ("code", "material", "variant", "supplier", "date_opened",
+                        "weight", "hex_color", "empty_spool_weight", "description")
+    LOG_COLUMNS = ("timestamp", "print_name", "filament_code", "material", "variant",
+                   "used_weight", "remaining_weight")
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.lock, self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS filaments (
+                    code TEXT PRIMARY KEY,
+                    material TEXT,
+                    variant TEXT,
+                    supplier TEXT,
+                    date_opened TEXT,
+                    weight REAL,
+                    hex_color TEXT,
+                    empty_spool_weight REAL,
+                    description TEXT,
+                    position INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS print_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    print_name TEXT,
+                    filament_code TEXT,
+                    material TEXT,
+                    variant TEXT,
+                    used_weight REAL,
+                    remaining_weight REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_filaments_position ON filaments (position);
+                CREATE INDEX IF NOT EXISTS idx_print_log_timestamp ON print_log (timestamp);
+                CREATE INDEX IF NOT EXISTS idx_print_log_filament_code ON print_log (filament_code);
+            """)
+
+    def _filament_from_row(self, row):
+        return FilamentData(
+            code=row[0],
+            material=row[1],
+            variant=row[2],
+            supplier=row[3],
+            date_opened=_date_from_db(row[4]),
+            weight=row[5] if row[5] is not None else 0,
+            hex_color=row[6] or "#000000",
+            empty_spool_weight=row[7] if row[7] is not None else 0,
+            description=row[8] or ""
+        )
+
+    def _filament_to_row(self, filament):
+        return (
+            filament.code,
+            filament.material,
+            filament.variant,
+            filament.supplier,
+            _date_to_db(filament.date_opened),
+            float(filament.weight),
+            filament.hex_color,
+            float(filament.empty_spool_weight),
+            filament.description or ""
+        )
+
+    def get_filament(self, code):
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT {', '.join(self.FILAMENT_COLUMNS)} FROM filaments WHERE code = ?",
+                (code,)
+            ).fetchone()
+        return self._filament_from_row(row) if row else None
+
+    def list_filaments(self):
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT {', '.join(self.FILAMENT_COLUMNS)} FROM filaments ORDER BY position"
+            ).fetchall()
+        return [self._filament_from_row(row) for row in rows]
+
+    def upsert_filament(self, filament):
+        with self.lock, self.connection:
+            self._upsert_filaments([filament])
+
+    def _upsert_filaments(self, filaments):
+        """Insert or update filaments; new codes are placed at the end of the list"""
+        self.connection.executemany(
+            """
+            INSERT INTO filaments (code, material, variant, supplier, date_opened, weight,
+                                   hex_color, empty_spool_weight, description, position)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    (SELECT COALESCE(MAX(position), 0) + 1 FROM filaments))
+            ON CONFLICT(code) DO UPDATE SET
+                material = excluded.material,
+                variant = excluded.variant,
+                supplier = excluded.supplier,
+                date_opened = excluded.date_opened,
+                weight = excluded.weight,
+                hex_color = excluded.hex_color,
+                empty_spool_weight = excluded.empty_spool_weight,
+                description = excluded.description
+            """,
+            [self._filament_to_row(filament) for filament in filaments]
+        )
+
+    def delete_filament(self, code):
+        with self.lock, self.connection:
+            self._delete_filament(code)
+
+    def _delete_filament(self, code):
+        self.connection.execute("DELETE FROM filaments WHERE code = ?", (code,))
+
+    def append_log_entry(self, entry):
+        with self.lock, self.connection:
+            self._append_log_entries([entry])
+
+    def _append_log_entries(self, entries):
+        """Insert log entries; entries without an entry_id get the next ID from the database"""
+        for entry in entries:
+            cursor = self.connection.execute(
+                f"INSERT INTO print_log ({', '.join(self.LOG_COLUMNS)}, id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                tuple(entry.to_row())
+            )
+            entry.entry_id = cursor.lastrowid
+
+    def get_log_entry(self, entry_id):
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT {', '.join(self.LOG_COLUMNS)}, id FROM print_log WHERE id = ?",
+                (entry_id,)
+            ).fetchone()
+        return PrintLogEntry.from_row(row) if row else None
+
+    def _update_log_entry(self, entry):
+        self.connection.execute(
+            f"UPDATE print_log SET {', '.join(f'{column} = ?' for column in self.LOG_COLUMNS)} WHERE id = ?",
+            tuple(entry.to_row())
+        )
+
+    def _delete_log_entry(self, entry_id):
+        self.connection.execute("DELETE FROM print_log WHERE id = ?", (entry_id,))
+
+    def query_log(self, filament_code=None, since=None, until=None, limit=None):
+        conditions = []
+        params = []
+        if filament_code is not None:
+            conditions.append("filament_code = ?")
+            params.append(filament_code)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("timestamp <= ?")
+            params.append(until)
+
+        query = f"SELECT {', '.join(self.LOG_COLUMNS)}, id FROM print_log"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        if limit is not None:
+            # Take the newest entries, then return them oldest first like the other queries
+            query = f"SELECT * FROM ({query} ORDER BY id DESC LIMIT ?) ORDER BY id"
+            params.append(limit)
+        else:
+            query += " ORDER BY id"
+
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return [PrintLogEntry.from_row(row) for row in rows]
+
+    def query_log_page(self, limit, before_id=None):
+        # The primary key index lets SQLite read just the newest rows
+        query = f"SELECT {', '.join(self.LOG_COLUMNS)}, id FROM print_log"
+        params = []
+        if before_id is not None:
+            query += " WHERE id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return [PrintLogEntry.from_row(row) for row in rows]
+
+    @contextlib.contextmanager
+    def transaction(self, defer=False):
+        # SQLite commits are cheap enough to always be made right away
+        with self.lock, self.connection:
+            yield SqliteTransaction(self)
+
+    def replace_all(self, filaments, print_log):
+        """Replace the complete contents of the database in one transaction"""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM filaments")
+            self.connection.execute("DELETE FROM print_log")
+            self._upsert_filaments(filaments)
+            self._append_log_entries(print_log)
+
+    def create_backup(self, backup_path):
+        export_to_excel(self, backup_path)
+
+    def restore_backup(self, backup_path):
+        auto_backup_path = _auto_backup_path()
+        export_to_excel(self, auto_backup_path)
+        filaments, print_log = data_operations.parse_workbook(backup_path)
+        self.replace_all(filaments, print_log)
+        return auto_backup_path
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def import_from_excel(excel_path=None, db_path=None):
+    """One-shot import of an Excel workbook into a new SQLite database"""
+    db_path = db_path or database_file
+    if os.path.exists(db_path):
+        raise FileExistsError(f"Database already exists: {db_path}")
+
+    if excel_path is None:
+        # Importing the live workbook, so include entries that are still in the journal
+        filaments = data_operations.read_excel_data()
+        print_log = data_operations.read_print_log()
+    else:
+        filaments, print_log = data_operations.parse_workbook(excel_path)
+    repository = SqliteRepository(db_path)
+    try:
+        repository.replace_all(filaments, print_log)
+    except Exception:
+        repository.close()
+        os.remove(db_path)
+        raise
+    repository.close()
+    return db_path
+
+
+def export_to_excel(repository, excel_path):
+    """Export all data from a repository to an Excel workbook"""
+    data_operations.export_workbook(
+        excel_path,
+        repository.list_filaments(),
+        repository.query_log()
+    )
+
+
+_repository = None
+
+
+def get_repository():
+    """Return the repository for the active storage backend"""
+    global _repository
+    if _repository is None:
+        if os.path.exists(database_file):
+            _repository = SqliteRepository(database_file)
+        else:
+            data_operations.init_excel()
+            _repository = ExcelRepository()
+    return _repository
+
+
+def reset_repository():
+    """Close the active repository so the next call to get_repository() picks the backend again"""
+    global _repository
+    if _repository is not None:
+        _repository.close()
+        _repository = None
+
+
+def migrate_to_sqlite():
+    """Import the Excel workbook into SQLite and switch the application over to it"""
+    reset_repository()
+    import_from_excel()
+    return get_repository()
@@ -0,0 +1,220 @@
+# Structured timing records of storage calls, UI refreshes and PDF generation. Every
+# record is one JSON line in diagnostics/timings.jsonl (rotated at 10 MB) with the
+# operation name, the duration and, where known, the rows touched, the size of the file
+# involved and whether the workbook cache was hit. Print p50/p95/max per operation with:
+#
+#     python -m Filament_Manager.timing_log
+#     python -m Filament_Manager.timing_log --since 2025-01-01 --operation flush_journal
+
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import functools
+import threading
+import contextlib
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from Filament_Manager.diagnostics import diagnostics_path
+
+TIMING_LOG_FILE = "timings.jsonl"
+MAX_LOG_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+logger = logging.getLogger(__name__)
+# The records are for the file, not for the console
+logger.propagate = False
+logger.setLevel(logging.INFO)
+
+_handler_lock = threading.Lock()
+_local = threading.local()
+# Set by set_log_file(), None means diagnostics/timings.jsonl
+_log_file = None
+
+
+def _ensure_handler():
+    """Open the rotating log on the first record, so importing this module writes nothing"""
+    with _handler_lock:
+        if logger.handlers:
+            return
+        try:
+            handler = RotatingFileHandler(_log_file or diagnostics_path(TIMING_LOG_FILE), maxBytes=MAX_LOG_BYTES,
+                                          backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+        except OSError:
+            # A read-only install still works, just without timing records
+            handler = logging.NullHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+
+
+def set_log_file(path):
+    """Write the records to path from now on, None goes back to the diagnostics folder
+
+    Returns the previous path, so a benchmark can keep its records out of the user's log
+    and restore it afterwards.
+    """
+    global _log_file
+    with _handler_lock:
+        previous = _log_file
+        _log_file = path
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+    return previous
+
+
+def log_timing(operation, duration_ms, **fields):
+    """Write one timing record, fields with a None value are left out"""
+    record = {"time": datetime.now().isoformat(timespec="milliseconds"), "operation": operation,
+              "duration_ms": round(duration_ms, 3)}
+    record.update((key, value) for key, value in fields.items() if value is not None)
+    if not logger.handlers:
+        _ensure_handler()
+    logger.info(json.dumps(record, default=str))
+
+
+def note(**fields):
+    """Add fields to the innermost timed() block running on this thread"""
+    records = getattr(_local, "records", None)
+    if records:
+        records[-1].update(fields)
+
+
+def note_cache(hit):
+    """Record a workbook cache lookup in the innermost timed() block, a single miss makes it a miss"""
+    records = getattr(_local, "records", None)
+    if records and records[-1].get("cache") != "miss":
+        records[-1]["cache"] = "hit" if hit else "miss"
+
+
+@contextlib.contextmanager
+def timed(operation, file_path=None):
+    """Time the block and write a record, the yielded dict takes extra fields such as rows
+
+    file_path is a callable returning the path whose size is recorded after the block.
+    """
+    fields = {}
+    records = getattr(_local, "records", None)
+    if records is None:
+        records = _local.records = []
+    records.append(fields)
+    start = time.perf_counter()
+    try:
+        yield fields
+    except Exception as e:
+        fields["error"] = type(e).__name__
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        records.pop()
+        if file_path is not None:
+            try:
+                fields["file_size"] = os.path.getsize(file_path())
+            except OSError:
+                pass
+        log_timing(operation, duration_ms, **fields)
+
+
+def timed_function(operation, file_path=None):
+    """Decorator that runs the function in a timed() block"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(operation, file_path):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def read_records(path=None, since=None):
+    """Yield the records of the timing log and its rotated files, oldest file first"""
+    path = path or diagnostics_path(TIMING_LOG_FILE)
+    paths = [f"{path}.{index}" for index in range(LOG_BACKUP_COUNT, 0, -1)] + [path]
+    for file_path in paths:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut off by a crash
+                    continue
+                if since is not None and record.get("time", "") < since:
+                    continue
+                yield record
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an ascending list"""
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def summarize(records):
+    """Return {operation: statistics} with the count, p50, p95 and max duration and cache hit rate"""
+    durations = {}
+    rows = {}
+    cache = {}
+    for record in records:
+        operation = record.get("operation")
+        if operation is None or "duration_ms" not in record:
+            continue
+        durations.setdefault(operation, []).append(record["duration_ms"])
+        if "rows" in record:
+            rows[operation] = max(rows.get(operation, 0), record["rows"])
+        if "cache" in record:
+            hits, total = cache.get(operation, (0, 0))
+            cache[operation] = (hits + (record["cache"] == "hit"), total + 1)
+
+    summary = {}
+    for operation, values in durations.items():
+        values.sort()
+        hits, total = cache.get(operation, (0, 0))
+        summary[operation] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+            "max_ms": values[-1],
+            "max_rows": rows.get(operation),
+            "cache_hit_rate": hits / total if total else None
+        }
+    return summary
+
+
+def format_summary(summary):
+    """Return the summary as printable lines, slowest p95 first"""
+    lines = [f"{'operation':<32} {'count':>8} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'max rows':>10} {'cache hits':>10}"]
+    for operation, stats in sorted(summary.items(), key=lambda item: item[1]["p95_ms"], reverse=True):
+        max_rows = f"{stats['max_rows']:,}" if stats["max_rows"] is not None else "-"
+        hit_rate = f"{stats['cache_hit_rate']:.0%}" if stats["cache_hit_rate"] is not None else "-"
+        lines.append(f"{operation:<32} {stats['count']:>8,} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f}"
+                     f" {stats['max_ms']:>10.1f} {max_rows:>10} {hit_rate:>10}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize the operation timing log")
+    parser.add_argument("--log", help=f"timing log to read (default: diagnostics/{TIMING_LOG_FILE})")
+    parser.add_argument("--since", help="only records from this date or time on, e.g. 2025-01-31")
+    parser.add_argument("--operation", action="append", help="only this operation, can be repeated")
+    args = parser.parse_args(argv)
+
+    records = read_records(args.log, args.since)
+    if args.operation:
+        records = (record for record in records if record.get("operation") in args.operation)
+    summary = summarize(records)
+    if not summary:
+        print("No timing records found", file=sys.stderr)
+        return 1
+    for line in format_summary(summary):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
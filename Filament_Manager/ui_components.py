@@ -1,4 +1,7 @@
 import customtkinter as ctk
+import tkinter as tk
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from PIL import Image, ImageTk, ImageDraw
 from tkinter import ttk, colorchooser, messagebox
 
@@ -12,15 +15,20 @@ class ColorPreviewCanvas(ctk.CTkCanvas):
         self.height = height
         self.color = "#000000"
         
-        # Get the correct background color based on appearance mode
-        if ctk.get_appearance_mode() == "Dark":
-            bg_color = "#2b2b2b"
-        else:
-            bg_color = "#ffffff"
-            
-        self.configure(highlightthickness=0, bg=bg_color)
+        # Use the background of the current appearance mode and follow later changes
+        self.configure(highlightthickness=0)
+        self.update_appearance(ctk.get_appearance_mode())
+        appearance_notifier.subscribe(self.update_appearance)
         self.bind("<Configure>", self._on_resize)
-        
+    
+    def update_appearance(self, mode):
+        """Match the background to the appearance mode"""
+        self.configure(bg="#2b2b2b" if mode == "Dark" else "#ffffff")
+    
+    def destroy(self):
+        appearance_notifier.unsubscribe(self.update_appearance)
+        super().destroy()
+    
     def set_color(self, hex_color):
         self.color = hex_color
         self.delete("all")
@@ -35,7 +43,7 @@ class ColorPreviewCanvas(ctk.CTkCanvas):
         self.create_oval(2, 2, self.width-2, self.height-2, fill=self.color, outline=self.color)
 
 
-def create_circle_image(hex_color, size=16):
+def create_circle_image(hex_color, size=16, outline=None):
     """Return a tkinter-compatible image with a filled circle of the specified color."""
     # Create a higher resolution image for better anti-aliasing
     scale = 4  # Scale factor for anti-aliasing
@@ -45,7 +53,7 @@ def create_circle_image(hex_color, size=16):
     # Draw a larger circle with anti-aliasing
     padding = scale  # Add padding for smoother edges
     draw.ellipse((padding, padding, size * scale - padding, size * scale - padding), 
-                 fill=hex_color)
+                 fill=hex_color, outline=outline, width=scale if outline else 0)
     
     # Resize the image down to the desired size with anti-aliasing
     img = img.resize((size, size), Image.Resampling.LANCZOS)
@@ -53,6 +61,56 @@ def create_circle_image(hex_color, size=16):
     return ImageTk.PhotoImage(img)
 
 
+class SwatchCache:
+    """Bounded LRU cache of color swatch images, keyed by (hex color, size, appearance mode)
+
+    Rendering a swatch supersamples and downsamples an image, so every table and
+    dialog shares the rendered images. Widgets showing an image must keep their own
+    reference to it, so evicting it from the cache does not blank the widget.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, hex_color, size=16):
+        """Return the swatch image for a color, rendering it on a miss"""
+        mode = ctk.get_appearance_mode()
+        key = (hex_color, size, mode)
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            self.images.move_to_end(key)
+            return image
+
+        self.misses += 1
+        # A thin ring keeps dark swatches visible on a dark background and light ones on a light background
+        outline = "#8a8a8a" if mode == "Dark" else "#b0b0b0"
+        image = create_circle_image(hex_color, size, outline=outline)
+        self.images[key] = image
+        if len(self.images) > self.maxsize:
+            self.images.popitem(last=False)
+        return image
+
+    def stats(self):
+        """Return the hit and miss counters and the number of cached images"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.images), "maxsize": self.maxsize}
+
+    def clear(self):
+        self.images.clear()
+
+
+# Shared by all windows of the application
+swatch_cache = SwatchCache()
+
+
+def get_swatch_image(hex_color, size=16):
+    """Return the shared swatch image for a color"""
+    return swatch_cache.get(hex_color, size)
+
+
 def configure_treeview_style():
     """Configure the ttk.Treeview style based on the current appearance mode"""
     style = ttk.Style()
@@ -94,6 +152,409 @@ def configure_treeview_style():
     return style
 
 
+class AppearanceNotifier:
+    """Lets widgets restyle themselves when the appearance mode changes
+
+    Subscribed callbacks get the new mode, "Light" or "Dark". It hooks into the
+    customtkinter tracker, so a change of the system theme is reported as well.
+    Only colors change, nothing is reloaded or rebuilt.
+    """
+
+    def __init__(self):
+        self._callbacks = []
+        self._hooked = False
+
+    def subscribe(self, callback):
+        if not self._hooked:
+            ctk.AppearanceModeTracker.add(self._notify)
+            self._hooked = True
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def _notify(self, mode):
+        # The ttk widgets share one style, so updating it restyles all Treeviews at once
+        configure_treeview_style()
+        for callback in list(self._callbacks):
+            try:
+                callback(mode)
+            except Exception as e:
+                print(f"Error updating appearance: {str(e)}")
+
+
+# Shared by all windows of the application
+appearance_notifier = AppearanceNotifier()
+
+
+@dataclass
+class TableRow:
+    """One row of a VirtualTable"""
+    key: object  # Passed to the button callback, e.g. the filament code
+    values: list = field(default_factory=list)  # Text per column
+    color: str = "#000000"  # Swatch color for the color column
+    sort_keys: dict = field(default_factory=dict)  # Sort key per column index, the text is used for other columns
+
+
+class VirtualTable(ctk.CTkFrame):
+    """Scrollable table that keeps a fixed pool of row widgets and rebinds them to the visible rows
+
+    Only as many rows are created as fit in the window, so building and scrolling cost
+    the same for 20 or 20,000 rows.
+    """
+
+    def __init__(self, parent, headers, color_column=None, button_text=None, on_button=None,
+                 button_tooltip="", show_tooltip=None, hide_tooltip=None, row_height=36,
+                 on_scroll_end=None, sortable_columns=(), **kwargs):
+        super().__init__(parent, **kwargs)
+        self.headers = headers
+        self.color_column = color_column
+        self.button_text = button_text
+        self.on_button = on_button
+        self.button_tooltip = button_tooltip
+        self.show_tooltip = show_tooltip
+        self.hide_tooltip = hide_tooltip
+        self.row_height = row_height
+        self.on_scroll_end = on_scroll_end  # Called when the last row comes into view, e.g. to load more
+        self._scroll_end_pending = False
+        self.sortable_columns = set(sortable_columns)  # Columns sorted by clicking their header
+        self.sort_column = None
+        self.sort_descending = False
+
+        self.rows = []
+        self.positions = {}  # row key -> index in self.rows
+        self.filter_keys = None  # Keys of the rows to show, None shows all rows
+        self.view = self.rows  # The rows that are shown, self.rows itself when nothing is filtered
+        self.view_positions = self.positions  # row key -> index in self.view
+        self.first_row = 0
+        self.visible_rows = 0
+        self.pool = []
+
+        # Keep the requested size, the number of pooled rows follows the size and not the other way around
+        self.grid_propagate(False)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        # Headers and the row pool share one grid so the columns line up
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=0, column=0, sticky="nsew")
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.header_labels = []
+        for col_idx, header in enumerate(headers):
+            label = ctk.CTkLabel(
+                self.body,
+                text=header,
+                font=ctk.CTkFont(weight="bold"),
+                height=35
+            )
+            label.grid(row=0, column=col_idx, padx=10, pady=(5, 10), sticky="w")
+            if col_idx in self.sortable_columns:
+                label.configure(cursor="hand2")
+                label.bind("<Button-1>", lambda event, column=col_idx: self.sort_by(column))
+            # Equal column widths, so rebinding rows never makes the columns jump
+            self.body.grid_columnconfigure(col_idx, weight=1, uniform="column")
+            self.header_labels.append(label)
+
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_scroll(self.body)
+
+        # Only the swatches need restyling, customtkinter recolors the other widgets itself
+        appearance_notifier.subscribe(self.update_appearance)
+
+    def destroy(self):
+        appearance_notifier.unsubscribe(self.update_appearance)
+        super().destroy()
+
+    def _bind_scroll(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        widget.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        widget.bind("<Button-5>", lambda event: self.scroll_rows(3))
+
+    def _create_pool_row(self):
+        """Create the widgets for one visible row"""
+        grid_row = len(self.pool) + 1
+        widgets = {"key": None, "values": None, "color": None, "shown": True,
+                   "cells": [], "labels": [], "swatch": None}
+
+        for col_idx in range(len(self.headers)):
+            if col_idx == self.color_column:
+                # Color swatch with the text next to it
+                cell = ctk.CTkFrame(self.body, fg_color="transparent")
+                swatch = tk.Label(cell, borderwidth=0, highlightthickness=0, bg=self._background_color())
+                swatch.pack(side="left", padx=(0, 5))
+                label = ctk.CTkLabel(cell, text="", anchor="w")
+                label.pack(side="left")
+                widgets["swatch"] = swatch
+                self._bind_scroll(cell)
+                self._bind_scroll(swatch)
+            else:
+                cell = label = ctk.CTkLabel(self.body, text="", anchor="w")
+            cell.grid(row=grid_row, column=col_idx, padx=10, pady=3, sticky="w")
+            self._bind_scroll(label)
+            widgets["labels"].append(label)
+            widgets["cells"].append(cell)
+
+        if self.button_text:
+            button = ctk.CTkButton(
+                self.body,
+                text=self.button_text,
+                width=30,
+                height=24,
+                command=lambda: self._on_button_click(widgets),
+                fg_color="transparent",
+                hover_color=("gray80", "gray20"),
+                font=ctk.CTkFont(size=16)
+            )
+            button.grid(row=grid_row, column=len(self.headers), padx=10, pady=3)
+            if self.show_tooltip and self.hide_tooltip:
+                button.bind("<Enter>", lambda event: self.show_tooltip(event, button, self.button_tooltip))
+                button.bind("<Leave>", self.hide_tooltip)
+            self._bind_scroll(button)
+            widgets["cells"].append(button)
+
+        self.pool.append(widgets)
+        return widgets
+
+    def _on_button_click(self, widgets):
+        if self.on_button and widgets["key"] is not None:
+            self.on_button(widgets["key"])
+
+    def _on_resize(self, event):
+        header_height = self.header_labels[0].winfo_height() + 15 if self.header_labels else 0
+        visible_rows = max(1, (event.height - header_height) // self.row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self._render()
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.first_row = int(float(args[1]) * len(self.view))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.first_row += int(args[1]) * step
+        self._render()
+
+    def scroll_rows(self, count):
+        """Scroll the table by count rows"""
+        self.first_row += count
+        self._render()
+
+    def set_rows(self, rows):
+        """Replace the rows of the table"""
+        self.rows = rows
+        self._reindex(0)
+        self._update_view()
+        self._render()
+
+    def append_rows(self, rows):
+        """Add rows at the end of the table, e.g. the next page of a paginated list"""
+        start = len(self.rows)
+        self.rows.extend(rows)
+        self._reindex(start)
+        if self.sort_column is not None:
+            self._update_view()
+        elif self.view is not self.rows:
+            for row in rows:
+                if row.key in self.filter_keys:
+                    self.view_positions[row.key] = len(self.view)
+                    self.view.append(row)
+        self._render()
+
+    def _reindex(self, start):
+        """Update the key to index mapping for the rows from start onward"""
+        if start == 0:
+            # Cleared in place, view_positions is the same dict while the table is unfiltered and unsorted
+            self.positions.clear()
+        for row_idx in range(start, len(self.rows)):
+            self.positions[self.rows[row_idx].key] = row_idx
+
+    def _update_view(self):
+        """Select and order the rows to show, only builds a new list when filtered or sorted"""
+        view = self.rows
+        if self.filter_keys is not None:
+            view = [row for row in view if row.key in self.filter_keys]
+        if self.sort_column is not None:
+            view = sorted(view, key=self._sort_key, reverse=self.sort_descending)
+
+        if view is self.rows:
+            self.view = self.rows
+            self.view_positions = self.positions
+        else:
+            self.view = view
+            self.view_positions = {row.key: view_idx for view_idx, row in enumerate(view)}
+
+    def _sort_key(self, row):
+        if self.sort_column in row.sort_keys:
+            return row.sort_keys[self.sort_column]
+        return row.values[self.sort_column]
+
+    def sort_by(self, column, descending=None):
+        """Sort the rows by a column, clicking the same header again reverses the order
+
+        Only the order of the rows changes, the pooled widgets are rebound to them.
+        """
+        if descending is None:
+            descending = not self.sort_descending if column == self.sort_column else False
+        self.sort_column = column
+        self.sort_descending = descending
+
+        for col_idx, label in enumerate(self.header_labels):
+            arrow = (" ▼" if descending else " ▲") if col_idx == column else ""
+            label.configure(text=self.headers[col_idx] + arrow)
+
+        self.first_row = 0
+        self._update_view()
+        self._render()
+
+    def set_filter(self, keys, scroll_to_top=True):
+        """Show only the rows with the given keys, or all rows when keys is None"""
+        self.filter_keys = None if keys is None else set(keys)
+        if scroll_to_top:
+            self.first_row = 0
+        self._update_view()
+        self._render()
+
+    def _is_visible(self, view_idx):
+        return view_idx is not None and self.first_row <= view_idx < self.first_row + self.visible_rows
+
+    def get_row(self, key):
+        """Return the row with the given key, shown or not, or None"""
+        row_idx = self.positions.get(key)
+        return self.rows[row_idx] if row_idx is not None else None
+
+    def upsert_row(self, row, index=None):
+        """Update the row with the same key in place, or insert it at index (default: at the end)
+
+        Only the widgets of a visible row are touched, rows out of view just get the new data.
+        """
+        row_idx = self.positions.get(row.key)
+        if row_idx is not None:
+            old_row = self.rows[row_idx]
+            if old_row == row:
+                return
+            self.rows[row_idx] = row
+            if self.sort_column is not None and self._sort_key(old_row) != self._sort_key(row):
+                # The row moves to another place in the sorted order
+                self._update_view()
+                self._render()
+                return
+            view_idx = self.view_positions.get(row.key)
+            if self.view is not self.rows and view_idx is not None:
+                self.view[view_idx] = row
+            if self._is_visible(view_idx):
+                self._render()
+            return
+
+        index = len(self.rows) if index is None else max(0, min(index, len(self.rows)))
+        self.rows.insert(index, row)
+        self._reindex(index)
+        if self.view is not self.rows:
+            self._update_view()
+        elif index < self.first_row:
+            # Keep the rows in view where they are when a row is inserted above them
+            self.first_row += 1
+        self._render()
+
+    def remove_row(self, key):
+        """Remove the row with the given key, returns False if there is no such row"""
+        row_idx = self.positions.pop(key, None)
+        if row_idx is None:
+            return False
+        del self.rows[row_idx]
+        self._reindex(row_idx)
+        if self.view is not self.rows:
+            self._update_view()
+        elif row_idx < self.first_row:
+            self.first_row -= 1
+        self._render()
+        return True
+
+    def _render(self):
+        """Bind the pool widgets to the rows that are currently in view"""
+        self.first_row = max(0, min(self.first_row, len(self.view) - self.visible_rows))
+
+        while len(self.pool) < self.visible_rows:
+            self._create_pool_row()
+
+        for pool_idx, widgets in enumerate(self.pool):
+            row_idx = self.first_row + pool_idx
+            if pool_idx >= self.visible_rows or row_idx >= len(self.view):
+                if widgets["shown"]:
+                    for cell in widgets["cells"]:
+                        cell.grid_remove()
+                    widgets["shown"] = False
+                widgets["key"] = None
+                continue
+
+            row = self.view[row_idx]
+            if not widgets["shown"]:
+                for cell in widgets["cells"]:
+                    cell.grid()
+                widgets["shown"] = True
+            widgets["key"] = row.key
+
+            # Only touch the widgets whose content changed
+            if widgets["values"] != row.values:
+                for col_idx, value in enumerate(row.values):
+                    if widgets["values"] is None or widgets["values"][col_idx] != value:
+                        widgets["labels"][col_idx].configure(text=value)
+                widgets["values"] = list(row.values)
+            if widgets["swatch"] is not None and widgets["color"] != row.color:
+                self._set_swatch(widgets, row.color)
+
+        if self.view:
+            self.scrollbar.set(self.first_row / len(self.view),
+                               min(1.0, (self.first_row + self.visible_rows) / len(self.view)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        # Ask for more rows once the end is in view, after this render has finished
+        if (self.on_scroll_end and not self._scroll_end_pending and self.visible_rows
+                and self.first_row + self.visible_rows >= len(self.view)):
+            self._scroll_end_pending = True
+            self.after_idle(self._notify_scroll_end)
+
+    def _notify_scroll_end(self):
+        self._scroll_end_pending = False
+        # The rows may have changed since the render that scheduled this
+        if self.first_row + self.visible_rows >= len(self.view):
+            self.on_scroll_end()
+
+    def _background_color(self, mode=None):
+        """Return the table background for the given or the current appearance mode"""
+        mode = mode or ctk.get_appearance_mode()
+        color = self.cget("fg_color")
+        if color == "transparent":
+            color = self._detect_color_of_master()
+        if isinstance(color, (list, tuple)):
+            color = color[1] if mode == "Dark" else color[0]
+        return color
+
+    def _set_swatch(self, widgets, hex_color):
+        # The label keeps a reference, so the image outlives its eviction from the shared cache
+        image = get_swatch_image(hex_color, 20)
+        widgets["swatch"].configure(image=image)
+        widgets["swatch"].image = image
+        widgets["color"] = hex_color
+
+    def update_appearance(self, mode=None):
+        """Match the swatches and their background to the current appearance mode"""
+        background = self._background_color(mode)
+        for widgets in self.pool:
+            if widgets["swatch"] is not None:
+                widgets["swatch"].configure(bg=background)
+                if widgets["color"] is not None:
+                    self._set_swatch(widgets, widgets["color"])
+
+
 def show_error(title, message):
     """Show error message dialog"""
     messagebox.showerror(title, message)
@@ -0,0 +1,159 @@
+import os
+import sys
+import time
+import logging
+import threading
+import traceback
+import collections
+import tkinter as tk
+from dataclasses import dataclass
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from Filament_Manager.diagnostics import diagnostics_path
+
+# Set to 1 to start the watchdog with the application
+WATCHDOG_ENV_VAR = "FILAMENT_MANAGER_WATCHDOG"
+
+# A heartbeat that is this much later than scheduled counts as a stall
+STALL_THRESHOLD_MS = 250
+HEARTBEAT_MS = 50
+
+logger = logging.getLogger(__name__)
+
+
+def watchdog_requested():
+    """Check whether the watchdog was switched on through the environment"""
+    return os.environ.get(WATCHDOG_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class Stall:
+    """A period in which the Tk event loop did not run"""
+    started: datetime
+    duration_ms: float
+    stack: list  # traceback.FrameSummary objects of the main thread, innermost last
+
+    def location(self):
+        """Return the innermost application frame of the stack, or the innermost frame"""
+        if not self.stack:
+            return "unknown"
+        frames = [frame for frame in self.stack if "Filament_Manager" in frame.filename] or self.stack
+        frame = frames[-1]
+        return f"{frame.name} ({os.path.basename(frame.filename)}:{frame.lineno})"
+
+
+class EventLoopWatchdog:
+    """Measures Tk event-loop lag with an after() heartbeat and logs the stalls
+
+    A helper thread notices when the heartbeat is overdue and samples the stack of the
+    main thread while it is still stuck, so the log shows what blocked the window.
+    Stalls go to a rotating log in the diagnostics folder; the latest ones are kept
+    for the Settings dialog.
+    """
+
+    def __init__(self, root, threshold_ms=STALL_THRESHOLD_MS, heartbeat_ms=HEARTBEAT_MS, keep=50):
+        self.root = root
+        self.threshold_ms = threshold_ms
+        self.heartbeat_ms = heartbeat_ms
+        self.recent = collections.deque(maxlen=keep)
+        self.stall_count = 0
+        self.longest_ms = 0.0
+
+        # Tk runs on the main thread
+        self._main_thread_id = threading.main_thread().ident
+        self._lock = threading.Lock()
+        self._last_beat = 0.0
+        self._stall_stack = None
+        self._after_id = None
+        self._stopped = threading.Event()
+        self._thread = None
+        self._log_handler = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        """Start the heartbeat and the sampling thread"""
+        if self.running:
+            return
+        if self._log_handler is None:
+            self._log_handler = RotatingFileHandler(
+                diagnostics_path("stalls.log"), maxBytes=1024 * 1024, backupCount=3, encoding="utf-8")
+            self._log_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(self._log_handler)
+
+        self._stopped.clear()
+        self._last_beat = time.perf_counter()
+        self._schedule()
+        self._thread = threading.Thread(target=self._sample, name="event-loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info("Event loop watchdog started, threshold %d ms", self.threshold_ms)
+
+    def stop(self):
+        """Stop watching, the stalls recorded so far are kept"""
+        if not self.running:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                # The window is already gone
+                pass
+            self._after_id = None
+        if self._log_handler is not None:
+            logger.removeHandler(self._log_handler)
+            self._log_handler.close()
+            self._log_handler = None
+
+    def _schedule(self):
+        self._after_id = self.root.after(self.heartbeat_ms, self._beat)
+
+    def _beat(self):
+        """Heartbeat on the Tk thread, a late beat means the event loop was blocked"""
+        now = time.perf_counter()
+        with self._lock:
+            lag_ms = (now - self._last_beat) * 1000 - self.heartbeat_ms
+            stack = self._stall_stack
+            self._stall_stack = None
+            self._last_beat = now
+        if lag_ms >= self.threshold_ms:
+            self._record(lag_ms, stack)
+        if not self._stopped.is_set():
+            self._schedule()
+
+    def _sample(self):
+        """Sample the main thread's stack once per stall, runs on the helper thread"""
+        while not self._stopped.wait(self.heartbeat_ms / 2000):
+            with self._lock:
+                overdue_ms = (time.perf_counter() - self._last_beat) * 1000 - self.heartbeat_ms
+                if overdue_ms < self.threshold_ms or self._stall_stack is not None:
+                    continue
+            frame = sys._current_frames().get(self._main_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            with self._lock:
+                if self._stall_stack is None:
+                    self._stall_stack = stack
+
+    def _record(self, duration_ms, stack):
+        stall = Stall(datetime.now(), duration_ms, list(stack or []))
+        self.recent.append(stall)
+        self.stall_count += 1
+        self.longest_ms = max(self.longest_ms, duration_ms)
+        logger.warning("Event loop stalled for %.0f ms in %s\n%s", duration_ms, stall.location(),
+                       "".join(traceback.format_list(stall.stack)) if stall.stack else "(no stack sample)")
+
+    def summary_lines(self, limit=5):
+        """Return text lines describing the recent stalls, newest first"""
+        if not self.stall_count:
+            return ["No stalls recorded" if self.running else "Watchdog is off"]
+        lines = [f"{self.stall_count} stall(s) over {self.threshold_ms} ms, longest {self.longest_ms:,.0f} ms"]
+        for stall in list(self.recent)[::-1][:limit]:
+            lines.append(f"{stall.started:%H:%M:%S}  {stall.duration_ms:,.0f} ms  {stall.location()}")
+        return lines
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""
+Benchmarks
+----------
+Headless timing and memory benchmarks for Filament Manager, see README.md
+"""
\ No newline at end of file
@@ -0,0 +1,265 @@
+"""Latency and peak memory of data_operations on synthetic workbooks
+
+Run from the repository root, no display is needed:
+
+    python -m benchmarks.bench_data_operations run --sizes small medium --output results.json
+    python -m benchmarks.bench_data_operations compare baseline.json results.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+from datetime import datetime
+
+from Filament_Manager import data_operations, snapshot, timing_log
+from benchmarks.synthetic import cached_workbook
+
+# (spools, print log rows) per size. The medium-spools and medium-log points grow one
+# dimension to its medium size and keep the other at small, so the cost of each can be
+# told apart
+SIZES = {
+    "small": (100, 1_000),
+    "medium-spools": (10_000, 1_000),
+    "medium-log": (100, 100_000),
+    "medium": (10_000, 100_000),
+    "large": (100_000, 1_000_000)
+}
+SIZE_COLUMN_WIDTH = max(len(size) for size in SIZES)
+
+# Where the generated workbooks are kept between runs
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "filament_manager_benchmarks")
+
+# A result counts as a regression when it is this much slower or bigger than the baseline
+DEFAULT_THRESHOLD = 0.25
+
+# Differences below these are noise, whatever the ratio
+MIN_TIME_DIFF_MS = 1.0
+MIN_MEMORY_DIFF_KB = 64.0
+
+
+class Benchmark:
+    """One operation to time, with an untimed setup that runs before every repeat"""
+
+    def __init__(self, name, run, setup=None, repeat=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.repeat = repeat  # Overrides the default number of repeats
+
+
+def _no_snapshot():
+    data_operations.invalidate_cache()
+    path = snapshot.snapshot_path(data_operations.excel_file)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _ensure_snapshot():
+    data_operations.invalidate_cache()
+    data_operations.read_excel_data()
+    data_operations.save_snapshot()
+    data_operations.invalidate_cache()
+
+
+def benchmarks():
+    """Return the benchmarks in the order they run, later ones rely on the state left by earlier ones"""
+    state = {"edits": 0}
+
+    def change_one_filament():
+        data = data_operations.read_excel_data()
+        filament = data[state["edits"] % len(data)]
+        filament.weight += 1
+        state["edits"] += 1
+        state["data"] = data
+
+    def next_log_entry():
+        state["entries"] = state.get("entries", 0) + 1
+        return ("2030-01-01 12:00", f"Benchmark print {state['entries']}", "F001", "PLA", "Basic", 10.0, 500.0)
+
+    return [
+        Benchmark("read_excel_data (parse)", data_operations.read_excel_data, setup=_no_snapshot),
+        Benchmark("read_excel_data (snapshot)", data_operations.read_excel_data, setup=_ensure_snapshot),
+        Benchmark("read_excel_data (cached)", data_operations.read_excel_data),
+        Benchmark("read_print_log", data_operations.read_print_log),
+        Benchmark("read_print_log (one spool)", lambda: data_operations.read_print_log("F001")),
+        Benchmark("read_print_log_page", lambda: data_operations.read_print_log_page(100)),
+        Benchmark("get_next_code", lambda: data_operations.get_next_code(state["data"]),
+                  setup=lambda: state.update(data=data_operations.read_excel_data())),
+        Benchmark("write_excel_data (one row changed)", lambda: data_operations.write_excel_data(state["data"]),
+                  setup=change_one_filament),
+        # Journaled, so most calls are cheap and every JOURNAL_BATCH_SIZE-th call saves the workbook
+        Benchmark("add_print_log_entry", lambda: data_operations.add_print_log_entry(*next_log_entry()),
+                  repeat=data_operations.JOURNAL_BATCH_SIZE),
+        Benchmark("flush_journal", data_operations.flush_journal,
+                  setup=lambda: data_operations.add_print_log_entry(*next_log_entry()))
+    ]
+
+
+def _time_benchmark(benchmark, repeat):
+    """Return the latencies of repeat runs in milliseconds"""
+    timings = []
+    for _ in range(benchmark.repeat or repeat):
+        if benchmark.setup:
+            benchmark.setup()
+        start = time.perf_counter()
+        benchmark.run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _peak_memory(benchmark):
+    """Return the peak Python memory allocated during one run in KiB"""
+    if benchmark.setup:
+        benchmark.setup()
+    tracemalloc.start()
+    try:
+        benchmark.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def run_size(size, data_dir, repeat, seed=0):
+    """Run all benchmarks on a fresh copy of the synthetic workbook of one size"""
+    filament_count, log_count = SIZES[size]
+    print(f"Preparing {size} workbook ({filament_count:,} spools, {log_count:,} log rows)...", file=sys.stderr)
+    source = cached_workbook(data_dir, filament_count, log_count, seed)
+
+    work_dir = tempfile.mkdtemp(prefix="filament_manager_bench_")
+    previous_excel_file = data_operations.excel_file
+    # Keep the benchmark's timing records out of the application's timing log
+    previous_log_file = timing_log.set_log_file(os.path.join(work_dir, timing_log.TIMING_LOG_FILE))
+    try:
+        data_operations.excel_file = shutil.copy(source, os.path.join(work_dir, "filament_data.xlsx"))
+        data_operations.invalidate_cache()
+
+        results = {}
+        for benchmark in benchmarks():
+            # Memory is measured in a separate run, tracing slows the timed runs down
+            timings = _time_benchmark(benchmark, repeat)
+            peak_kb = _peak_memory(benchmark)
+            results[benchmark.name] = {
+                "runs": len(timings),
+                "median_ms": statistics.median(timings),
+                "min_ms": min(timings),
+                "max_ms": max(timings),
+                "peak_kb": peak_kb
+            }
+            print(f"  {benchmark.name:<38} {results[benchmark.name]['median_ms']:>10.2f} ms"
+                  f" {peak_kb:>12,.0f} KiB", file=sys.stderr)
+        return {"spools": filament_count, "log_rows": log_count, "benchmarks": results}
+    finally:
+        data_operations.invalidate_cache()
+        data_operations.excel_file = previous_excel_file
+        timing_log.set_log_file(previous_log_file)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run(sizes, output, data_dir=DEFAULT_DATA_DIR, repeat=5, seed=0):
+    """Run the benchmarks for the given sizes and write the results to a JSON file"""
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "sizes": {}
+    }
+    for size in sizes:
+        report["sizes"][size] = run_size(size, data_dir, repeat, seed)
+
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+    return report
+
+
+def _format_kb(value):
+    return f"{value:>10,.0f}" if value is not None else f"{'-':>10}"
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, memory_key="peak_kb"):
+    """Return (rows, regressions) comparing two result files, rows are printable lines"""
+    rows = []
+    regressions = []
+    for size, current_size in current["sizes"].items():
+        baseline_size = baseline["sizes"].get(size)
+        if baseline_size is None:
+            continue
+        for name, result in current_size["benchmarks"].items():
+            base = baseline_size["benchmarks"].get(name)
+            if base is None:
+                continue
+            flags = []
+            time_diff = result["median_ms"] - base["median_ms"]
+            if time_diff > MIN_TIME_DIFF_MS and time_diff > base["median_ms"] * threshold:
+                flags.append("slower")
+            # Memory is None where the platform could not report it
+            if result[memory_key] is not None and base[memory_key] is not None:
+                memory_diff = result[memory_key] - base[memory_key]
+                if memory_diff > MIN_MEMORY_DIFF_KB and memory_diff > base[memory_key] * threshold:
+                    flags.append("more memory")
+
+            ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+            rows.append(f"{size:<{SIZE_COLUMN_WIDTH}} {name:<38} {base['median_ms']:>10.2f} {result['median_ms']:>10.2f}"
+                        f" {ratio:>7.2f}x {_format_kb(base[memory_key])} {_format_kb(result[memory_key])}"
+                        f"  {', '.join(flags)}")
+            if flags:
+                regressions.append((size, name, flags))
+    return rows, regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark data_operations on synthetic workbooks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write the results to JSON")
+    run_parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"],
+                            help="workbook sizes to benchmark (large takes several minutes)")
+    run_parser.add_argument("--output", default="benchmark_results.json", help="JSON file for the results")
+    run_parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    run_parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated workbooks are kept")
+    run_parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files and flag regressions")
+    compare_parser.add_argument("baseline", help="results of the reference run")
+    compare_parser.add_argument("current", help="results of the run to check")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="relative increase that counts as a regression (default 0.25)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "run":
+        run(args.sizes, args.output, args.data_dir, args.repeat, args.seed)
+        return 0
+
+    return compare_files(args.baseline, args.current, args.threshold)
+
+
+def compare_files(baseline_path, current_path, threshold=DEFAULT_THRESHOLD, memory_key="peak_kb"):
+    """Print the comparison of two result files, returns 1 when something regressed"""
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(current_path, encoding="utf-8") as file:
+        current = json.load(file)
+    rows, regressions = compare(baseline, current, threshold, memory_key)
+
+    print(f"{'size':<{SIZE_COLUMN_WIDTH}} {'benchmark':<38} {'base ms':>10} {'new ms':>10} {'ratio':>8} {'base KiB':>10} {'new KiB':>10}")
+    for row in rows:
+        print(row)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,320 @@
+"""Rendering cost of the main window and dialogs on synthetic workbooks
+
+Starts FilamentManagerApp under a headless X server (Xvfb, through the optional
+xvfbwrapper package) and reports the time, the widget count and the resident
+memory after every step:
+
+    python -m benchmarks.bench_ui run --sizes small medium --output ui_results.json
+    python -m benchmarks.bench_ui compare ui_baseline.json ui_results.json
+
+Use --use-display to run on the current display instead of starting Xvfb.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import itertools
+import platform
+import tempfile
+import statistics
+from datetime import datetime
+
+from Filament_Manager import data_operations, timing_log
+from benchmarks.synthetic import cached_workbook
+from benchmarks.bench_data_operations import SIZES, DEFAULT_DATA_DIR, DEFAULT_THRESHOLD, compare_files
+
+# Give up waiting for a background load after this long
+SETTLE_TIMEOUT_S = 600
+
+# Message boxes the application may open; they would block the benchmark until clicked
+MESSAGE_BOXES = ("showinfo", "showwarning", "showerror", "askquestion", "askokcancel",
+                 "askyesno", "askyesnocancel", "askretrycancel")
+
+
+class BenchmarkError(Exception):
+    """The application reported an error while a step ran"""
+
+
+def rss_kb():
+    """Return the resident memory of this process in KiB, or None where it cannot be read"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as file:
+            resident_pages = int(file.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        # Not on Windows, install psutil there to get the memory
+        import resource
+    except ImportError:
+        return None
+    # Fall back to the peak, which is in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform == "darwin" else peak
+
+
+def widget_count(widget):
+    """Return the number of Tk widgets below widget, including open dialogs"""
+    return sum(1 + widget_count(child) for child in widget.winfo_children())
+
+
+class UiBenchmark:
+    """Measures the steps against one running application"""
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = {}
+        self.app = None
+        self.errors = []
+
+    def settle(self):
+        """Process events until the background loads are done and the window is drawn
+
+        Raises BenchmarkError when the application showed an error or a callback failed,
+        and TimeoutError when the loads take longer than SETTLE_TIMEOUT_S.
+        """
+        deadline = time.perf_counter() + SETTLE_TIMEOUT_S
+        self.app.update()
+        while self.app.loads and not self.errors:
+            if time.perf_counter() > deadline:
+                raise TimeoutError("Background load did not finish")
+            time.sleep(0.001)
+            self.app.update()
+        self.app.update_idletasks()
+        if self.errors:
+            raise BenchmarkError("; ".join(self.errors))
+
+    def replace_message_boxes(self, messagebox):
+        """Record message boxes instead of showing them, returns the originals"""
+        originals = {name: getattr(messagebox, name) for name in MESSAGE_BOXES}
+
+        def record(name):
+            def message_box(title=None, message=None, **options):
+                if name in ("showerror", "showwarning"):
+                    self.errors.append(f"{title}: {message}")
+                # Answer no, so nothing is deleted or overwritten
+                return None if name.startswith("show") else False
+            return message_box
+
+        for name in MESSAGE_BOXES:
+            setattr(messagebox, name, record(name))
+        return originals
+
+    def report_callback_exception(self, exception_type, exception, traceback):
+        self.errors.append(f"{exception_type.__name__}: {exception}")
+
+    def record(self, name, timings):
+        self.results[name] = {
+            "runs": len(timings),
+            "median_ms": statistics.median(timings),
+            "min_ms": min(timings),
+            "max_ms": max(timings),
+            "widgets": widget_count(self.app),
+            "rss_kb": rss_kb()
+        }
+        result = self.results[name]
+        memory = f"{result['rss_kb']:>12,.0f} KiB" if result["rss_kb"] is not None else "  memory unknown"
+        print(f"  {name:<38} {result['median_ms']:>10.1f} ms {result['widgets']:>8,} widgets {memory}",
+              file=sys.stderr)
+
+    def time_step(self, name, step, setup=None, repeat=None):
+        timings = []
+        for _ in range(repeat or self.repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            step()
+            self.settle()
+            timings.append((time.perf_counter() - start) * 1000)
+        self.record(name, timings)
+
+    def open_dialog(self, name, create):
+        """Time creating and drawing a dialog, the widgets are counted while the last one is open"""
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            dialog = create()
+            self.settle()
+            timings.append((time.perf_counter() - start) * 1000)
+            if len(timings) == self.repeat:
+                self.record(name, timings)
+            dialog.destroy()
+            self.settle()
+
+    def run(self):
+        # Imported here so the display exists before tkinter is loaded
+        import customtkinter as ctk
+        from tkinter import messagebox
+        from Filament_Manager.app import FilamentManagerApp
+        from Filament_Manager.storage import get_repository
+        from Filament_Manager.dialogs.usage_dialog import FilamentUsageDialog
+        from Filament_Manager.dialogs.filter_dialog import FilterRecommendationsDialog
+        from Filament_Manager.dialogs.add_filament_dialog import AddFilamentDialog
+        from Filament_Manager.dialogs.settings_dialog import SettingsDialog
+        from Filament_Manager.dialogs.filament_edit_dialog import FilamentEditDialog
+        from Filament_Manager.dialogs.print_history_edit_dialog import PrintHistoryEditDialog
+
+        ctk.set_appearance_mode("light")
+        repository = get_repository()
+        message_boxes = self.replace_message_boxes(messagebox)
+
+        try:
+            # Window construction includes the first load of the data
+            start = time.perf_counter()
+            self.app = FilamentManagerApp()
+            self.app.report_callback_exception = self.report_callback_exception
+            self.settle()
+            self.record("construct window", [(time.perf_counter() - start) * 1000])
+
+            self.time_step("full refresh", lambda: (self.app.refresh_data(), self.app.load_print_history()))
+
+            filament = repository.list_filaments()[0]
+
+            def change_weight():
+                with repository.transaction(defer=True) as transaction:
+                    changed = transaction.get_filament(filament.code)
+                    changed.weight += 1
+                    transaction.upsert_filament(changed)
+
+            self.time_step("single row update", lambda: self.app.update_filament_row(filament.code),
+                           setup=change_weight)
+
+            self.time_step("search", lambda: (self.app.search_entry.insert(0, "pla"), self.app.apply_search()),
+                           setup=lambda: self.app.search_entry.delete(0, "end"))
+            self.app.search_entry.delete(0, "end")
+            self.app.apply_search()
+
+            self.time_step("sort by weight", lambda: self.app.overview_table.sort_by(5))
+
+            entry = repository.query_log_page(1)[0]
+            print_data = {
+                "timestamp": entry.timestamp,
+                "print_name": entry.print_name,
+                "material": f"{entry.material} {entry.variant}",
+                "used_weight": f"{entry.used_weight:,.0f}g",
+                "remaining_weight": f"{entry.remaining_weight:,.0f}g",
+                "filament_code": entry.filament_code,
+                "entry_id": entry.entry_id
+            }
+            self.open_dialog("open FilamentUsageDialog", lambda: FilamentUsageDialog(self.app))
+            self.open_dialog("open FilterRecommendationsDialog", lambda: FilterRecommendationsDialog(self.app))
+            self.open_dialog("open AddFilamentDialog", lambda: AddFilamentDialog(self.app))
+            self.open_dialog("open SettingsDialog", lambda: SettingsDialog(self.app))
+            self.open_dialog("open FilamentEditDialog",
+                             lambda: FilamentEditDialog(self.app, repository.get_filament(filament.code)))
+            self.open_dialog("open PrintHistoryEditDialog", lambda: PrintHistoryEditDialog(self.app, print_data))
+
+            modes = itertools.cycle(["Dark", "Light"])
+            self.time_step("appearance mode switch", lambda: self.app.change_appearance_mode(next(modes)))
+        finally:
+            if self.app is not None:
+                self.app.save_queue.close()
+                data_operations.set_save_handler(None)
+                self.app.destroy()
+            for name, message_box in message_boxes.items():
+                setattr(messagebox, name, message_box)
+        return self.results
+
+
+def run_size(size, data_dir, repeat, seed=0):
+    """Start the application on a fresh copy of the synthetic workbook of one size and measure it"""
+    from Filament_Manager import storage
+
+    filament_count, log_count = SIZES[size]
+    print(f"Preparing {size} workbook ({filament_count:,} spools, {log_count:,} log rows)...", file=sys.stderr)
+    source = cached_workbook(data_dir, filament_count, log_count, seed)
+
+    work_dir = tempfile.mkdtemp(prefix="filament_manager_ui_bench_")
+    previous_excel_file = data_operations.excel_file
+    previous_database_file = storage.database_file
+    # Keep the benchmark's timing records out of the application's timing log
+    previous_log_file = timing_log.set_log_file(os.path.join(work_dir, timing_log.TIMING_LOG_FILE))
+    try:
+        # Point both backends into the work folder, so the Excel copy is used
+        data_operations.excel_file = shutil.copy(source, os.path.join(work_dir, "filament_data.xlsx"))
+        storage.database_file = os.path.join(work_dir, "filament_data.db")
+        storage.reset_repository()
+        data_operations.invalidate_cache()
+
+        results = UiBenchmark(repeat).run()
+        return {"spools": filament_count, "log_rows": log_count, "benchmarks": results}
+    finally:
+        storage.reset_repository()
+        data_operations.invalidate_cache()
+        data_operations.excel_file = previous_excel_file
+        storage.database_file = previous_database_file
+        timing_log.set_log_file(previous_log_file)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run(sizes, output, data_dir=DEFAULT_DATA_DIR, repeat=3, seed=0, use_display=False):
+    """Run the UI benchmarks for the given sizes and write the results to a JSON file"""
+    display = None
+    if not use_display:
+        try:
+            from xvfbwrapper import Xvfb
+        except ImportError:
+            raise SystemExit("xvfbwrapper is not installed: pip install xvfbwrapper, "
+                             "or pass --use-display to run on the current display")
+        display = Xvfb(width=1920, height=1080)
+        display.start()
+
+    try:
+        report = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "sizes": {}
+        }
+        for size in sizes:
+            report["sizes"][size] = run_size(size, data_dir, repeat, seed)
+    finally:
+        if display is not None:
+            display.stop()
+
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the user interface on synthetic workbooks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write the results to JSON")
+    run_parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"],
+                            help="workbook sizes to benchmark")
+    run_parser.add_argument("--output", default="ui_benchmark_results.json", help="JSON file for the results")
+    run_parser.add_argument("--repeat", type=int, default=3, help="timed runs per step")
+    run_parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated workbooks are kept")
+    run_parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data")
+    run_parser.add_argument("--use-display", action="store_true",
+                            help="use the current display instead of starting Xvfb")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files and flag regressions")
+    compare_parser.add_argument("baseline", help="results of the reference run")
+    compare_parser.add_argument("current", help="results of the run to check")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="relative increase that counts as a regression (default 0.25)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "run":
+        run(args.sizes, args.output, args.data_dir, args.repeat, args.seed, args.use_display)
+        return 0
+    return compare_files(args.baseline, args.current, args.threshold, memory_key="rss_kb")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,96 @@
+import os
+import random
+from datetime import datetime, timedelta
+
+import openpyxl
+
+from Filament_Manager import data_operations
+from Filament_Manager.models import FilamentData, PrintLogEntry
+
+MATERIALS = ["PLA", "PETG", "ABS", "ASA", "TPU", "PA", "PC"]
+VARIANTS = ["Basic", "Matte", "Silk", "Tough", "Glow", "Carbon Fiber", "Transparent"]
+SUPPLIERS = ["Bambu Lab", "Prusament", "Polymaker", "eSun", "Sunlu", "Elegoo", "Overture"]
+DESCRIPTIONS = ["", "", "Dry before use", "Spare spool", "Opened in the enclosure", "For functional parts"]
+
+
+def sheet_headers():
+    """Return the headers of both sheets exactly as init_excel() writes them"""
+    workbook = data_operations.new_workbook()
+    return (
+        [cell.value for cell in workbook["Filament_Data"][1]],
+        [cell.value for cell in workbook["Print_Log"][1]]
+    )
+
+
+def synthetic_filaments(count, rng):
+    """Return count filaments with realistic values"""
+    start = datetime(2020, 1, 1)
+    filaments = []
+    for index in range(count):
+        date_opened = start + timedelta(days=rng.randrange(2000))
+        filaments.append(FilamentData(
+            code=f"F{index + 1:03d}",
+            material=rng.choice(MATERIALS),
+            variant=rng.choice(VARIANTS),
+            supplier=rng.choice(SUPPLIERS),
+            # Real workbooks hold both datetimes and dates typed as text
+            date_opened=date_opened if index % 4 else date_opened.strftime("%Y-%m-%d"),
+            weight=float(rng.randrange(50, 1000)),
+            hex_color=f"#{rng.randrange(0x1000000):06X}",
+            empty_spool_weight=float(rng.choice([150, 180, 200, 250])),
+            description=rng.choice(DESCRIPTIONS)
+        ))
+    return filaments
+
+
+def synthetic_print_log(count, filaments, rng):
+    """Return count print log entries spread over the filaments, oldest first"""
+    timestamp = datetime(2021, 1, 1)
+    entries = []
+    for index in range(count):
+        timestamp += timedelta(minutes=rng.randrange(1, 240))
+        filament = rng.choice(filaments)
+        entries.append(PrintLogEntry(
+            timestamp=timestamp.strftime("%Y-%m-%d %H:%M"),
+            print_name=f"Print {index + 1}",
+            filament_code=filament.code,
+            material=filament.material,
+            variant=filament.variant,
+            used_weight=float(rng.randrange(1, 200)),
+            remaining_weight=float(rng.randrange(0, 1000)),
+            entry_id=index + 1
+        ))
+    return entries
+
+
+def write_synthetic_workbook(path, filament_count, log_count, seed=0):
+    """Write a workbook in the init_excel() schema with the given number of spools and log rows"""
+    rng = random.Random(seed)
+    filament_headers, log_headers = sheet_headers()
+    filaments = synthetic_filaments(filament_count, rng)
+
+    # Write-only mode streams the rows, so a million log rows fit in memory
+    workbook = openpyxl.Workbook(write_only=True)
+    filaments_sheet = workbook.create_sheet("Filament_Data")
+    filaments_sheet.append(filament_headers)
+    for filament in filaments:
+        filaments_sheet.append(filament.to_row())
+
+    print_log_sheet = workbook.create_sheet("Print_Log")
+    print_log_sheet.append(log_headers)
+    for entry in synthetic_print_log(log_count, filaments, rng):
+        print_log_sheet.append(entry.to_row())
+
+    workbook.save(path)
+    return path
+
+
+def cached_workbook(directory, filament_count, log_count, seed=0):
+    """Return the path of a synthetic workbook, generating it only the first time"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"synthetic_{filament_count}_{log_count}_{seed}.xlsx")
+    if not os.path.exists(path):
+        temp_path = path + ".tmp.xlsx"
+        write_synthetic_workbook(temp_path, filament_count, log_count, seed)
+        os.replace(temp_path, path)
+    return path
\ No newline at end of file
@@ -1,20 +1,87 @@
 import os
-import customtkinter as ctk
-from Filament_Manager.data_operations import init_excel
-from Filament_Manager.app import FilamentManagerApp
+import sys
+import logging
+import argparse
+
+
+def import_app_modules():
+    """Import everything a normal launch needs before the window opens"""
+    import customtkinter
+    from Filament_Manager import data_operations
+    from Filament_Manager import storage
+    from Filament_Manager import app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Filament Manager")
+    parser.add_argument(
+        "--profile-imports",
+        action="store_true",
+        help="print how long each startup import takes and exit"
+    )
+    parser.add_argument(
+        "--watchdog",
+        action="store_true",
+        help="log UI freezes with the stack that caused them (also FILAMENT_MANAGER_WATCHDOG=1)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="write a cProfile and speedscope profile of startup, refreshes, saves, reports and labels "
+             "to the diagnostics folder (also FILAMENT_MANAGER_PROFILE=1)"
+    )
+    return parser.parse_args(argv)
 
 
 def main():
+    args = parse_args()
+
+    if args.profile_imports:
+        # Time the imports of a normal launch without opening the window
+        from Filament_Manager.import_profile import profile_startup_imports
+        sys.exit(profile_startup_imports(import_app_modules))
+
+    # Imported here rather than at the top so --profile-imports can time them
+    import customtkinter as ctk
+    from Filament_Manager import data_operations
+    from Filament_Manager.storage import get_repository
+    from Filament_Manager.app import FilamentManagerApp
+    from Filament_Manager.watchdog import watchdog_requested
+    from Filament_Manager.profiling import profile_requested, enable_profiling, profile_operation
+
+    # Show timing and diagnostic messages on the console
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    
+    if args.profile or profile_requested():
+        enable_profiling()
+    
     # Set appearance mode and default color theme
     ctk.set_appearance_mode("system")
     ctk.set_default_color_theme("blue")
     
-    # Ensure Excel file exists
-    init_excel()
+    with profile_operation("startup"):
+        # Ensure the data storage exists
+        get_repository()
+        
+        # Create the application
+        app = FilamentManagerApp()
     
-    # Create and run the application
-    app = FilamentManagerApp()
+    # Run the application
+    if args.watchdog or watchdog_requested():
+        app.watchdog.start()
     app.mainloop()
+    app.watchdog.stop()
+    
+    # Stop the background saves and write anything still in the journal
+    app.save_queue.close()
+    data_operations.set_save_handler(None)
+    get_repository().close()
+    
+    # Keep the parsed workbook for a fast next start
+    try:
+        data_operations.save_snapshot()
+    except Exception as e:
+        logging.getLogger(__name__).warning("Could not write snapshot: %s", e)
 
 
 if __name__ == "__main__":
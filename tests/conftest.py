@@ -0,0 +1,25 @@
+import shutil
+
+import pytest
+
+from Filament_Manager import data_operations, diagnostics, storage, timing_log
+
+SAMPLE_WORKBOOK = data_operations.excel_file
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    """Point the Excel and SQLite backends at a copy of the sample workbook in tmp_path"""
+    path = str(tmp_path / "filament_data.xlsx")
+    shutil.copy(SAMPLE_WORKBOOK, path)
+    monkeypatch.setattr(data_operations, "excel_file", path)
+    monkeypatch.setattr(storage, "database_file", str(tmp_path / "filament_data.db"))
+    # Timing records and profiles of the tests stay out of the real diagnostics folder
+    monkeypatch.setattr(diagnostics, "diagnostics_directory", str(tmp_path / "diagnostics"))
+    previous_log_file = timing_log.set_log_file(str(tmp_path / timing_log.TIMING_LOG_FILE))
+    storage.reset_repository()
+    data_operations.invalidate_cache()
+    yield path
+    storage.reset_repository()
+    data_operations.invalidate_cache()
+    timing_log.set_log_file(previous_log_file)
@@ -0,0 +1,100 @@
+import os
+
+from Filament_Manager import data_operations, storage
+from Filament_Manager.balances import SpoolLedger, recompute_all_balances, recompute_repository_balances
+from Filament_Manager.models import FilamentData, PrintLogEntry
+
+
+def make_entry(entry_id, timestamp, used_weight, remaining_weight, code="F001"):
+    return PrintLogEntry(timestamp, f"Print {entry_id}", code, "PLA", "Basic", used_weight, remaining_weight, entry_id)
+
+
+def make_filament(weight, code="F001"):
+    return FilamentData(code, "PLA", "Basic", "Acme", "2024-01-01", weight, "#FFFFFF", 250)
+
+
+def test_ledger_orders_backdated_entries_by_timestamp():
+    entries = [
+        make_entry(1, "2024-01-01 10:00", 100, 900),
+        make_entry(2, "2024-01-03 10:00", 100, 700),
+        # Imported later, printed between the other two
+        make_entry(3, "2024-01-02 10:00", 100, 800)
+    ]
+    ledger = SpoolLedger(entries)
+    assert [entry.entry_id for entry in ledger.entries] == [1, 3, 2]
+
+    changed = ledger.update_used_weight(1, 150)
+    assert {entry.entry_id: entry.remaining_weight for entry in entries} == {1: 850, 2: 650, 3: 750}
+    assert [entry.entry_id for entry in changed] == [1, 3, 2]
+
+
+def test_bulk_recompute_orders_backdated_entries_by_timestamp():
+    entries = [
+        make_entry(1, "2024-01-01 10:00", 100, 0),
+        make_entry(2, "2024-01-03 10:00", 100, 700),
+        make_entry(3, "2024-01-02 10:00", 100, 0)
+    ]
+    recompute_all_balances([make_filament(700)], entries)
+    assert {entry.entry_id: entry.remaining_weight for entry in entries} == {1: 900, 2: 700, 3: 800}
+
+
+def consistent_log(start_weights, used_weights):
+    """Return a log where every remaining weight follows from the spool's start weight"""
+    entries = []
+    remaining = dict(start_weights)
+    for index, (code, used_weight) in enumerate(used_weights, start=1):
+        remaining[code] -= used_weight
+        entries.append(make_entry(index, f"2024-01-01 10:{index:02d}", used_weight, remaining[code], code))
+    return entries, remaining
+
+
+def test_ledger_edit_only_changes_the_suffix():
+    entries, _ = consistent_log({"F001": 1000}, [("F001", 50)] * 6)
+    before = [entry.remaining_weight for entry in entries]
+
+    changed = SpoolLedger(entries).update_used_weight(4, 80)
+    assert [entry.entry_id for entry in changed] == [4, 5, 6]
+    assert [entry.remaining_weight for entry in entries[:3]] == before[:3]
+    assert [entry.remaining_weight for entry in entries[3:]] == [weight - 30 for weight in before[3:]]
+
+
+def test_ledger_edits_match_the_bulk_recompute():
+    used = [("F001", 12.5), ("F002", 30), ("F001", 7), ("F002", 3.25), ("F001", 40), ("F002", 18), ("F001", 9)]
+    entries, remaining = consistent_log({"F001": 1000, "F002": 750}, used)
+    for code in ("F001", "F002"):
+        ledger = SpoolLedger([entry for entry in entries if entry.filament_code == code])
+        first = ledger.entries[0]
+        ledger.update_used_weight(first.entry_id, first.used_weight + 5)
+        ledger.remove(ledger.entries[1].entry_id)
+        entries = [entry for entry in entries if entry.filament_code != code or ledger.get(entry.entry_id)]
+    filaments = [make_filament(weight, code) for code, weight in remaining.items()]
+
+    expected = {entry.entry_id: entry.remaining_weight for entry in entries}
+    assert recompute_all_balances(filaments, entries) == []
+    assert {entry.entry_id: entry.remaining_weight for entry in entries} == expected
+
+
+def test_bulk_recompute_drops_corrections_the_ledger_keeps():
+    entries = [
+        make_entry(1, "2024-01-01 10:00", 100, 900),
+        # Reweighed at 850 before the second print
+        make_entry(2, "2024-01-02 10:00", 100, 750),
+        make_entry(3, "2024-01-03 10:00", 100, 650)
+    ]
+    SpoolLedger(entries).update_used_weight(3, 50)
+    assert [entry.remaining_weight for entry in entries] == [900, 750, 700]
+
+    recompute_all_balances([make_filament(700)], entries)
+    assert [entry.remaining_weight for entry in entries] == [850, 750, 700]
+
+
+def test_deferred_repository_recompute_leaves_the_save_to_the_caller(workbook):
+    repository = storage.get_repository()
+    entry = repository.query_log()[0]
+    entry.remaining_weight += 123
+    repository.update_log_entry(entry)
+
+    before = os.stat(workbook).st_mtime_ns
+    assert recompute_repository_balances(repository, defer=True) >= 1
+    assert os.stat(workbook).st_mtime_ns == before
+    assert data_operations.has_pending_changes()
@@ -0,0 +1,71 @@
+import openpyxl
+
+from Filament_Manager import data_operations
+
+
+def log_usage(name):
+    return data_operations.add_print_log_entry("2030-01-01 12:00", name, "F001", "PLA", "Basic", 10.0, 500.0)
+
+
+def reload_ids():
+    """Return the entry IDs by print name as read back from the files"""
+    data_operations.invalidate_cache()
+    return {entry.print_name: entry.entry_id for entry in data_operations.read_print_log()}
+
+
+def test_ids_survive_delete_and_flush(workbook):
+    first, second, third = (log_usage(f"ID test {index}") for index in range(3))
+    assert first < second < third
+
+    with data_operations.transaction() as transaction:
+        transaction.delete_log_entry(second)
+
+    ids = reload_ids()
+    assert ids["ID test 0"] == first
+    assert ids["ID test 2"] == third
+    assert "ID test 1" not in ids
+    assert data_operations.get_log_entry(second) is None
+
+
+def test_deleted_ids_are_not_reused(workbook):
+    entry_id = log_usage("ID test last")
+    with data_operations.transaction() as transaction:
+        transaction.delete_log_entry(entry_id)
+    data_operations.invalidate_cache()
+
+    # The cleared row keeps its ID, so the highest ID is still known after a reload
+    assert log_usage("ID test next") == entry_id + 1
+
+
+def test_update_keeps_the_id(workbook):
+    entry_id = log_usage("ID test edit")
+    with data_operations.transaction() as transaction:
+        entry = transaction.get_log_entry(entry_id)
+        entry.used_weight = 42.0
+        transaction.update_log_entry(entry)
+
+    data_operations.invalidate_cache()
+    entry = data_operations.get_log_entry(entry_id)
+    assert entry.print_name == "ID test edit" and entry.used_weight == 42.0
+
+
+def test_rows_without_ids_get_the_same_ids_every_time(workbook):
+    book = openpyxl.load_workbook(workbook)
+    sheet = book["Print_Log"]
+    for row in sheet.iter_rows(min_row=2, min_col=data_operations.LOG_ID_COLUMN,
+                               max_col=data_operations.LOG_ID_COLUMN):
+        row[0].value = None
+    book.save(workbook)
+
+    def sheet_order_ids():
+        data_operations.invalidate_cache()
+        return [(entry.print_name, entry.entry_id) for entry in data_operations.read_print_log()]
+
+    first = sheet_order_ids()
+    assert sheet_order_ids() == first
+    assert [entry_id for _, entry_id in first] == list(range(1, len(first) + 1))
+
+    # Saving stores the assigned IDs, so they stay the same after the next parse
+    log_usage("ID test stored")
+    data_operations.flush_journal()
+    assert sheet_order_ids()[:len(first)] == first
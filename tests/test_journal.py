@@ -0,0 +1,92 @@
+import os
+import shutil
+
+from Filament_Manager import data_operations
+
+
+def log_usage(name, weight=10.0):
+    return data_operations.add_print_log_entry("2030-01-01 12:00", name, "F001", "PLA", "Basic", weight, 500.0)
+
+
+def workbook_print_names(path):
+    _, print_log = data_operations.parse_workbook(path)
+    return [entry.print_name for entry in print_log]
+
+
+def test_usage_is_journaled_without_saving_the_workbook(workbook):
+    before = os.stat(workbook).st_mtime_ns
+    log_usage("Journal test print")
+
+    assert os.stat(workbook).st_mtime_ns == before
+    assert "Journal test print" not in workbook_print_names(workbook)
+    with open(data_operations.journal_path(), encoding="utf-8") as journal:
+        assert len(journal.readlines()) == 1
+
+
+def test_journal_is_replayed_after_a_crash(workbook):
+    entry_id = log_usage("Journal test print")
+    # A restart loses everything in memory, only the files remain
+    data_operations.invalidate_cache()
+
+    entry = data_operations.get_log_entry(entry_id)
+    assert entry is not None and entry.print_name == "Journal test print"
+    assert data_operations.has_pending_changes()
+
+    data_operations.flush_journal()
+    assert not os.path.exists(data_operations.journal_path())
+    assert "Journal test print" in workbook_print_names(workbook)
+
+
+def test_torn_last_line_is_ignored(workbook):
+    log_usage("Journal test print")
+    with open(data_operations.journal_path(), "a", encoding="utf-8") as journal:
+        journal.write('{"upsert": [], "delete": [], "log": [{"timestamp": "2030-')
+    data_operations.invalidate_cache()
+
+    names = [entry.print_name for entry in data_operations.read_print_log()]
+    assert names.count("Journal test print") == 1
+    data_operations.flush_journal()
+    assert workbook_print_names(workbook).count("Journal test print") == 1
+
+
+def test_replaying_an_already_saved_journal_adds_nothing(workbook, tmp_path):
+    log_usage("Journal test print")
+    log_usage("Journal test cube")
+    # Crash after the workbook was saved but before the journal was removed
+    saved_journal = str(tmp_path / "journal.copy")
+    shutil.copy(data_operations.journal_path(), saved_journal)
+    data_operations.flush_journal()
+    shutil.copy(saved_journal, data_operations.journal_path())
+    data_operations.invalidate_cache()
+
+    entries = data_operations.read_print_log()
+    assert [entry.print_name for entry in entries].count("Journal test print") == 1
+    assert len({entry.entry_id for entry in entries}) == len(entries)
+    data_operations.flush_journal()
+    assert workbook_print_names(workbook).count("Journal test cube") == 1
+
+
+def test_full_batch_folds_the_journal_into_the_workbook(workbook, monkeypatch):
+    monkeypatch.setattr(data_operations, "JOURNAL_BATCH_SIZE", 3)
+    for index in range(3):
+        log_usage(f"Print {index}")
+
+    assert not data_operations.has_pending_changes()
+    assert not os.path.exists(data_operations.journal_path())
+    assert workbook_print_names(workbook)[-3:] == ["Print 0", "Print 1", "Print 2"]
+
+
+def test_full_batch_goes_to_the_save_handler(workbook, monkeypatch):
+    monkeypatch.setattr(data_operations, "JOURNAL_BATCH_SIZE", 3)
+    requests = []
+    data_operations.set_save_handler(lambda: requests.append(1))
+    try:
+        before = os.stat(workbook).st_mtime_ns
+        for index in range(3):
+            log_usage(f"Print {index}")
+    finally:
+        data_operations.set_save_handler(None)
+
+    assert requests == [1]
+    assert os.stat(workbook).st_mtime_ns == before
+    assert data_operations.has_pending_changes()
@@ -0,0 +1,47 @@
+import json
+
+from Filament_Manager import diagnostics, profiling
+
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+def test_recursive_function_is_in_speedscope_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(diagnostics, "diagnostics_directory", str(tmp_path))
+    monkeypatch.setattr(profiling, "_enabled", True)
+
+    with profiling.profile_operation("recursion") as operation:
+        fib(20)
+    # finish() ran when the block ended, so a second call has nothing left to write
+    assert operation.finish() is None
+
+    (speedscope_file,) = tmp_path.glob("profile_recursion_*.speedscope.json")
+    with open(speedscope_file, encoding="utf-8") as file:
+        profile = json.load(file)
+    frames = profile["shared"]["frames"]
+    samples = profile["profiles"][0]["samples"]
+    weights = profile["profiles"][0]["weights"]
+
+    fib_frames = {index for index, frame in enumerate(frames) if frame["name"] == "fib"}
+    assert len(fib_frames) == 1
+    fib_seconds = sum(weight for sample, weight in zip(samples, weights) if fib_frames & set(sample))
+    # Nearly all of the profiled time was spent in fib
+    assert fib_seconds > 0.9 * sum(weights)
+    # The recursion is folded into one frame instead of a stack as deep as the recursion
+    assert max(len(sample) for sample in samples) <= 3
+
+
+def test_speedscope_profile_keeps_all_time():
+    def top():
+        return fib(18)
+
+    profile = profiling.cProfile.Profile()
+    profile.enable()
+    fib(18)
+    top()
+    profile.disable()
+    stats = profiling.pstats.Stats(profile)
+
+    speedscope = profiling.speedscope_profile(stats, "calls")
+    assert abs(sum(speedscope["profiles"][0]["weights"]) - stats.total_tt) < 0.01 * stats.total_tt
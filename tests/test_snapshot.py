@@ -0,0 +1,44 @@
+import os
+import pickle
+
+from Filament_Manager import data_operations, snapshot
+
+
+def test_snapshot_round_trip(workbook):
+    os.chmod(workbook, 0o644)
+    filaments = data_operations.read_excel_data()
+    print_log = data_operations.read_print_log()
+
+    assert os.stat(snapshot.snapshot_path(workbook)).st_mode & 0o777 == 0o644
+    contents = snapshot.read_snapshot(workbook)
+    assert contents is not None
+    assert contents[0] == filaments
+    assert contents[1] == print_log
+
+
+def test_pickled_snapshot_is_not_loaded(workbook, tmp_path):
+    marker = tmp_path / "unpickled"
+
+    class Payload:
+        def __reduce__(self):
+            return (open, (str(marker), "w"))
+
+    with open(snapshot.snapshot_path(workbook), "wb") as file:
+        pickle.dump(Payload(), file)
+
+    assert snapshot.read_snapshot(workbook) is None
+    assert not marker.exists()
+
+
+def test_snapshot_of_other_content_is_ignored(workbook):
+    data_operations.read_excel_data()
+    # Same size and modification time, different content
+    stat = os.stat(workbook)
+    with open(workbook, "r+b") as file:
+        file.seek(stat.st_size - 1)
+        last_byte = file.read(1)
+        file.seek(stat.st_size - 1)
+        file.write(bytes([last_byte[0] ^ 0xFF]))
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert snapshot.read_snapshot(workbook) is None
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from Filament_Manager import data_operations, storage
+from Filament_Manager.models import PrintLogEntry
+
+
+def make_entry(name, code="F001"):
+    return PrintLogEntry("2030-01-01 12:00", name, code, "PLA", "Basic", 10.0, 500.0)
+
+
+@pytest.fixture
+def repository(workbook):
+    data_operations.add_print_log_entry("2030-01-01 12:00", "Journaled print", "F001", "PLA", "Basic", 10.0, 500.0)
+    repository = storage.migrate_to_sqlite()
+    yield repository
+    storage.reset_repository()
+
+
+def test_migration_copies_everything_including_the_journal(workbook, repository):
+    assert isinstance(repository, storage.SqliteRepository)
+    assert os.path.exists(storage.database_file)
+    assert repository.list_filaments() == data_operations.read_excel_data()
+
+    excel_log = data_operations.read_print_log()
+    sqlite_log = repository.query_log()
+    assert sqlite_log == excel_log
+    assert sqlite_log[-1].print_name == "Journaled print"
+
+
+def test_migration_refuses_to_overwrite_a_database(repository):
+    with pytest.raises(FileExistsError):
+        storage.import_from_excel()
+
+
+def test_failed_transaction_is_rolled_back(repository):
+    filament = repository.list_filaments()[0]
+    log_size = len(repository.query_log())
+
+    with pytest.raises(RuntimeError):
+        with repository.transaction() as transaction:
+            changed = transaction.get_filament(filament.code)
+            changed.weight -= 25
+            transaction.upsert_filament(changed)
+            transaction.append_log_entry(make_entry("Rolled back", filament.code))
+            raise RuntimeError("cancelled")
+
+    assert repository.get_filament(filament.code).weight == filament.weight
+    assert len(repository.query_log()) == log_size
+
+
+def test_entry_ids_are_kept_and_not_reused(repository):
+    entry = make_entry("SQLite test")
+    repository.append_log_entry(entry)
+    last_id = entry.entry_id
+    assert repository.get_log_entry(last_id).print_name == "SQLite test"
+
+    repository.delete_log_entry(last_id)
+    assert repository.get_log_entry(last_id) is None
+    following = make_entry("SQLite test 2")
+    repository.append_log_entry(following)
+    assert following.entry_id == last_id + 1
+
+
+def test_queries(repository):
+    for index in range(3):
+        repository.append_log_entry(make_entry(f"Query test {index}", code="F999"))
+
+    assert [entry.print_name for entry in repository.query_log(filament_code="F999")] == \
+        ["Query test 0", "Query test 1", "Query test 2"]
+    assert [entry.print_name for entry in repository.query_log(filament_code="F999", limit=2)] == \
+        ["Query test 1", "Query test 2"]
+    page = repository.query_log_page(2)
+    assert [entry.print_name for entry in page] == ["Query test 2", "Query test 1"]
+    assert repository.query_log_page(1, before_id=page[-1].entry_id)[0].print_name == "Query test 0"
+
+
+def test_export_round_trip(repository, tmp_path):
+    export_path = str(tmp_path / "export.xlsx")
+    storage.export_to_excel(repository, export_path)
+
+    filaments, print_log = data_operations.parse_workbook(export_path)
+    assert filaments == repository.list_filaments()
+    assert print_log == repository.query_log()
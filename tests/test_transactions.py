@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from Filament_Manager import data_operations
+from Filament_Manager.models import PrintLogEntry
+
+
+def register_usage(transaction, code, used_weight):
+    """Take used_weight off a spool and log it, as the usage dialog does"""
+    filament = transaction.get_filament(code)
+    filament.weight -= used_weight
+    transaction.upsert_filament(filament)
+    transaction.append_log_entry(PrintLogEntry(
+        "2030-01-01 12:00", "Transaction test print", code, filament.material, filament.variant,
+        used_weight, filament.weight
+    ))
+    return filament.weight
+
+
+def test_failed_block_stores_nothing(workbook):
+    code = data_operations.read_excel_data()[0].code
+    weight = data_operations.get_filament(code).weight
+    log_size = len(data_operations.read_print_log())
+
+    with pytest.raises(RuntimeError):
+        with data_operations.transaction() as transaction:
+            register_usage(transaction, code, 25)
+            raise RuntimeError("cancelled")
+
+    assert data_operations.get_filament(code).weight == weight
+    assert len(data_operations.read_print_log()) == log_size
+    assert not os.path.exists(data_operations.journal_path())
+
+
+def test_weight_and_log_entry_are_one_journal_record(workbook):
+    code = data_operations.read_excel_data()[0].code
+    with data_operations.transaction(defer=True) as transaction:
+        remaining = register_usage(transaction, code, 25)
+
+    with open(data_operations.journal_path(), encoding="utf-8") as journal:
+        assert len(journal.readlines()) == 1
+    assert data_operations.get_filament(code).weight == remaining
+    assert data_operations.read_print_log(code)[-1].remaining_weight == remaining
+
+
+def test_transaction_is_saved_with_one_workbook_write(workbook, monkeypatch):
+    code = data_operations.read_excel_data()[0].code
+    saves = []
+    save_to_temp = data_operations._save_to_temp
+    monkeypatch.setattr(data_operations, "_save_to_temp", lambda book: saves.append(1) or save_to_temp(book))
+
+    with data_operations.transaction() as transaction:
+        remaining = register_usage(transaction, code, 25)
+
+    assert len(saves) == 1
+    filaments, print_log = data_operations.parse_workbook(workbook)
+    assert next(filament for filament in filaments if filament.code == code).weight == remaining
+    assert print_log[-1].print_name == "Transaction test print"
+
+
+def test_torn_record_applies_neither_change(workbook):
+    code = data_operations.read_excel_data()[0].code
+    weight = data_operations.get_filament(code).weight
+    log_size = len(data_operations.read_print_log())
+    with data_operations.transaction(defer=True) as transaction:
+        register_usage(transaction, code, 25)
+
+    # Cut the record off halfway, as a crash during the write would
+    with open(data_operations.journal_path(), "r+", encoding="utf-8") as journal:
+        line = journal.read()
+        journal.seek(0)
+        journal.truncate()
+        journal.write(line[:len(line) // 2])
+    data_operations.invalidate_cache()
+
+    assert data_operations.get_filament(code).weight == weight
+    assert len(data_operations.read_print_log()) == log_size
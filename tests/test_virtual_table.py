@@ -0,0 +1,53 @@
+import unittest
+
+from Filament_Manager.ui_components import TableRow, VirtualTable
+
+
+def make_table(rows):
+    """Return a VirtualTable with the given rows and no widgets, counting the renders"""
+    table = VirtualTable.__new__(VirtualTable)
+    table.rows = []
+    table.positions = {}
+    table.view = table.rows
+    table.view_positions = table.positions
+    table.filter_keys = None
+    table.sort_column = None
+    table.sort_descending = False
+    table.first_row = 0
+    table.visible_rows = 10
+    table.renders = 0
+
+    def render():
+        table.renders += 1
+
+    table._render = render
+    for row in rows:
+        table.upsert_row(row)
+    return table
+
+
+class UpsertRowTest(unittest.TestCase):
+    def test_update_after_insert_at_first_row(self):
+        table = make_table([TableRow("F1", ["F1"]), TableRow("F2", ["F2"])])
+        table.upsert_row(TableRow("F3", ["F3"]), index=0)
+        self.assertIs(table.view_positions, table.positions)
+        self.assertEqual(table.view_positions, {"F3": 0, "F1": 1, "F2": 2})
+
+        renders = table.renders
+        table.upsert_row(TableRow("F3", ["F3 changed"]))
+        self.assertEqual([row.values[0] for row in table.view], ["F3 changed", "F1", "F2"])
+        self.assertEqual(table.renders, renders + 1)
+
+    def test_update_after_removing_first_row(self):
+        table = make_table([TableRow("F1", ["F1"]), TableRow("F2", ["F2"])])
+        table.remove_row("F1")
+        self.assertEqual(table.view_positions, {"F2": 0})
+
+        renders = table.renders
+        table.upsert_row(TableRow("F2", ["F2 changed"]))
+        self.assertEqual([row.values[0] for row in table.view], ["F2 changed"])
+        self.assertEqual(table.renders, renders + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()